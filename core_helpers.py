@@ -1,6 +1,8 @@
 # core_helpers.py
 import os, json, csv, time, hashlib, yaml
 
+from linter import load_yaml
+
 # ---------- RUN LIFECYCLE ----------
 def begin_run():
     ts = time.strftime("%Y%m%d-%H%M%S")
@@ -48,8 +50,7 @@ def write_csv_rows(path, rows, header=None):
 def load_ethics_thresholds(path="ethics.yaml"):
     if not os.path.exists(path):
         return {"min_trust": 60.0, "min_cohesion": 50.0, "min_equity": 60.0}
-    with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+    data = load_yaml(path) or {}
     return {
         "min_trust": float(data.get("min_trust", 60.0)),
         "min_cohesion": float(data.get("min_cohesion", 50.0)),
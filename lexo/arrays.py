@@ -0,0 +1,109 @@
+# lexo/arrays.py - vista en arreglos (NumPy) de Runtime.graph
+"""
+GraphArrays congela el grafo en arreglos contiguos para operar vectorizado:
+
+    names[i]  ↔ index[name]           nodos 0..n-1
+    trust, resources, kind            por nodo
+    src, dst, edge_trust              por arista (cada arista no dirigida UNA vez)
+    edge_level                        intensidad de la arista (BAJA 0.5, MEDIA 1, ALTA 1.5)
+
+Las sumas sobre vecinos se hacen con np.bincount (equivalente a un producto
+matriz-dispersa × vector) sin dependencias extra. write_back() devuelve los
+valores al Runtime con las mismas claves que usan sus setters.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Peso relativo por intensidad: mismas proporciones que los bumps de arista (2/4/6)
+LEVEL_WEIGHT = {"BAJA": 0.5, "LOW": 0.5, "MEDIA": 1.0, "MEDIUM": 1.0, "ALTA": 1.5, "HIGH": 1.5}
+
+
+def gini_sorted(xs: np.ndarray) -> float:
+    """Gini en [0,1] de un arreglo YA ordenado (misma fórmula que Runtime.measure)."""
+    n = len(xs)
+    s = float(xs.sum()) if n else 0.0
+    if s <= 0:
+        return 0.0
+    ranks = np.arange(1, n + 1, dtype=float)
+    g = 2.0 * float(np.dot(ranks, xs)) / (n * s) - (n + 1.0) / n
+    return max(0.0, min(1.0, g))
+
+
+def equity_of(resources: np.ndarray) -> float:
+    if len(resources) == 0 or float(resources.sum()) <= 0:
+        return 0.0
+    return 100.0 * (1.0 - gini_sorted(np.sort(resources)))
+
+
+@dataclass
+class GraphArrays:
+    names: List[Any]
+    index: Dict[Any, int]
+    trust: np.ndarray
+    resources: np.ndarray
+    kind: np.ndarray
+    src: np.ndarray
+    dst: np.ndarray
+    edge_trust: np.ndarray
+    edge_level: np.ndarray | None = None
+
+    @classmethod
+    def from_runtime(cls, rt) -> "GraphArrays":
+        g = rt.graph
+        names = list(g.nodes())
+        index = {n: i for i, n in enumerate(names)}
+        n = len(names)
+        trust = np.fromiter((rt._get_node_trust(x) for x in names), dtype=float, count=n)
+        resources = np.fromiter((rt._get_node_resources(x) for x in names), dtype=float, count=n)
+        kind = np.array([str(g.nodes[x].get("kind", "")).upper() for x in names], dtype=object)
+        m = g.number_of_edges()
+        src = np.empty(m, dtype=np.int64)
+        dst = np.empty(m, dtype=np.int64)
+        edge_trust = np.empty(m, dtype=float)
+        edge_level = np.empty(m, dtype=float)
+        for k, (u, v, d) in enumerate(g.edges(data=True)):
+            src[k] = index[u]
+            dst[k] = index[v]
+            edge_trust[k] = float(d.get("confianza", d.get("trust", 50.0)))
+            level = str(d.get("intensidad", d.get("intensity", "MEDIA"))).upper().strip()
+            edge_level[k] = LEVEL_WEIGHT.get(level, 1.0)
+        return cls(names, index, trust, resources, kind, src, dst, edge_trust, edge_level)
+
+    @property
+    def n(self) -> int:
+        return len(self.names)
+
+    def degree(self) -> np.ndarray:
+        # self-loops no cuentan como vecinos (igual que nx.transitivity)
+        keep = self.src != self.dst
+        return (np.bincount(self.src[keep], minlength=self.n) +
+                np.bincount(self.dst[keep], minlength=self.n))
+
+    def neighbor_sum(self, x: np.ndarray, w: np.ndarray | None = None) -> np.ndarray:
+        """Σ_j w_ij · x_j para cada nodo i (arista no dirigida: aporta en ambos sentidos)."""
+        wu = x[self.dst] if w is None else w * x[self.dst]
+        wv = x[self.src] if w is None else w * x[self.src]
+        return (np.bincount(self.src, weights=wu, minlength=self.n) +
+                np.bincount(self.dst, weights=wv, minlength=self.n))
+
+    def write_back(self, rt, trust: bool = True, resources: bool = True,
+                   edges: bool = True) -> None:
+        g = rt.graph
+        if trust:
+            for name, t in zip(self.names, self.trust.tolist()):
+                d = g.nodes[name]
+                d["confianza"] = t
+                d["trust"] = t
+        if resources:
+            for name, r in zip(self.names, self.resources.tolist()):
+                d = g.nodes[name]
+                d["resources"] = r
+                d["recurso"] = r
+                d["recursos"] = r
+        if edges:
+            for u, v, t in zip(self.src.tolist(), self.dst.tolist(), self.edge_trust.tolist()):
+                d = g[self.names[u]][self.names[v]]
+                d["confianza"] = t
+                d["trust"] = t
@@ -0,0 +1,63 @@
+# lexo/attribution.py - aporte de cada nodo a la inequidad y a la falta de cohesión
+"""
+Descomposiciones ADITIVAS (suman exactamente lo que falta para 100):
+
+- equity:   100 − equity = 100·G y G = Σ_i D_i / (2·n·S), con D_i = Σ_j |x_i − x_j|.
+            → aporte_i = 100·D_i / (2·n·S)                       O(n log n)
+- cohesion: 100 − cohesion = 100·(W − 3T) / W, con W = Σ C(d, 2) tríadas.
+            Cada tríada centrada en v está abierta o cerrada:
+            open_v = C(d_v, 2) − tri_v  → aporte_v = 100·open_v / W   O(Σ deg²)
+
+Además se adjunta el efecto marginal (leave-one-out) de lexo/robustness, que
+responde "¿qué pasa si saco este nodo?" en vez de "¿cuánto explica?".
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+
+from lexo.incremental import IncrementalMetrics
+from lexo.robustness import abs_deviations, node_impacts, node_triangles
+
+
+@dataclass
+class Attribution:
+    node: Any
+    equity_loss: float  # puntos de (100 − equity) atribuibles al nodo
+    cohesion_loss: float  # puntos de (100 − cohesion) atribuibles al nodo
+    marginal: Dict[str, float]  # métrica sin el nodo − métrica actual
+
+
+def attribute(state: IncrementalMetrics) -> List[Attribution]:
+    nodes = list(state.trust)
+    n = len(nodes)
+    if n == 0:
+        return []
+    x = np.array([state.resources[v] for v in nodes], dtype=float)
+    dev = abs_deviations(state, x)
+    if state.res_sum > 0:
+        eq_loss = 100.0 * dev / (2.0 * n * state.res_sum)
+    else:
+        eq_loss = np.zeros(n)
+
+    tri = node_triangles(state.adj)
+    coh_loss = np.zeros(n)
+    if state.triads and state.triangles:
+        for k, v in enumerate(nodes):
+            d = len(state.adj.get(v, ()))
+            coh_loss[k] = 100.0 * (d * (d - 1) // 2 - tri.get(v, 0)) / state.triads
+    # sin triángulos la cohesión es 0 por definición: todo el déficit es "abierto"
+    elif state.triads:
+        for k, v in enumerate(nodes):
+            d = len(state.adj.get(v, ()))
+            coh_loss[k] = 100.0 * (d * (d - 1) // 2) / state.triads
+
+    marginal = {im.target: im.delta for im in node_impacts(state, tri, dev)}
+    return [Attribution(v, float(eq_loss[k]), float(coh_loss[k]), marginal[v])
+            for k, v in enumerate(nodes)]
+
+
+def top_contributors(rows: List[Attribution], metric: str, k: int = 3) -> List[Attribution]:
+    """metric: 'equity' | 'cohesion'."""
+    key = (lambda r: -r.equity_loss) if metric == "equity" else (lambda r: -r.cohesion_loss)
+    return sorted(rows, key=key)[:k]
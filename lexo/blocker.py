@@ -2,13 +2,23 @@
 from dataclasses import dataclass, field
 from typing import Dict, List, Tuple
 
+import numpy as np
+
 MetricDict = Dict[str, float]
+METRICS = ("trust", "cohesion", "equity")  # orden de columnas de evaluate_batch
 
 def _clamp_0_100(x: float) -> float:
     if x < 0: return 0.0
     if x > 100: return 100.0
     return x
 
+def _normalized_weights(pol: "BlockerPolicy") -> Dict[str, float]:
+    wsum = sum(max(0.0, pol.weights.get(k, 0.0)) for k in METRICS)
+    if wsum <= 0:
+        # fallback: pesos uniformes
+        return {k: 1.0/3 for k in METRICS}
+    return {k: max(0.0, pol.weights.get(k, 0.0)) / wsum for k in METRICS}
+
 @dataclass
 class BlockerPolicy:
     """
@@ -46,7 +56,7 @@ class Blocker:
 
         # 1) Normalizar entradas: faltantes → 0; clamp 0–100
         vals: Dict[str, float] = {}
-        for k in ("trust", "cohesion", "equity"):
+        for k in METRICS:
             v = float(metrics.get(k, 0.0))
             v = _clamp_0_100(v)
             if k not in metrics:
@@ -64,12 +74,7 @@ class Blocker:
         # pass_ratio_k = 1.0 si v >= min; lineal hasta 0.0 si v = 0
         # Score = suma(peso_k * pass_ratio_k) * 100
         # Normalizamos pesos si no suman 1.0
-        wsum = sum(max(0.0, pol.weights.get(k, 0.0)) for k in ("trust", "cohesion", "equity"))
-        if wsum <= 0:
-            # fallback: pesos uniformes
-            weights = {k: 1.0/3 for k in ("trust", "cohesion", "equity")}
-        else:
-            weights = {k: max(0.0, pol.weights.get(k, 0.0)) / wsum for k in ("trust", "cohesion", "equity")}
+        weights = _normalized_weights(pol)
 
         def pass_ratio(k: str, v: float) -> float:
             min_k = float(pol.min.get(k, 0.0))
@@ -78,7 +83,7 @@ class Blocker:
                 return 1.0 if v > 0 else 0.0
             return max(0.0, min(1.0, v / min_k))
 
-        score = 100.0 * sum(weights[k] * pass_ratio(k, vals[k]) for k in ("trust", "cohesion", "equity"))
+        score = 100.0 * sum(weights[k] * pass_ratio(k, vals[k]) for k in METRICS)
 
         # 4) Regla compuesta
         should_block = False
@@ -97,3 +102,73 @@ class Blocker:
             return (False, reasons)
 
         return (should_block, reasons)
+
+    def evaluate_batch(self, metrics) -> "BatchDecision":
+        """
+        Igual que evaluate() pero para N filas a la vez (barridos, Monte Carlo).
+        metrics: array N×3 con columnas en orden METRICS; NaN = métrica no provista
+        (se asume 0.0, como una clave faltante en evaluate).
+        Las razones no se arman acá: BatchDecision.reasons(i) las genera por fila.
+        """
+        pol = self.config.policy
+        raw = np.asarray(metrics, dtype=float)
+        if raw.ndim != 2 or raw.shape[1] != len(METRICS):
+            raise ValueError(f"evaluate_batch espera un array N×{len(METRICS)}, vino {raw.shape}")
+        missing = np.isnan(raw)
+        vals = np.clip(np.where(missing, 0.0, raw), 0.0, 100.0)
+
+        mins = np.array([float(pol.min.get(k, 0.0)) for k in METRICS])
+        fail_mask = vals < mins
+        fails = fail_mask.sum(axis=1)
+
+        # pass_ratio por columna; mismo orden de suma que evaluate (bit a bit)
+        weights = _normalized_weights(pol)
+        score = np.zeros(len(vals))
+        for j, k in enumerate(METRICS):
+            if mins[j] <= 0:
+                ratio = (vals[:, j] > 0).astype(float)
+            else:
+                ratio = np.clip(vals[:, j] / mins[j], 0.0, 1.0)
+            score = score + weights[k] * ratio
+        score = 100.0 * score
+
+        flagged = fails >= pol.require_fail_count
+        if pol.score_threshold is not None:
+            flagged = flagged | (score < pol.score_threshold)
+        block = flagged & (not self.config.dry_run)
+        return BatchDecision(self.config, vals, missing, fail_mask, fails, score, flagged, block)
+
+
+@dataclass
+class BatchDecision:
+    """Resultado de Blocker.evaluate_batch: arrays de largo N + razones bajo demanda."""
+    config: BlockerConfig
+    values: np.ndarray     # N×3 normalizados (faltantes → 0, clamp 0–100)
+    missing: np.ndarray    # N×3 bool
+    fail_mask: np.ndarray  # N×3 bool: valor < mínimo
+    fails: np.ndarray      # N int: cantidad de métricas bajo el mínimo
+    scores: np.ndarray     # N float: score ponderado 0–100
+    flagged: np.ndarray    # N bool: bloquearía (sin contar dry_run)
+    block: np.ndarray      # N bool: decisión final
+
+    def __len__(self) -> int:
+        return len(self.block)
+
+    def decision(self, i: int) -> Tuple[bool, List[str]]:
+        """(block, reasons) de la fila i, idéntico a evaluate() con esa fila."""
+        return bool(self.block[i]), self.reasons(i)
+
+    def reasons(self, i: int) -> List[str]:
+        pol = self.config.policy
+        reasons = [f"{k} no provisto → asumido 0.0"
+                   for j, k in enumerate(METRICS) if self.missing[i, j]]
+        if self.fails[i] >= pol.require_fail_count:
+            reasons.extend(f"{k} {self.values[i, j]:.1f} < min {float(pol.min.get(k, 0.0)):.1f}"
+                           for j, k in enumerate(METRICS) if self.fail_mask[i, j])
+            reasons.append(f"fallas ≥ {pol.require_fail_count}")
+        score = float(self.scores[i])
+        if pol.score_threshold is not None and score < pol.score_threshold:
+            reasons.append(f"score {score:.1f} < umbral {pol.score_threshold:.1f}")
+        if self.config.dry_run and self.flagged[i]:
+            reasons.append("dry_run=True (solo aviso, no bloqueo)")
+        return reasons
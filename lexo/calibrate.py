@@ -0,0 +1,368 @@
+# lexo/calibrate.py - calibración de BlockerPolicy sobre el historial de corridas
+"""
+Carga una sola vez las métricas finales históricas (run_*.json,
+blockade_summary.json y las líneas exec-final de CHANGELOG.md) en un arreglo
+N×3 y evalúa una grilla de políticas candidatas contra ese arreglo.
+
+- Filas con métricas idénticas se evalúan una sola vez (el historial repite
+  mucho) y se expanden con np.unique(..., return_inverse=True).
+- La grilla se evalúa por bloques de políticas: P×U×3 con broadcasting, mismo
+  cálculo (bit a bit) que Blocker.evaluate_batch.
+- Flip set: corridas cuya decisión cambia respecto de la política de referencia
+  (por defecto, los umbrales de ethics.yaml tal como los aplica blocker_decision).
+
+Uso:
+    python -m lexo.calibrate --param min.cohesion=30:60:5 --param score_threshold=none,70,80
+    python -m lexo.calibrate --grid grid.yaml --csv calibration.csv
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+import yaml
+
+from lexo.blocker import METRICS, Blocker, BlockerConfig, BlockerPolicy, _normalized_weights
+from lexo.sweep import expand_grid, expand_range
+
+SOURCES = ("run", "blockade", "changelog")
+_CHANGELOG_LINE = re.compile(
+    r"^- (?P<ts>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d) exec-final: (?P<status>\w+) \| "
+    r"trust=(?P<trust>-?[\d.]+) cohesion=(?P<cohesion>-?[\d.]+) equity=(?P<equity>-?[\d.]+)")
+
+
+# ---------- historial ----------
+@dataclass
+class History:
+    keys: List[str]      # id de corrida (dígitos del timestamp / run_id)
+    sources: List[str]   # "run" | "blockade" | "changelog"
+    status: np.ndarray   # N int8: 1 BLOCKED, 0 OK, -1 desconocido (run_*.json)
+    metrics: np.ndarray  # N×3, columnas en orden METRICS
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+def _key(stamp: Any) -> str:
+    return re.sub(r"\D", "", str(stamp or ""))
+
+
+def _row(m: Dict[str, Any]) -> List[float]:
+    return [float(m[k]) if m.get(k) is not None else np.nan for k in METRICS]
+
+
+def _stamp(key: str) -> float | None:
+    """'20251019151015…' → epoch (None si la clave no empieza con un timestamp)."""
+    try:
+        return datetime.strptime(key[:14], "%Y%m%d%H%M%S").timestamp() if len(key) >= 14 else None
+    except ValueError:
+        return None
+
+
+def _status(s: Any) -> int:
+    s = str(s or "").upper()
+    return 1 if s == "BLOCKED" else 0 if s == "OK" else -1
+
+
+def load_history(root: str = ".", sources: Sequence[str] = SOURCES,
+                 match_window: float = 300.0) -> History:
+    """
+    Lee el historial de root. Una misma corrida puede aparecer en run_*.json,
+    CHANGELOG.md y blockade_summary.json: se cuenta una sola vez. run_*.json usa
+    el run_id (inicio de execute) y CHANGELOG la hora del cierre, así que se
+    consideran la misma corrida entradas de fuentes distintas con métricas
+    idénticas (a 2 decimales) y timestamps a ≤ match_window segundos. La fila
+    conserva la primera fuente y toma el status de la que lo tenga.
+    """
+    keys, srcs, status, rows = [], [], [], []
+    times: List[float | None] = []
+    merged: List[set] = []  # fuentes ya fundidas en cada fila
+    by_row: Dict[tuple, List[int]] = {}
+
+    def add(key, src, st, row):
+        ident = tuple(None if np.isnan(v) else round(v, 2) for v in row)
+        t = _stamp(key)
+        for i in by_row.get(ident, ()):
+            same_run = key == keys[i] or (
+                src not in merged[i] and t is not None and times[i] is not None
+                and abs(t - times[i]) <= match_window)
+            if same_run:
+                merged[i].add(src)
+                if status[i] == -1:
+                    status[i] = st
+                return
+        by_row.setdefault(ident, []).append(len(keys))
+        keys.append(key)
+        srcs.append(src)
+        status.append(st)
+        rows.append(row)
+        times.append(t)
+        merged.append({src})
+
+    if "run" in sources:
+        for path in sorted(glob.glob(os.path.join(root, "run_*.json"))):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if isinstance(data, dict) and isinstance(data.get("final_metrics"), dict):
+                key = _key(data.get("run_id")) or _key(os.path.basename(path))
+                add(key, "run", -1, _row(data["final_metrics"]))
+
+    if "changelog" in sources:
+        path = os.path.join(root, "CHANGELOG.md")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    m = _CHANGELOG_LINE.match(line)
+                    if m:
+                        add(_key(m["ts"]), "changelog", _status(m["status"]),
+                            [float(m[k]) for k in METRICS])
+
+    if "blockade" in sources:
+        path = os.path.join(root, "blockade_summary.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = None
+        if isinstance(data, dict) and isinstance(data.get("metrics"), dict):
+            add(_key(data.get("timestamp") or data.get("run_id")), "blockade",
+                _status(data.get("status")), _row(data["metrics"]))
+
+    metrics = np.array(rows, dtype=float).reshape(-1, len(METRICS))
+    return History(keys, srcs, np.array(status, dtype=np.int8), metrics)
+
+
+# ---------- políticas ----------
+def reference_policy(thresholds: Dict[str, float]) -> BlockerPolicy:
+    """Política equivalente a core_helpers.blocker_decision con esos umbrales."""
+    return BlockerPolicy(min={k: float(thresholds.get(f"min_{k}", 0.0)) for k in METRICS},
+                         require_fail_count=1, score_threshold=None)
+
+
+def _with(policy: BlockerPolicy, key: str, value: Any) -> BlockerPolicy:
+    # "min.trust" / "weights.equity" / "require_fail_count" / "score_threshold"
+    if "." in key:
+        group, metric = key.split(".", 1)
+        if group not in ("min", "weights") or metric not in METRICS:
+            raise ValueError(f"parámetro de política desconocido: {key!r}")
+        return replace(policy, **{group: {**getattr(policy, group), metric: float(value)}})
+    if key == "require_fail_count":
+        return replace(policy, require_fail_count=int(value))
+    if key == "score_threshold":
+        return replace(policy, score_threshold=None if value is None else float(value))
+    raise ValueError(f"parámetro de política desconocido: {key!r}")
+
+
+def policy_grid(base: BlockerPolicy, space: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Producto cartesiano sobre base → [{"params": {...}, "policy": BlockerPolicy}]."""
+    out = []
+    for params in expand_grid(space):
+        pol = base
+        for k, v in params.items():
+            pol = _with(pol, k, v)
+        out.append({"params": params, "policy": pol})
+    return out
+
+
+def parse_values(text: str) -> List[Any]:
+    """'30:60:5' → rango inclusivo; '1,2' → lista; 'none' → None."""
+    if text.count(":") == 2:
+        return expand_range(*text.split(":"))
+    vals = []
+    for tok in text.split(","):
+        tok = tok.strip()
+        vals.append(None if tok.lower() in ("none", "null", "") else float(tok))
+    return vals
+
+
+# ---------- evaluación vectorizada ----------
+def _policy_arrays(policies: Sequence[BlockerPolicy]):
+    mins = np.array([[float(p.min.get(k, 0.0)) for k in METRICS] for p in policies])
+    weights = np.array([[_normalized_weights(p)[k] for k in METRICS] for p in policies])
+    req = np.array([p.require_fail_count for p in policies])
+    thr = np.array([np.nan if p.score_threshold is None else float(p.score_threshold)
+                    for p in policies])
+    return mins, weights, req, thr
+
+
+def block_matrix(values: np.ndarray, policies: Sequence[BlockerPolicy]) -> np.ndarray:
+    """
+    P×U bool: bloquea la política p la fila u. values ya normalizado (sin NaN,
+    clamp 0–100). Mismo cálculo que Blocker.evaluate_batch sin dry_run.
+
+    Fallas y score dependen sólo de (min, weights): se calculan una vez por
+    combinación distinta, y por métrica una vez por mínimo distinto; umbral de
+    score y require_fail_count quedan como comparaciones baratas al final.
+    """
+    mins, weights, req, thr = _policy_arrays(policies)
+    combos, inv = np.unique(np.hstack([mins, weights]), axis=0, return_inverse=True)
+    inv = inv.reshape(-1)
+    k = len(METRICS)
+    fails = np.zeros((len(combos), len(values)), dtype=np.int8)
+    score = np.zeros((len(combos), len(values)))
+    for j in range(k):
+        col = values[:, j]
+        levels, lvl = np.unique(combos[:, j], return_inverse=True)
+        lvl = lvl.reshape(-1)
+        lv = levels[:, None]
+        ratio = np.where(lv > 0, np.clip(col / np.where(lv > 0, lv, 1.0), 0.0, 1.0),
+                         (col > 0).astype(float))
+        fails += (col < lv)[lvl]
+        score = score + combos[:, k + j, None] * ratio[lvl]
+    score = 100.0 * score
+    block = fails[inv] >= req[:, None]
+    has_thr = ~np.isnan(thr)
+    if has_thr.any():
+        block[has_thr] |= score[inv[has_thr]] < thr[has_thr, None]
+    return block
+
+
+@dataclass
+class PolicyReport:
+    params: Dict[str, Any]
+    policy: BlockerPolicy
+    blocked: int
+    block_rate: float
+    to_block: np.ndarray  # índices de corridas OK en referencia que pasan a bloquearse
+    to_ok: np.ndarray     # índices de corridas bloqueadas en referencia que pasan a OK
+
+    @property
+    def flips(self) -> int:
+        return len(self.to_block) + len(self.to_ok)
+
+    def as_dict(self, keys: Sequence[str] | None = None, limit: int | None = None) -> Dict[str, Any]:
+        def ids(idx):
+            idx = idx[:limit] if limit is not None else idx
+            return [keys[i] for i in idx] if keys is not None else idx.tolist()
+        return {"params": self.params, "blocked": self.blocked,
+                "block_rate": round(self.block_rate, 4), "flips": self.flips,
+                "to_block": ids(self.to_block), "to_ok": ids(self.to_ok)}
+
+
+@dataclass
+class Calibration:
+    history: History
+    reference: BlockerPolicy
+    ref_block: np.ndarray  # N bool
+    reports: List[PolicyReport] = field(default_factory=list)
+
+    @property
+    def recorded_agreement(self) -> float | None:
+        """Fracción de corridas con estado registrado en las que la referencia coincide."""
+        known = self.history.status >= 0
+        if not known.any():
+            return None
+        return float((self.ref_block[known] == (self.history.status[known] == 1)).mean())
+
+
+def calibrate(history: History, grid: List[Dict[str, Any]], reference: BlockerPolicy,
+              cells_per_chunk: int = 2_000_000) -> Calibration:
+    """Evalúa cada política de grid sobre todo el historial (filas únicas, por bloques)."""
+    values = Blocker(BlockerConfig(policy=reference)).evaluate_batch(history.metrics).values
+    uniq, inverse = np.unique(values, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    counts = np.bincount(inverse, minlength=len(uniq))
+    ref_u = block_matrix(uniq, [reference])[0]
+    ref_block = ref_u[inverse]
+    cal = Calibration(history, reference, ref_block)
+    if not len(uniq):
+        cal.reports = [PolicyReport(g["params"], g["policy"], 0, 0.0,
+                                    np.zeros(0, int), np.zeros(0, int)) for g in grid]
+        return cal
+
+    step = max(1, cells_per_chunk // (len(uniq) * len(METRICS)))
+    n = len(history)
+    for lo in range(0, len(grid), step):
+        chunk = grid[lo:lo + step]
+        blocks = block_matrix(uniq, [g["policy"] for g in chunk])
+        blocked = blocks.astype(np.int64) @ counts
+        flipped_u = blocks != ref_u[None, :]
+        for g, row, nb, fu in zip(chunk, blocks, blocked, flipped_u):
+            if fu.any():
+                rows = np.flatnonzero(fu[inverse])
+                to_block = rows[~ref_block[rows]]
+                to_ok = rows[ref_block[rows]]
+            else:
+                to_block = to_ok = np.zeros(0, dtype=int)
+            cal.reports.append(PolicyReport(g["params"], g["policy"], int(nb),
+                                            float(nb) / n, to_block, to_ok))
+    return cal
+
+
+def save_csv(cal: Calibration, path: str, max_ids: int = 20) -> None:
+    params = list(cal.reports[0].params) if cal.reports else []
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(params + ["blocked", "block_rate", "flips", "to_block", "to_ok"])
+        for r in cal.reports:
+            d = r.as_dict(cal.history.keys, limit=max_ids)
+            w.writerow([r.params[p] for p in params] +
+                       [d["blocked"], d["block_rate"], d["flips"],
+                        ";".join(d["to_block"]), ";".join(d["to_ok"])])
+
+
+# ---------- CLI ----------
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m lexo.calibrate",
+                                 description="Recalcula bloqueos del historial bajo una grilla de BlockerPolicy.")
+    ap.add_argument("--root", default=".", help="Directorio con run_*.json / blockade_summary.json / CHANGELOG.md.")
+    ap.add_argument("--sources", default=",".join(SOURCES),
+                    help="Fuentes a cargar (default: run,blockade,changelog).")
+    ap.add_argument("--ethics", default="ethics.yaml", help="Umbrales de la política de referencia.")
+    ap.add_argument("--grid", default=None, help="YAML {parámetro: [valores]} con la grilla.")
+    ap.add_argument("--param", action="append", default=[], metavar="KEY=VALS",
+                    help="min.trust=40:70:5, weights.cohesion=0.2,0.5, score_threshold=none,80 …")
+    ap.add_argument("--top", type=int, default=15, help="Políticas a mostrar (menos flips primero).")
+    ap.add_argument("--csv", default=None, help="Guardar todas las políticas en CSV.")
+    ap.add_argument("--json", default=None, help="Guardar todas las políticas con flip sets completos.")
+    args = ap.parse_args(argv)
+
+    from core_helpers import load_ethics_thresholds
+    reference = reference_policy(load_ethics_thresholds(args.ethics))
+
+    space: Dict[str, List[Any]] = {}
+    if args.grid:
+        with open(args.grid, encoding="utf-8") as f:
+            space.update((yaml.safe_load(f) or {}))
+    for item in args.param:
+        key, _, vals = item.partition("=")
+        space[key.strip()] = parse_values(vals)
+    if not space:
+        ap.error("grilla vacía: usá --grid o --param")
+
+    history = load_history(args.root, [s.strip() for s in args.sources.split(",")])
+    grid = policy_grid(reference, space)
+    cal = calibrate(history, grid, reference)
+
+    agree = cal.recorded_agreement
+    print(f"== CALIBRACIÓN: {len(grid)} políticas × {len(history)} corridas "
+          f"(referencia bloquea {int(cal.ref_block.sum())}"
+          + (f", coincide con lo registrado en {agree:.0%}" if agree is not None else "") + ") ==")
+    for r in sorted(cal.reports, key=lambda r: (r.flips, -r.blocked))[:args.top]:
+        pv = ", ".join(f"{k}={v}" for k, v in r.params.items())
+        print(f"   · {pv} → bloquea {r.block_rate:.1%} ({r.blocked}), "
+              f"flips {r.flips} (+{len(r.to_block)} / -{len(r.to_ok)})")
+
+    if args.csv:
+        save_csv(cal, args.csv)
+        print(f"[OK] Calibración guardada en {args.csv}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"reference": cal.reference.__dict__, "runs": len(history),
+                       "policies": [r.as_dict(history.keys) for r in cal.reports]},
+                      f, ensure_ascii=False, indent=2)
+        print(f"[OK] Calibración guardada en {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
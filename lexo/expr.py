@@ -0,0 +1,371 @@
+# lexo/expr.py - condiciones `expr` del linter: lenguaje chico, compilado a closures
+"""
+Gramática (sin eval/exec; cada nodo del árbol se compila a una closure):
+
+    expr    := or
+    or      := and ('or' and)*
+    and     := not ('and' not)*
+    not     := 'not' not | cmp
+    cmp     := sum (('<'|'<='|'>'|'>='|'=='|'!='|'in'|'not' 'in') sum)?
+    sum     := prod (('+'|'-') prod)*
+    prod    := unary (('*'|'/') unary)*
+    unary   := '-' unary | postfix
+    postfix := primary ('.' NAME)*
+    primary := NUMBER | STRING | true | false | null | '[' expr, ... ']' | '(' expr ')'
+             | AGG '(' ('nodes'|'edges') [':' expr] ['where' expr] ')'
+             | FUNC '(' expr ')' | NAME
+
+    AGG  = count | sum | min | max | avg | all | any
+    FUNC = abs | len
+
+Nombres: dentro de un agregado, primero los campos del elemento (nodos: id,
+type, degree y sus props; aristas: u, v, tags y sus props), luego los del
+agregado exterior si lo hay; después el contexto: plan.<métrica>,
+previous.<métrica> y features. Un campo ausente en un elemento vale null:
+sum/min/max/avg ignoran esos elementos (avg de ninguno = 0, min/max = null).
+La división por cero da 0.0 (como las métricas del runtime con grafos vacíos).
+
+Ejemplos:
+    count(edges where 'care_network' in tags) >= 3
+    all(nodes: degree >= 1 where type != 'resource_tmp')
+    plan.equity >= previous.equity - 5 and avg(nodes: trust) > 50
+
+Los agregados de nivel superior se cachean por texto en un Scope por contexto,
+así varias reglas que piden lo mismo recorren el grafo una sola vez.
+"""
+import operator
+import re
+from typing import Any, Callable, Dict, List, Tuple
+
+AGGREGATES = ("count", "sum", "min", "max", "avg", "all", "any")
+FUNCTIONS = {"abs": abs, "len": len}
+KEYWORDS = {"and", "or", "not", "in", "where", "true", "false", "null"}
+_TOKEN = re.compile(r"""
+    \s*(?:
+      (?P<num>\d+(?:\.\d*)?|\.\d+)
+    | (?P<str>'[^']*'|"[^"]*")
+    | (?P<name>[A-Za-z_][A-Za-z_0-9]*)
+    | (?P<op><=|>=|==|!=|[<>+\-*/().,:\[\]])
+    )""", re.VERBOSE)
+_CMP = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+        "==": operator.eq, "!=": operator.ne}
+
+
+class ExprError(ValueError):
+    """Expresión mal formada (al compilar) o no evaluable (al evaluar)."""
+
+
+class Scope:
+    """Un contexto de lint + caches compartidos por todas las reglas expr."""
+
+    def __init__(self, ctx: Dict[str, Any]):
+        self.ctx = ctx
+        graph = ctx.get("graph") or {}
+        self.nodes: List[Dict[str, Any]] = graph.get("nodes") or []
+        self.edges: List[Dict[str, Any]] = graph.get("edges") or []
+        metrics = ctx.get("metrics") or {}
+        self.names = {"plan": metrics.get("plan") or {},
+                      "previous": metrics.get("previous") or {},
+                      "features": ctx.get("features") or {}}
+        self.cache: Dict[str, Any] = {}
+        self._degree: Dict[Any, int] | None = None
+
+    def degree(self) -> Dict[Any, int]:
+        if self._degree is None:
+            deg = {n.get("id"): 0 for n in self.nodes}
+            for e in self.edges:
+                for k in (e.get("u"), e.get("v")):
+                    if k in deg:
+                        deg[k] += 1
+            self._degree = deg
+        return self._degree
+
+    def elements(self, kind: str):
+        if kind == "edges":
+            return [(e, None) for e in self.edges]
+        deg = self.degree()
+        return [(n, deg.get(n.get("id"), 0)) for n in self.nodes]
+
+
+def scope_for(ctx: Dict[str, Any]) -> Scope:
+    """Reutiliza el Scope si el linter ya lo colgó del contexto."""
+    sc = ctx.get("_expr_scope")
+    return sc if isinstance(sc, Scope) and sc.ctx is ctx else Scope(ctx)
+
+
+# ---------- tokenizer ----------
+def _tokenize(src: str) -> List[Tuple[str, str]]:
+    out, pos = [], 0
+    src = src.strip()
+    while pos < len(src):
+        m = _TOKEN.match(src, pos)
+        if not m or m.end() == pos:
+            raise ExprError(f"carácter inesperado en {pos}: {src[pos:pos + 10]!r}")
+        pos = m.end()
+        kind = m.lastgroup
+        text = m.group(kind)
+        if kind == "name" and text in KEYWORDS:
+            kind = "kw"
+        out.append((kind, text))
+    out.append(("end", ""))
+    return out
+
+
+# ---------- parser → closures f(scope, elem) ----------
+Fn = Callable[[Scope, Any], Any]
+
+
+class _Parser:
+
+    def __init__(self, src: str):
+        self.src = src
+        self.toks = _tokenize(src)
+        self.i = 0
+        self.metrics: set = set()  # plan.X / previous.X leídos por la expresión
+
+    def peek(self, k: int = 0) -> Tuple[str, str]:
+        return self.toks[min(self.i + k, len(self.toks) - 1)]
+
+    def take(self, text: str | None = None, kind: str | None = None) -> str:
+        tk, tx = self.peek()
+        if (text is not None and tx != text) or (kind is not None and tk != kind):
+            want = text or kind
+            raise ExprError(f"se esperaba {want!r} y vino {tx or 'fin'!r} en {self.src!r}")
+        self.i += 1
+        return tx
+
+    def accept(self, text: str) -> bool:
+        if self.peek()[1] == text and self.peek()[0] in ("op", "kw"):
+            self.i += 1
+            return True
+        return False
+
+    def parse(self) -> Fn:
+        fn = self.or_()
+        self.take(kind="end")
+        return fn
+
+    def or_(self) -> Fn:
+        parts = [self.and_()]
+        while self.accept("or"):
+            parts.append(self.and_())
+        if len(parts) == 1:
+            return parts[0]
+        return lambda s, e: any(p(s, e) for p in parts)
+
+    def and_(self) -> Fn:
+        parts = [self.not_()]
+        while self.accept("and"):
+            parts.append(self.not_())
+        if len(parts) == 1:
+            return parts[0]
+        return lambda s, e: all(p(s, e) for p in parts)
+
+    def not_(self) -> Fn:
+        if self.peek() == ("kw", "not") and self.peek(1) != ("kw", "in"):
+            self.i += 1
+            inner = self.not_()
+            return lambda s, e: not inner(s, e)
+        return self.cmp()
+
+    def cmp(self) -> Fn:
+        left = self.sum_()
+        tk, tx = self.peek()
+        if tk == "op" and tx in _CMP:
+            self.i += 1
+            op, right = _CMP[tx], self.sum_()
+            return lambda s, e: _safe(op, left(s, e), right(s, e))
+        if (tk, tx) == ("kw", "in"):
+            self.i += 1
+            right = self.sum_()
+            return lambda s, e: _contains(right(s, e), left(s, e))
+        if (tk, tx) == ("kw", "not") and self.peek(1) == ("kw", "in"):
+            self.i += 2
+            right = self.sum_()
+            return lambda s, e: not _contains(right(s, e), left(s, e))
+        return left
+
+    def _binary(self, sub, ops) -> Fn:
+        fn = sub()
+        while self.peek()[0] == "op" and self.peek()[1] in ops:
+            op = ops[self.take()]
+            left, right = fn, sub()
+            fn = (lambda l, r, o: lambda s, e: _safe(o, l(s, e), r(s, e)))(left, right, op)
+        return fn
+
+    def sum_(self) -> Fn:
+        return self._binary(self.prod, {"+": operator.add, "-": operator.sub})
+
+    def prod(self) -> Fn:
+        return self._binary(self.unary, {"*": operator.mul, "/": _div})
+
+    def unary(self) -> Fn:
+        if self.accept("-"):
+            inner = self.unary()
+            return lambda s, e: _safe(operator.neg, inner(s, e))
+        return self.postfix()
+
+    def postfix(self) -> Fn:
+        head = self.peek()
+        fn = self.primary()
+        while self.accept("."):
+            attr = self.take(kind="name")
+            if head in (("name", "plan"), ("name", "previous")):
+                self.metrics.add(attr)
+                head = None
+            fn = (lambda f, a: lambda s, e: _attr(f(s, e), a))(fn, attr)
+        return fn
+
+    def primary(self) -> Fn:
+        tk, tx = self.peek()
+        if tk == "num":
+            self.i += 1
+            v = float(tx)
+            return lambda s, e: v
+        if tk == "str":
+            self.i += 1
+            v = tx[1:-1]
+            return lambda s, e: v
+        if tk == "kw" and tx in ("true", "false", "null"):
+            self.i += 1
+            v = {"true": True, "false": False, "null": None}[tx]
+            return lambda s, e: v
+        if self.accept("("):
+            fn = self.or_()
+            self.take(")")
+            return fn
+        if self.accept("["):
+            items = []
+            if not self.accept("]"):
+                items.append(self.or_())
+                while self.accept(","):
+                    items.append(self.or_())
+                self.take("]")
+            return lambda s, e: [f(s, e) for f in items]
+        if tk == "name":
+            self.i += 1
+            if self.peek()[1] == "(" and tx in AGGREGATES:
+                return self.aggregate(tx)
+            if self.peek()[1] == "(" and tx in FUNCTIONS:
+                self.take("(")
+                arg, fn = self.or_(), FUNCTIONS[tx]
+                self.take(")")
+                return lambda s, e: _safe(fn, arg(s, e))
+            return lambda s, e: _lookup(s, e, tx)
+        raise ExprError(f"token inesperado {tx or 'fin'!r} en {self.src!r}")
+
+    def aggregate(self, func: str) -> Fn:
+        start = self.i - 1
+        self.take("(")
+        kind = self.take(kind="name")
+        if kind not in ("nodes", "edges"):
+            raise ExprError(f"{func}(...) recorre 'nodes' o 'edges', no {kind!r}")
+        value = self.or_() if self.accept(":") else None
+        where = self.or_() if self.accept("where") else None
+        self.take(")")
+        if func not in ("count", "all", "any") and value is None:
+            raise ExprError(f"{func}({kind} ...) necesita ':' y un valor")
+        key = " ".join(tx for _, tx in self.toks[start:self.i])
+        reducer = _REDUCERS[func]
+        numeric = func in _NUMERIC
+
+        def run(s: Scope, elem):
+            items = []
+            for data, degree in s.elements(kind):
+                item = (data, degree, elem)  # elem: elemento del agregado exterior (o None)
+                if where is not None and not where(s, item):
+                    continue
+                v = value(s, item) if value is not None else True
+                if v is None and numeric:  # campo ausente en este elemento: no cuenta
+                    continue
+                items.append(v)
+            return _safe(reducer, items)
+
+        def cached(s: Scope, elem):
+            if elem is not None:  # dentro de otro agregado: depende del elemento
+                return run(s, elem)
+            if key not in s.cache:
+                s.cache[key] = run(s, elem)
+            return s.cache[key]
+        return cached
+
+
+# ---------- helpers de evaluación ----------
+def _safe(op, *args):
+    try:
+        return op(*args)
+    except TypeError as exc:
+        raise ExprError(f"operandos no compatibles: {args!r}") from exc
+
+
+def _div(a, b):
+    return _safe(operator.truediv, a, b) if b else 0.0  # x / 0 → 0.0 a propósito
+
+
+def _contains(container, item) -> bool:
+    if container is None:
+        return False
+    if isinstance(container, str):
+        return str(item) in container
+    return _safe(operator.contains, container, item)  # p.ej. 'x' in 3 → ExprError
+
+
+def _attr(obj, name: str):
+    if isinstance(obj, dict):
+        return obj.get(name)
+    raise ExprError(f"no se puede leer .{name} de {obj!r}")
+
+
+def _lookup(s: Scope, elem, name: str):
+    inside = elem is not None
+    while elem is not None:  # del agregado más interno hacia afuera
+        data, degree, elem = elem
+        if name == "degree" and degree is not None:
+            return degree
+        if name in data:
+            return data[name]
+    if name in s.names:
+        return s.names[name]
+    if inside:
+        return None  # campo ausente en este elemento
+    raise ExprError(f"nombre desconocido: {name!r}")
+
+
+def _avg(xs):
+    return sum(xs) / len(xs) if xs else 0.0
+
+
+_NUMERIC = ("sum", "min", "max", "avg")  # ignoran elementos sin el campo
+_REDUCERS = {
+    "count": len,
+    "sum": lambda xs: sum(xs),
+    "min": lambda xs: min(xs) if xs else None,
+    "max": lambda xs: max(xs) if xs else None,
+    "avg": _avg,
+    "all": lambda xs: all(xs),
+    "any": lambda xs: any(xs),
+}
+
+
+# ---------- API ----------
+class Expr:
+    """Expresión compilada; evaluate(ctx | Scope). `metrics`: métricas plan/previous que lee."""
+
+    def __init__(self, src: str):
+        self.src = src
+        parser = _Parser(src)
+        self._fn = parser.parse()
+        self.metrics = frozenset(parser.metrics)
+
+    def evaluate(self, ctx) -> Any:
+        scope = ctx if isinstance(ctx, Scope) else scope_for(ctx)
+        return self._fn(scope, None)
+
+    def __repr__(self):
+        return f"Expr({self.src!r})"
+
+
+def compile_expr(src: str) -> Expr:
+    if not isinstance(src, str) or not src.strip():
+        raise ExprError("expr vacía")
+    return Expr(src)
@@ -0,0 +1,200 @@
+# lexo/history.py - historial columnar append-only de métricas por corrida
+"""
+Para análisis sobre 100k+ corridas sin parsear JSON: cada corrida agrega una
+fila a tablas columnares en disco, en segmentos de hasta chunk_rows filas.
+
+    <root>/manifest.json                      columnas, dtypes y filas por segmento
+    <root>/runs/000000/<columna>.bin          binario crudo (np.memmap)
+    <root>/whatif/000000/<columna>.bin
+
+Tablas:
+    runs    run_id (S40), ts (float64, epoch), trust/cohesion/equity (float64),
+            status (int8: 1 BLOCKED, 0 OK, -1 desconocido)
+    whatif  run (int64, fila en runs), title (S64), d_trust/d_cohesion/d_equity
+            (float64, NaN si el escenario no comparó esa métrica)
+
+Escritura: los bytes se agregan al final de cada columna ('ab') y después se
+reemplaza el manifest de forma atómica (os.replace). Los lectores sólo
+confían en las filas del manifest, así una escritura cortada a mitad no se
+ve. Un único escritor por directorio.
+
+Lectura: segments()/column() devuelven np.memmap de sólo lectura; aggregate()
+recorre segmento por segmento sin cargar todo en memoria.
+
+    python -m lexo.history history/        # resumen: corridas, % bloqueadas, medias
+"""
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, Sequence
+
+import numpy as np
+
+METRICS = ("trust", "cohesion", "equity")
+TABLES: Dict[str, Dict[str, str]] = {
+    "runs": {"run_id": "S40", "ts": "<f8", "trust": "<f8", "cohesion": "<f8",
+             "equity": "<f8", "status": "i1"},
+    "whatif": {"run": "<i8", "title": "S64", "d_trust": "<f8", "d_cohesion": "<f8",
+               "d_equity": "<f8"},
+}
+STATUS = {"BLOCKED": 1, "OK": 0}
+
+
+class MetricsHistory:
+
+    def __init__(self, root: str, chunk_rows: int = 65536):
+        self.root = root
+        manifest = os.path.join(root, "manifest.json")
+        if os.path.exists(manifest):
+            with open(manifest, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {"version": 1, "chunk_rows": int(chunk_rows),
+                             "tables": {t: {"columns": cols, "segments": []}
+                                        for t, cols in TABLES.items()}}
+
+    # ---------- metadatos ----------
+    @property
+    def chunk_rows(self) -> int:
+        return int(self.manifest["chunk_rows"])
+
+    def rows(self, table: str = "runs") -> int:
+        return sum(seg["rows"] for seg in self.manifest["tables"][table]["segments"])
+
+    def __len__(self) -> int:
+        return self.rows("runs")
+
+    def _path(self, table: str, seg: int, column: str) -> str:
+        return os.path.join(self.root, table, f"{seg:06d}", f"{column}.bin")
+
+    # ---------- escritura ----------
+    def _append(self, table: str, data: Dict[str, np.ndarray]) -> None:
+        spec = self.manifest["tables"][table]
+        n = len(next(iter(data.values())))
+        done = 0
+        while done < n:
+            segs = spec["segments"]
+            if not segs or segs[-1]["rows"] >= self.chunk_rows:
+                segs.append({"id": len(segs), "rows": 0})
+            seg = segs[-1]
+            take = min(n - done, self.chunk_rows - seg["rows"])
+            os.makedirs(os.path.dirname(self._path(table, seg["id"], "x")), exist_ok=True)
+            for col, dtype in spec["columns"].items():
+                path = self._path(table, seg["id"], col)
+                with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+                    # truncar restos de una escritura cortada antes de agregar
+                    f.seek(seg["rows"] * np.dtype(dtype).itemsize)
+                    f.truncate()
+                    f.write(np.asarray(data[col][done:done + take], dtype=dtype).tobytes())
+            seg["rows"] += take
+            done += take
+
+    def _commit(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, "manifest.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, path)
+
+    def append(self, run_id: str, metrics: Dict[str, float], status: str | None = None,
+               whatifs: Sequence[Dict[str, Any]] = (), ts: float | None = None) -> int:
+        """Agrega una corrida (y sus WHAT_IF); devuelve su número de fila en runs."""
+        row = len(self)
+        self._append("runs", {
+            "run_id": [str(run_id).encode("utf-8")[:40]],
+            "ts": [time.time() if ts is None else float(ts)],
+            **{k: [_num(metrics.get(k))] for k in METRICS},
+            "status": [STATUS.get(str(status or "").upper(), -1)],
+        })
+        if whatifs:
+            deltas = [w.get("deltas") or {} for w in whatifs]
+            self._append("whatif", {
+                "run": [row] * len(whatifs),
+                "title": [str(w.get("title", "")).encode("utf-8")[:64] for w in whatifs],
+                **{f"d_{k}": [_num(d.get(k)) for d in deltas] for k in METRICS},
+            })
+        self._commit()
+        return row
+
+    def append_report(self, run_id: str, report: Dict[str, Any], status: str | None = None,
+                      ts: float | None = None) -> int:
+        """Atajo para el payload de execute() (final_metrics + what_if)."""
+        return self.append(run_id, report.get("final_metrics") or {}, status,
+                           report.get("what_if") or [], ts)
+
+    # ---------- lectura ----------
+    def segments(self, table: str, columns: Sequence[str] | None = None) -> Iterator[Dict[str, np.ndarray]]:
+        """Un dict {columna: memmap} por segmento (sólo las filas confirmadas)."""
+        spec = self.manifest["tables"][table]
+        cols = list(columns or spec["columns"])
+        for seg in spec["segments"]:
+            if not seg["rows"]:
+                continue
+            yield {c: np.memmap(self._path(table, seg["id"], c), dtype=spec["columns"][c],
+                                mode="r", shape=(seg["rows"],)) for c in cols}
+
+    def column(self, table: str, name: str) -> np.ndarray:
+        """Columna completa (un memmap si hay un solo segmento; si no, concatenada)."""
+        parts = [s[name] for s in self.segments(table, [name])]
+        if not parts:
+            return np.zeros(0, dtype=self.manifest["tables"][table]["columns"][name])
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def aggregate(self, since: float | None = None, until: float | None = None) -> Dict[str, Any]:
+        """Corridas, bloqueadas y media/mín/máx por métrica en [since, until) (epoch)."""
+        n = blocked = 0
+        acc = {k: [0.0, 0, np.inf, -np.inf] for k in METRICS}  # suma, cuenta, mín, máx
+        for seg in self.segments("runs", ("ts", "status") + METRICS):
+            mask = np.ones(len(seg["ts"]), dtype=bool)
+            if since is not None:
+                mask &= seg["ts"] >= since
+            if until is not None:
+                mask &= seg["ts"] < until
+            n += int(mask.sum())
+            blocked += int((seg["status"][mask] == 1).sum())
+            for k in METRICS:
+                v = seg[k][mask]
+                v = v[~np.isnan(v)]
+                if len(v):
+                    a = acc[k]
+                    a[0] += float(v.sum())
+                    a[1] += len(v)
+                    a[2] = min(a[2], float(v.min()))
+                    a[3] = max(a[3], float(v.max()))
+        return {"runs": n, "blocked": blocked,
+                "block_rate": blocked / n if n else 0.0,
+                "metrics": {k: ({"mean": a[0] / a[1], "min": a[2], "max": a[3]} if a[1] else None)
+                            for k, a in acc.items()}}
+
+
+def _num(v) -> float:
+    try:
+        return np.nan if v is None else float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    import argparse
+    ap = argparse.ArgumentParser(prog="python -m lexo.history",
+                                 description="Resumen del historial columnar de métricas.")
+    ap.add_argument("root", nargs="?", default="history")
+    ap.add_argument("--days", type=float, default=None, help="Sólo los últimos N días.")
+    args = ap.parse_args(argv)
+    if not os.path.exists(os.path.join(args.root, "manifest.json")):
+        print(f"[ERROR] No hay historial en {args.root}")
+        return 1
+    h = MetricsHistory(args.root)
+    since = time.time() - args.days * 86400 if args.days is not None else None
+    agg = h.aggregate(since=since)
+    print(f"== {agg['runs']} corrida(s), {agg['blocked']} bloqueada(s) ({agg['block_rate']:.1%}) ==")
+    for k, row in agg["metrics"].items():
+        if row:
+            print(f"   · {k}: media {row['mean']:.2f} (mín {row['min']:.2f}, máx {row['max']:.2f})")
+    print(f"   · WHAT_IF registrados: {h.rows('whatif')}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
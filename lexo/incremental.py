@@ -0,0 +1,293 @@
+# lexo/incremental.py - métricas incrementales (trust / cohesion / equity)
+"""
+Estado compacto que reproduce Runtime.measure() y permite evaluar cambios
+puntuales SIN recalcular todo:
+
+- trust:    suma de confianzas nodales → media.
+- cohesion: transitividad = 3·T / Σ C(d, 2), con T = #triángulos.
+            CONNECT(u, v) suma |N(u) ∩ N(v)| triángulos y d(u) + d(v) tríadas.
+- equity:   100·(1 − Gini). Gini = Σ|xi − xj| / (2·n·S); cambiar un valor
+            a → b mueve la suma de pares en 2·(D(b) − D(a)), con
+            D(v) = Σ_j |v − xj| calculado en O(log n) con bisección + prefijos.
+
+preview(delta) no muta nada; commit(delta) aplica el cambio.
+
+commit() tampoco reordena los recursos: pair_sum/res_sum se actualizan como
+en preview y los valores viejos quedan como correcciones pendientes sobre el
+arreglo ordenado (nodo → valor en el arreglo). Cuando se acumulan ~√n, se
+vuelcan con un merge lineal (sin re-ordenar). add_node() suma nodos nuevos
+de la misma forma, sin reconstruir el estado.
+"""
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+
+
+@dataclass
+class Delta:
+    """Cambio candidato: confianzas nuevas, recursos nuevos y aristas nuevas."""
+    trust: Dict[Any, float] = field(default_factory=dict)
+    resources: Dict[Any, float] = field(default_factory=dict)
+    edges: List[Tuple[Any, Any]] = field(default_factory=list)
+
+
+def _pair_sum(xs_sorted: np.ndarray) -> float:
+    """Σ_{i,j} |xi − xj| (pares ordenados) para un arreglo ordenado."""
+    n = len(xs_sorted)
+    ranks = np.arange(1, n + 1, dtype=float)
+    return float(2.0 * np.dot(2.0 * ranks - n - 1.0, xs_sorted))
+
+
+class IncrementalMetrics:
+
+    def __init__(self,
+                 trust: Dict[Any, float],
+                 resources: Dict[Any, float],
+                 edges: Iterable[Tuple[Any, Any]]):
+        self.trust = dict(trust)
+        self.resources = dict(resources)
+        self.adj: Dict[Any, Set[Any]] = {n: set() for n in self.trust}
+        for u, v in edges:
+            if u != v:
+                self.adj.setdefault(u, set()).add(v)
+                self.adj.setdefault(v, set()).add(u)
+        self.trust_sum = float(sum(self.trust.values()))
+        self.triangles = sum(
+            len(nb & self.adj[w]) for v, nb in self.adj.items() for w in nb) // 6
+        self.triads = sum(len(nb) * (len(nb) - 1) // 2 for nb in self.adj.values())
+        self._reindex_resources()
+
+    @classmethod
+    def from_runtime(cls, rt) -> "IncrementalMetrics":
+        g = rt.graph
+        return cls(trust={n: rt._get_node_trust(n) for n in g.nodes()},
+                   resources={n: rt._get_node_resources(n) for n in g.nodes()},
+                   edges=g.edges())
+
+    def copy(self) -> "IncrementalMetrics":
+        new = IncrementalMetrics.__new__(IncrementalMetrics)
+        new.trust = dict(self.trust)
+        new.resources = dict(self.resources)
+        new.adj = {n: set(nb) for n, nb in self.adj.items()}
+        new.trust_sum = self.trust_sum
+        new.triangles = self.triangles
+        new.triads = self.triads
+        new.xs = self.xs.copy()
+        new.prefix = self.prefix.copy()
+        new.res_sum = self.res_sum
+        new.pair_sum = self.pair_sum
+        new._pending = dict(self._pending)
+        return new
+
+    # ---------- recursos: arreglo ordenado + prefijos ----------
+    def _reindex_resources(self) -> None:
+        self.xs = np.sort(np.fromiter(self.resources.values(), dtype=float,
+                                      count=len(self.resources)))
+        self.prefix = np.concatenate(([0.0], np.cumsum(self.xs)))
+        self.res_sum = float(self.prefix[-1])
+        self.pair_sum = _pair_sum(self.xs)
+        self._pending: Dict[Any, float | None] = {}  # nodo → valor en xs (None: no está)
+
+    def _abs_dev(self, v: float) -> float:
+        """D(v) = Σ_j |v − xj| sobre los valores actuales (arreglo + pendientes)."""
+        n = len(self.xs)
+        c = int(np.searchsorted(self.xs, v, side="left"))
+        below = self.prefix[c]
+        d = v * c - below + (self.prefix[-1] - below) - v * (n - c)
+        for node, old in self._pending.items():
+            d += abs(v - self.resources[node]) - (abs(v - old) if old is not None else 0.0)
+        return d
+
+    def _set_resource(self, node, new: float) -> None:
+        if node not in self._pending:
+            self._pending[node] = self.resources.get(node)
+        self.resources[node] = new
+        if len(self._pending) > max(32, math.isqrt(len(self.xs))):
+            self._fold_pending()
+
+    def _fold_pending(self) -> None:
+        """Vuelca las correcciones al arreglo ordenado: O(n + p·log n), sin sort global."""
+        olds = np.sort(np.array([o for o in self._pending.values() if o is not None], dtype=float))
+        news = np.sort(np.array([self.resources[n] for n in self._pending], dtype=float))
+        xs = self.xs
+        if len(olds):
+            # valores repetidos: la k-ésima copia de v está en searchsorted(v) + k
+            first = np.searchsorted(olds, olds, side="left")
+            xs = np.delete(xs, np.searchsorted(xs, olds, side="left") + np.arange(len(olds)) - first)
+        self.xs = np.insert(xs, np.searchsorted(xs, news, side="left"), news)
+        self.prefix = np.concatenate(([0.0], np.cumsum(self.xs)))
+        self.res_sum = float(self.prefix[-1])
+        self.pair_sum = _pair_sum(self.xs)  # O(n) igual que el merge: corta la deriva de redondeo
+        self._pending = {}
+
+    def _resource_preview(self, changes: Dict[Any, float]) -> Tuple[float, float]:
+        """(pair_sum, res_sum) tras aplicar changes, en O(m·log n + m²)."""
+        pair_sum, res_sum = self.pair_sum, self.res_sum
+        applied: List[Tuple[float, float]] = []
+        for node, new in changes.items():
+            old = self.resources[node]
+            new = float(new)
+
+            def dev(v: float) -> float:
+                d = self._abs_dev(v)
+                for a, b in applied:  # correcciones por cambios previos del mismo delta
+                    d += abs(v - b) - abs(v - a)
+                return d
+
+            pair_sum += 2.0 * (dev(new) - abs(new - old) - dev(old))
+            res_sum += new - old
+            applied.append((old, new))
+        return pair_sum, res_sum
+
+    # ---------- métricas ----------
+    @staticmethod
+    def _round(trust: float, cohesion: float, equity: float) -> Dict[str, float]:
+        return {"trust": round(trust, 2), "cohesion": round(cohesion, 2), "equity": round(equity, 2)}
+
+    def _values(self, trust_sum, triangles, triads, pair_sum, res_sum) -> Tuple[float, float, float]:
+        n = len(self.trust)
+        trust = trust_sum / n if n else 0.0
+        cohesion = 100.0 * 3.0 * triangles / triads if triangles and triads else 0.0
+        equity = 0.0
+        if n and res_sum > 0:
+            gini = max(0.0, min(1.0, pair_sum / (2.0 * n * res_sum)))
+            equity = 100.0 * (1.0 - gini)
+        return trust, cohesion, equity
+
+    def values(self) -> Tuple[float, float, float]:
+        return self._values(self.trust_sum, self.triangles, self.triads,
+                            self.pair_sum, self.res_sum)
+
+    def metrics(self) -> Dict[str, float]:
+        """Mismo formato (y redondeo) que Runtime.measure()."""
+        return self._round(*self.values())
+
+    # ---------- delta ----------
+    def _new_edges(self, delta: Delta):
+        """Aristas realmente nuevas (sin repetidas ni self-loops) con su aporte."""
+        added: Dict[Any, Set[Any]] = {}
+        tri = wedge = 0
+        for u, v in delta.edges:
+            if u == v or v in self.adj.get(u, ()) or v in added.get(u, ()):
+                continue
+            nu = self.adj.get(u, set()) | added.get(u, set())
+            nv = self.adj.get(v, set()) | added.get(v, set())
+            tri += len(nu & nv)
+            wedge += len(nu) + len(nv)
+            added.setdefault(u, set()).add(v)
+            added.setdefault(v, set()).add(u)
+        return added, tri, wedge
+
+    def preview_values(self, delta: Delta) -> Tuple[float, float, float]:
+        trust_sum = self.trust_sum + sum(float(t) - self.trust[n] for n, t in delta.trust.items())
+        _, tri, wedge = self._new_edges(delta)
+        pair_sum, res_sum = (self._resource_preview(delta.resources)
+                             if delta.resources else (self.pair_sum, self.res_sum))
+        return self._values(trust_sum, self.triangles + tri, self.triads + wedge,
+                            pair_sum, res_sum)
+
+    def preview(self, delta: Delta) -> Dict[str, float]:
+        return self._round(*self.preview_values(delta))
+
+    def add_node(self, n, trust: float, resources: float) -> None:
+        """Nodo nuevo (sin aristas; éstas llegan por commit)."""
+        if n in self.trust:
+            return
+        r = float(resources)
+        self.pair_sum += 2.0 * self._abs_dev(r)
+        self.res_sum += r
+        self.trust[n] = float(trust)
+        self.trust_sum += float(trust)
+        self.adj.setdefault(n, set())
+        self._set_resource(n, r)
+
+    def commit(self, delta: Delta) -> None:
+        for n, t in delta.trust.items():
+            self.trust_sum += float(t) - self.trust[n]
+            self.trust[n] = float(t)
+        added, tri, wedge = self._new_edges(delta)
+        for u, nb in added.items():
+            self.adj.setdefault(u, set()).update(nb)
+        self.triangles += tri
+        self.triads += wedge
+        if delta.resources:
+            self.pair_sum, self.res_sum = self._resource_preview(delta.resources)
+            for n, r in delta.resources.items():
+                self._set_resource(n, float(r))
+
+
+class LiveMetrics:
+    """
+    IncrementalMetrics enganchado a un Runtime: recibe los nodos/aristas que
+    tocan los métodos que mutan (touch_node / touch_edge) y los vuelca al
+    estado en sync(). Cada acción cuesta O(tocados), no O(grafo).
+    """
+
+    def __init__(self, rt):
+        self.rt = rt
+        self.state = IncrementalMetrics.from_runtime(rt)
+        self.nodes: Dict[Any, None] = {}  # dicts como conjuntos ordenados: orden determinista
+        self.edges: Dict[Any, None] = {}
+        self.stale = False
+        self.edge_key: Dict[frozenset, Any] = {frozenset(e): e for e in rt.graph.edges()}
+
+    def touch_node(self, n) -> None:
+        self.nodes[n] = None
+
+    def touch_edge(self, u, v) -> None:
+        # misma orientación siempre, para no duplicar aristas
+        self.edges[self.edge_key.setdefault(frozenset((u, v)), (u, v))] = None
+        self.nodes[u] = None
+        self.nodes[v] = None
+
+    def invalidate(self) -> None:
+        """Escrituras masivas al grafo (p.ej. SIMULATE_TICKS): el próximo sync reconstruye."""
+        self.stale = True
+
+    def sync(self) -> Tuple[Iterable, Iterable, Set[str]]:
+        """(nodos, aristas) tocados desde el último sync y métricas que pueden haber cambiado."""
+        rt = self.rt
+        if self.stale:
+            self.state = IncrementalMetrics.from_runtime(rt)
+            nodes = list(rt.graph.nodes())
+            edges = [self.edge_key.setdefault(frozenset(e), e) for e in rt.graph.edges()]
+            changed = {"trust", "cohesion", "equity"}
+            self.stale = False
+        else:
+            nodes, edges = self.nodes, self.edges
+            changed = self._commit(nodes, edges)
+        self.nodes, self.edges = {}, {}
+        return nodes, edges, changed
+
+    def _commit(self, nodes: Iterable, edges: Iterable) -> Set[str]:
+        rt, st = self.rt, self.state
+        changed: Set[str] = set()
+        for n in nodes:
+            if n not in st.trust and rt.graph.has_node(n):  # nodo nuevo: se agrega, sin reconstruir
+                st.add_node(n, rt._get_node_trust(n), rt._get_node_resources(n))
+                changed.update(("trust", "equity"))
+        delta = Delta()
+        for n in nodes:
+            if n not in st.trust:
+                continue
+            t, r = rt._get_node_trust(n), rt._get_node_resources(n)
+            if t != st.trust[n]:
+                delta.trust[n] = t
+            if r != st.resources[n]:
+                delta.resources[n] = r
+        delta.edges = [(u, v) for u, v in edges if v not in st.adj.get(u, ())]
+        st.commit(delta)
+        if delta.trust:
+            changed.add("trust")
+        if delta.edges:
+            changed.add("cohesion")
+        if delta.resources:
+            changed.add("equity")
+        return changed
+
+    def metrics(self) -> Dict[str, float]:
+        """Sincroniza y devuelve las métricas (mismo formato que Runtime.measure())."""
+        self.sync()
+        return self.state.metrics()
@@ -0,0 +1,189 @@
+# lexo/indexes.py - índices secundarios del Runtime (kind, trust, resources, grado, aristas)
+"""
+RuntimeIndex mantiene, al lado de Runtime.graph:
+
+    kind          → nodos (dict ordenado por inserción: iterar es determinista)
+
+y, sólo a partir de la primera consulta que los pide (count_below, below,
+smallest, largest), índices ordenados por valor:
+
+    trust         nodo → confianza (como Runtime._get_node_trust)
+    resources     nodo → recursos
+    degree        nodo → grado (como graph.degree)
+    edge_trust    arista → confianza (como Runtime._edge_trust)
+
+Armar el mapa de kind es O(n). SortedIndex se arma con un único sorted() sobre
+todos los pares (valor, id), O(n log n); de ahí en más cada actualización es
+una bisección + un memmove. Un índice ordenado que nadie consultó no cuesta
+nada al mutar. Los métodos que mutan el Runtime llaman a update_node /
+update_edge; quien escriba rt.graph a mano debe invalidar.
+
+lint_compare_v2 no usa estos índices: ya recorre el snapshot completo (Gini,
+caída de vínculos, CSV con todos los infractores) y scan_snapshots resuelve
+las reglas por umbral en ese mismo pase.
+"""
+from bisect import bisect_left, insort
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Tuple
+
+METRICS = ("trust", "resources", "degree", "edge_trust")
+
+
+class SortedIndex:
+
+    def __init__(self):
+        self._items: List[Tuple[float, int]] = []
+        self._value: Dict[int, float] = {}
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[int, float]]) -> "SortedIndex":
+        """Carga masiva (id, valor): un solo sorted() en vez de n insort."""
+        idx = cls()
+        idx._value = {key: float(value) for key, value in items}
+        idx._items = sorted((value, key) for key, value in idx._value.items())
+        return idx
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def set(self, key: int, value: float) -> None:
+        value = float(value)
+        old = self._value.get(key)
+        if old is not None:
+            if old == value:
+                return
+            del self._items[bisect_left(self._items, (old, key))]
+        self._value[key] = value
+        insort(self._items, (value, key))
+
+    def discard(self, key: int) -> None:
+        old = self._value.pop(key, None)
+        if old is not None:
+            del self._items[bisect_left(self._items, (old, key))]
+
+    def get(self, key: int) -> float | None:
+        return self._value.get(key)
+
+    def count_below(self, threshold: float) -> int:
+        """Cantidad con valor < threshold en O(log n)."""
+        return bisect_left(self._items, (float(threshold), -1))
+
+    def below(self, threshold: float, limit: int | None = None) -> Iterator[Tuple[float, int]]:
+        """(valor, id) con valor < threshold, de menor a mayor."""
+        cut = self.count_below(threshold)
+        if limit is not None:
+            cut = min(cut, limit)
+        return iter(self._items[:cut])
+
+    def smallest(self, k: int) -> List[Tuple[float, int]]:
+        return self._items[:max(0, k)]
+
+    def largest(self, k: int) -> List[Tuple[float, int]]:
+        return self._items[-k:][::-1] if k > 0 else []
+
+
+class RuntimeIndex:
+
+    def __init__(self):
+        self.rt = None
+        self._id: Dict[Hashable, int] = {}
+        self._key: List[Any] = []
+        self.kind: Dict[str, Dict[Hashable, None]] = {}
+        self._kind_of: Dict[Hashable, str] = {}
+        self._sorted: Dict[str, SortedIndex] = {}  # métrica → índice (armado al primer uso)
+
+    # ---------- ids ----------
+    def _ident(self, key) -> int:
+        i = self._id.get(key)
+        if i is None:
+            i = self._id[key] = len(self._key)
+            self._key.append(key)
+        return i
+
+    def _edge_key(self, u, v):
+        iu, iv = self._ident(u), self._ident(v)
+        return (u, v) if iu <= iv else (v, u)
+
+    def key(self, ident: int) -> Any:
+        return self._key[ident]
+
+    # ---------- construcción / actualización ----------
+    @classmethod
+    def from_runtime(cls, rt) -> "RuntimeIndex":
+        idx = cls()
+        idx.rt = rt
+        for n, d in rt.graph.nodes(data=True):
+            kind = str(d.get("kind", "")).upper()
+            idx.kind.setdefault(kind, {})[n] = None
+            idx._kind_of[n] = kind
+        return idx
+
+    def _build(self, metric: str) -> SortedIndex:
+        rt, g = self.rt, self.rt.graph
+        if metric == "edge_trust":
+            items = ((self._ident(self._edge_key(u, v)), rt._edge_trust(u, v)) for u, v in g.edges())
+        elif metric == "degree":
+            items = ((self._ident(n), d) for n, d in g.degree())
+        else:
+            get = rt._get_node_trust if metric == "trust" else rt._get_node_resources
+            items = ((self._ident(n), get(n)) for n in g.nodes())
+        return SortedIndex.from_items(items)
+
+    def invalidate_values(self) -> None:
+        """Descarta los índices ordenados (el mapa de kind sigue valiendo)."""
+        self._sorted.clear()
+
+    def update_node(self, rt, n) -> None:
+        g = rt.graph
+        if not g.has_node(n):
+            return
+        kind = str(g.nodes[n].get("kind", "")).upper()
+        old = self._kind_of.get(n)
+        if old != kind:
+            if old is not None:
+                self.kind[old].pop(n, None)
+            self.kind.setdefault(kind, {})[n] = None
+            self._kind_of[n] = kind
+        if not self._sorted:
+            return
+        i = self._ident(n)
+        if "trust" in self._sorted:
+            self._sorted["trust"].set(i, rt._get_node_trust(n))
+        if "resources" in self._sorted:
+            self._sorted["resources"].set(i, rt._get_node_resources(n))
+        if "degree" in self._sorted:
+            self._sorted["degree"].set(i, g.degree(n))
+
+    def update_edge(self, rt, u, v) -> None:
+        g = rt.graph
+        if not self._sorted or not g.has_edge(u, v):
+            return
+        if "edge_trust" in self._sorted:
+            self._sorted["edge_trust"].set(self._ident(self._edge_key(u, v)), rt._edge_trust(u, v))
+        if "degree" in self._sorted:
+            self._sorted["degree"].set(self._ident(u), g.degree(u))
+            self._sorted["degree"].set(self._ident(v), g.degree(v))
+
+    # ---------- consultas ----------
+    def nodes_of_kind(self, kind: str) -> List[Hashable]:
+        return list(self.kind.get(str(kind).upper(), ()))
+
+    def _index(self, metric: str) -> SortedIndex:
+        idx = self._sorted.get(metric)
+        if idx is None:
+            if metric not in METRICS:
+                raise KeyError(f"métrica sin índice: {metric!r} (usar {METRICS})")
+            idx = self._sorted[metric] = self._build(metric)
+        return idx
+
+    def count_below(self, metric: str, threshold: float) -> int:
+        return self._index(metric).count_below(threshold)
+
+    def below(self, metric: str, threshold: float, limit: int | None = None) -> List[Tuple[Any, float]]:
+        """(nodo o arista, valor) con valor < threshold, de peor a mejor."""
+        return [(self._key[i], v) for v, i in self._index(metric).below(threshold, limit)]
+
+    def smallest(self, metric: str, k: int) -> List[Tuple[Any, float]]:
+        return [(self._key[i], v) for v, i in self._index(metric).smallest(k)]
+
+    def largest(self, metric: str, k: int) -> List[Tuple[Any, float]]:
+        return [(self._key[i], v) for v, i in self._index(metric).largest(k)]
@@ -0,0 +1,85 @@
+# lexo/montecarlo.py - SIMULATE N: réplicas estocásticas + bandas por métrica
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from lexo.pool import map_with_base
+from lexo.sweep import METRICS
+
+# Réplicas por tarea. Fijo (no depende de workers) para que los resultados
+# sean idénticos con 1 o N procesos: el chunk k siempre usa el stream k.
+CHUNK = 64
+
+
+def _run_chunk(base: Tuple[Any, Callable[[Any, np.random.Generator], Dict[str, float]]],
+               item: Tuple[np.random.SeedSequence, int]) -> np.ndarray:
+    payload, evaluate = base
+    seq, reps = item
+    rng = np.random.default_rng(seq)
+    out = np.empty((reps, len(METRICS)), dtype=float)
+    for r in range(reps):
+        m = evaluate(payload, rng)
+        out[r] = [float(m.get(k, 0.0)) for k in METRICS]
+    return out
+
+
+@dataclass
+class MonteCarloResult:
+    title: str
+    seed: int
+    samples: np.ndarray  # N×len(METRICS)
+    percentiles: List[float] = field(default_factory=lambda: [5.0, 50.0, 95.0])
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Por métrica: media, desvío, IC95% de la media (aprox. normal) y percentiles.
+        """
+        n = len(self.samples)
+        mean = self.samples.mean(axis=0)
+        std = self.samples.std(axis=0, ddof=1) if n > 1 else np.zeros(len(METRICS))
+        half = 1.96 * std / np.sqrt(max(n, 1))
+        pct = np.percentile(self.samples, self.percentiles, axis=0)
+        out = {}
+        for j, k in enumerate(METRICS):
+            row = {
+                "mean": round(float(mean[j]), 4),
+                "std": round(float(std[j]), 4),
+                "ci95_low": round(float(mean[j] - half[j]), 4),
+                "ci95_high": round(float(mean[j] + half[j]), 4),
+            }
+            for q, v in zip(self.percentiles, pct[:, j]):
+                row[f"p{q:g}"] = round(float(v), 4)
+            out[k] = row
+        return out
+
+    def save_npz(self, path: str) -> None:
+        np.savez_compressed(path,
+                            samples=self.samples,
+                            metric_names=np.array(METRICS),
+                            seed=np.array(self.seed))
+
+
+def run_montecarlo(title: str,
+                   payload: Any,
+                   n: int,
+                   evaluate: Callable[[Any, np.random.Generator], Dict[str, float]],
+                   seed: int = 42,
+                   percentiles: Sequence[float] | None = None,
+                   workers: int | None = None) -> MonteCarloResult:
+    """
+    Corre n réplicas de evaluate(payload, rng) repartidas en chunks.
+    Cada chunk recibe un stream independiente de SeedSequence(seed).spawn(...),
+    así que el resultado es reproducible y no depende del número de procesos.
+    """
+    n = int(n)
+    if n <= 0:
+        raise ValueError("SIMULATE: N debe ser > 0")
+    sizes = [min(CHUNK, n - lo) for lo in range(0, n, CHUNK)]
+    seqs = np.random.SeedSequence(int(seed)).spawn(len(sizes))
+    parts = map_with_base(_run_chunk, (payload, evaluate), list(zip(seqs, sizes)),
+                          workers=workers, chunksize=1)
+    return MonteCarloResult(title=title,
+                            seed=int(seed),
+                            samples=np.vstack(parts),
+                            percentiles=[float(q) for q in (percentiles or [5, 50, 95])])
@@ -0,0 +1,132 @@
+# lexo/offenders.py - reglas éticas por nodo/arista en un único pase con top-k
+"""
+Las reglas "por elemento" de lint_compare_v2 (vínculos que caen, nodos/vínculos
+con confianza baja, nodos aislados, nodos sin recursos) se evalúan juntas:
+
+    un pase por los nodos del snapshot nuevo  → low_node_trust, low_degree, starved
+    un pase por las aristas                   → edge_drop, low_edge_trust
+
+Por regla se guarda la cantidad total y los k peores en un heap acotado
+(O(n log k), memoria O(k)); nunca se arma la lista completa. Si se pasa un
+OffenderSink, cada infractor se escribe en un CSV a medida que aparece.
+"""
+import csv
+import heapq
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+RULES = ("edge_drop", "low_node_trust", "low_edge_trust", "low_degree", "starved")
+
+
+@dataclass
+class RuleHits:
+    rule: str
+    count: int = 0
+    worst: List[Tuple[Any, float]] = field(default_factory=list)  # (nodo o arista, valor)
+
+    def keys(self) -> List[Any]:
+        return [key for key, _ in self.worst]
+
+    def sample(self, fmt: str = "{:.1f}") -> str:
+        """'A (3.0), B–C (5.1)' para los mensajes."""
+        return ", ".join(f"{_label(key)} ({fmt.format(val)})" for key, val in self.worst)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"count": self.count,
+                "worst": [{"target": _label(key), "value": round(float(val), 4)}
+                          for key, val in self.worst]}
+
+
+class _Worst:
+    """Los k de menor score; a igual score gana el que apareció primero."""
+
+    def __init__(self, k: int):
+        self.k = max(0, int(k))
+        self._heap: list = []  # max-heap por (score, orden) vía negación
+        self._seq = 0
+
+    def push(self, score: float, key, value: float) -> None:
+        if self.k == 0:
+            return
+        self._seq += 1
+        item = (-score, -self._seq, key, value)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def items(self) -> List[Tuple[Any, float]]:
+        return [(key, value) for _, _, key, value in sorted(self._heap, reverse=True)]
+
+
+class OffenderSink:
+    """CSV rule,target,value con TODOS los infractores."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "w", newline="", encoding="utf-8")
+        self._w = csv.writer(self._f)
+        self._w.writerow(["rule", "target", "value"])
+        self.rows = 0
+
+    def write(self, rule: str, key, value: float) -> None:
+        self._w.writerow([rule, _label(key), round(float(value), 4)])
+        self.rows += 1
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = self._w = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _label(key) -> str:
+    return "–".join(map(str, key)) if isinstance(key, tuple) else str(key)
+
+
+def scan_snapshots(prev_snap, new_snap, limits: Dict[str, float], k: int = 3,
+                   sink: OffenderSink | None = None) -> Dict[str, RuleHits]:
+    """
+    limits usa las claves de ETHICS: max_edge_trust_drop, low_node_trust,
+    low_edge_trust, min_node_degree, min_resources_per_node.
+    """
+    worst = {r: _Worst(k) for r in RULES}
+    count = dict.fromkeys(RULES, 0)
+
+    def hit(rule, score, key, value):
+        count[rule] += 1
+        worst[rule].push(score, key, value)
+        if sink is not None:
+            sink.write(rule, key, value)
+
+    low_trust = limits["low_node_trust"]
+    min_degree = limits["min_node_degree"]
+    min_res = limits["min_resources_per_node"]
+    degrees = new_snap["degrees"]
+    resources = new_snap["res_by_node"]
+    for n, t in new_snap["node_trust"].items():
+        if t < low_trust:
+            hit("low_node_trust", t, n, t)
+        d = degrees.get(n, 0)
+        if d < min_degree:
+            hit("low_degree", d, n, d)
+        r = resources.get(n, 0.0)
+        if r < min_res:
+            hit("starved", r, n, r)
+
+    max_drop = limits["max_edge_trust_drop"]
+    low_edge = limits["low_edge_trust"]
+    prev_edges = prev_snap["edges"]
+    for e, t in new_snap["edges"].items():
+        prev_t = prev_edges.get(e)
+        if prev_t is not None and prev_t - t > max_drop:
+            hit("edge_drop", t - prev_t, e, prev_t - t)  # más caída = peor
+        if t < low_edge:
+            hit("low_edge_trust", t, e, t)
+
+    return {r: RuleHits(r, count[r], worst[r].items()) for r in RULES}
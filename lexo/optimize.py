@@ -0,0 +1,160 @@
+# lexo/optimize.py - OPTIMIZE: búsqueda greedy/beam del mejor conjunto de acciones
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Tuple
+
+from lexo.incremental import Delta, IncrementalMetrics
+from lexo.sweep import METRICS
+
+# Mismo mapa que Runtime._int_bumps: intensidad → (bump nodo, bump arista)
+INT_BUMPS = {"ALTA": (10, 6), "MEDIA": (6, 4), "BAJA": (3, 2)}
+
+Action = Tuple[Any, ...]  # misma forma que ast.actions: ("CONNECT", a, b, props), ...
+
+
+@dataclass
+class OptimizeConfig:
+    """
+    - budget: máximo de acciones por tipo (claves = tags del AST).
+    - weights: pesos del objetivo sobre trust/cohesion/equity (0–100).
+    - mins: umbrales mínimos (ethics.yaml o BlockerPolicy.min); cada punto
+      por debajo resta `penalty` al objetivo.
+    - beam: 1 = greedy; >1 = beam search.
+    """
+    budget: Dict[str, int] = field(default_factory=lambda: {
+        "CONNECT": 3, "STRENGTHEN_TIES": 2, "REDISTRIBUTE_RESOURCES": 2
+    })
+    weights: Dict[str, float] = field(default_factory=lambda: {k: 1.0 / 3 for k in METRICS})
+    mins: Dict[str, float] = field(default_factory=dict)
+    penalty: float = 10.0
+    beam: int = 1
+    intensity: str = "ALTA"
+    fractions: Tuple[float, ...] = (0.1, 0.2, 0.3)
+    min_left: float = 2.0
+    max_candidates: int = 200  # por tipo de acción y por paso
+
+
+@dataclass
+class OptimizeResult:
+    actions: List[Action]
+    metrics: Dict[str, float]
+    score: float
+    feasible: bool
+    evaluated: int
+
+
+def objective(values: Tuple[float, float, float], cfg: OptimizeConfig) -> float:
+    m = dict(zip(METRICS, values))
+    score = sum(cfg.weights.get(k, 0.0) * m[k] for k in METRICS)
+    short = sum(max(0.0, float(cfg.mins[k]) - m[k]) for k in METRICS if k in cfg.mins)
+    return score - cfg.penalty * short
+
+
+def _feasible(values: Tuple[float, float, float], cfg: OptimizeConfig) -> bool:
+    m = dict(zip(METRICS, values))
+    return all(m[k] >= float(cfg.mins[k]) for k in METRICS if k in cfg.mins)
+
+
+# ---------- candidatos (acción + delta incremental) ----------
+def _connect_candidates(st: IncrementalMetrics, cfg: OptimizeConfig) -> Iterator[Tuple[Action, Delta]]:
+    # sólo pares a 2 saltos: son los únicos que cierran triángulos
+    scored: Dict[Tuple[Any, Any], int] = {}
+    for w, nb in st.adj.items():
+        nbs = sorted(nb, key=str)
+        for i, u in enumerate(nbs):
+            for v in nbs[i + 1:]:
+                if v not in st.adj[u]:
+                    scored[(u, v)] = scored.get((u, v), 0) + 1
+    best = sorted(scored.items(), key=lambda kv: -kv[1])[:cfg.max_candidates]
+    for (u, v), _ in best:
+        yield ("CONNECT", u, v, {"trust": 50.0}), Delta(edges=[(u, v)])
+
+
+def _strengthen_candidates(st: IncrementalMetrics, cfg: OptimizeConfig) -> Iterator[Tuple[Action, Delta]]:
+    bump = INT_BUMPS.get(cfg.intensity, INT_BUMPS["ALTA"])[0]
+    lowest = sorted(st.trust.items(), key=lambda kv: kv[1])[:cfg.max_candidates]
+    for n, t in lowest:
+        new = max(0.0, min(100.0, t + bump))
+        if new != t:
+            yield ("STRENGTHEN_TIES", n, {"intensity": cfg.intensity}), Delta(trust={n: new})
+
+
+def _redistribute_candidates(st: IncrementalMetrics, cfg: OptimizeConfig) -> Iterator[Tuple[Action, Delta]]:
+    k = max(1, int(cfg.max_candidates ** 0.5))
+    ranked = sorted(st.resources.items(), key=lambda kv: kv[1])
+    poor, rich = ranked[:k], ranked[::-1][:k]
+    for giver, g in rich:
+        if g <= cfg.min_left:
+            continue
+        for receiver, r in poor:
+            if receiver == giver:
+                continue
+            for f in cfg.fractions:
+                # misma regla que Runtime.redistribute_resources
+                move = max(0.0, min(g - cfg.min_left, g * f))
+                if move <= 0:
+                    continue
+                yield (("REDISTRIBUTE_RESOURCES", giver, receiver,
+                        {"fraction": f, "min_left": cfg.min_left}),
+                       Delta(resources={giver: g - move, receiver: r + move}))
+
+
+_GENERATORS = {
+    "CONNECT": _connect_candidates,
+    "STRENGTHEN_TIES": _strengthen_candidates,
+    "REDISTRIBUTE_RESOURCES": _redistribute_candidates,
+}
+
+
+def optimize(state: IncrementalMetrics, cfg: OptimizeConfig) -> OptimizeResult:
+    """
+    Beam search (beam=1 → greedy) sobre secuencias de acciones dentro del budget.
+    Cada candidato se evalúa con IncrementalMetrics.preview (sin clonar el
+    Runtime); sólo los sobrevivientes del beam copian y commitean su estado.
+    """
+    start = state.values()
+    # (score, acciones, usos por tipo, estado)
+    beam: List[Tuple[float, List[Action], Dict[str, int], IncrementalMetrics]] = [
+        (objective(start, cfg), [], {}, state.copy())
+    ]
+    best = beam[0]
+    evaluated = 0
+    steps = sum(max(0, int(v)) for v in cfg.budget.values())
+
+    for _ in range(steps):
+        expansions = []
+        for score, acts, used, st in beam:
+            for tag, gen in _GENERATORS.items():
+                if used.get(tag, 0) >= int(cfg.budget.get(tag, 0)):
+                    continue
+                for action, delta in gen(st, cfg):
+                    evaluated += 1
+                    s = objective(st.preview_values(delta), cfg)
+                    if s > score + 1e-9:
+                        expansions.append((s, action, delta, acts, used, st))
+        if not expansions:
+            break
+        expansions.sort(key=lambda e: -e[0])
+        new_beam, seen = [], set()
+        for s, action, delta, acts, used, st in expansions:
+            if len(new_beam) >= max(1, cfg.beam):
+                break
+            # el mismo conjunto en otro orden no suma diversidad al beam
+            key = tuple(sorted(repr(a) for a in acts + [action]))
+            if key in seen:
+                continue
+            seen.add(key)
+            st2 = st.copy()
+            st2.commit(delta)
+            used2 = dict(used)
+            used2[action[0]] = used2.get(action[0], 0) + 1
+            new_beam.append((s, acts + [action], used2, st2))
+        beam = new_beam
+        if beam[0][0] > best[0]:
+            best = beam[0]
+
+    score, acts, _, st = best
+    return OptimizeResult(actions=acts,
+                          metrics=st.metrics(),
+                          score=round(score, 4),
+                          feasible=_feasible(st.values(), cfg),
+                          evaluated=evaluated)
@@ -0,0 +1,51 @@
+# lexo/pool.py - pool de procesos para corridas por lotes (sweeps, Monte Carlo)
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterable, List
+
+# Estado por proceso: se setea una sola vez en el initializer del worker
+_WORKER_FN: Callable[[Any, Any], Any] | None = None
+_WORKER_BASE: Any = None
+
+
+def _init_worker(fn: Callable[[Any, Any], Any], base: Any) -> None:
+    global _WORKER_FN, _WORKER_BASE
+    _WORKER_FN = fn
+    _WORKER_BASE = base
+
+
+def _call_worker(item: Any) -> Any:
+    return _WORKER_FN(_WORKER_BASE, item)
+
+
+def default_workers() -> int:
+    return max(1, os.cpu_count() or 1)
+
+
+def map_with_base(fn: Callable[[Any, Any], Any],
+                  base: Any,
+                  items: Iterable[Any],
+                  workers: int | None = None,
+                  chunksize: int | None = None) -> List[Any]:
+    """
+    Aplica fn(base, item) a cada item y devuelve los resultados EN ORDEN.
+    - base (p.ej. el Runtime de partida) se envía una sola vez por proceso,
+      no una vez por tarea.
+    - fn debe ser una función de módulo (picklable).
+    - workers <= 1 → ejecución serial en el proceso actual (útil en tests).
+    """
+    items = list(items)
+    if not items:
+        return []
+    if workers is None:
+        workers = default_workers()
+    workers = max(1, min(int(workers), len(items)))
+    if workers == 1:
+        return [fn(base, it) for it in items]
+    if chunksize is None:
+        # pocos chunks grandes: amortiza el pickling sin perder balanceo
+        chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_worker,
+                             initargs=(fn, base)) as ex:
+        return list(ex.map(_call_worker, items, chunksize=chunksize))
@@ -0,0 +1,86 @@
+# lexo/propagate.py - PROPAGATE_TRUST: PageRank personalizado sobre GraphArrays
+"""
+Derrame de confianza desde nodos semilla a toda la red:
+
+    x_{k+1} = (1 − d)·e + d·W·D⁻¹·x_k
+
+- e: distribución uniforme sobre las semillas.
+- W: pesos simétricos w = (edge_trust / 100) · edge_level.
+- D: grado ponderado; la masa de nodos sin vecinos vuelve a las semillas.
+
+Cada iteración es un producto matriz-dispersa × vector hecho con dos
+np.bincount sobre las aristas (sin bucles Python por vecino). Se itera hasta
+que ||x_{k+1} − x_k||₁ < tol. El bump de cada nodo es strength · x_i / max(x):
+las semillas reciben ≈ strength y el resto decae con la distancia.
+"""
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+from lexo.arrays import GraphArrays
+
+
+@dataclass
+class PropagationResult:
+    scores: np.ndarray  # x (suma 1)
+    boost: np.ndarray  # bump de confianza aplicado por nodo
+    iterations: int
+    converged: bool
+
+
+def edge_weights(ga: GraphArrays) -> np.ndarray:
+    level = ga.edge_level if ga.edge_level is not None else np.ones_like(ga.edge_trust)
+    return np.clip(ga.edge_trust, 0.0, 100.0) / 100.0 * level
+
+
+def personalized_pagerank(ga: GraphArrays,
+                          seeds: Iterable[int],
+                          damping: float = 0.85,
+                          tol: float = 1e-6,
+                          max_iter: int = 100) -> tuple[np.ndarray, int, bool]:
+    """Devuelve (x, iteraciones, convergió)."""
+    if not 0.0 <= damping < 1.0:
+        raise ValueError("PROPAGATE_TRUST: damping debe estar en [0, 1)")
+    n = ga.n
+    e = np.zeros(n)
+    seeds = sorted(set(int(s) for s in seeds))
+    if not seeds:
+        return e, 0, True
+    e[seeds] = 1.0 / len(seeds)
+
+    keep = ga.src != ga.dst
+    src, dst = ga.src[keep], ga.dst[keep]
+    w = edge_weights(ga)[keep]
+    deg = (np.bincount(src, weights=w, minlength=n) +
+           np.bincount(dst, weights=w, minlength=n))
+    dangling = deg <= 0
+    safe = np.where(dangling, 1.0, deg)
+    # fracción de la masa de un extremo que viaja al otro por cada arista
+    to_src, to_dst = w / safe[dst], w / safe[src]
+
+    x = e.copy()
+    for it in range(1, max(1, int(max_iter)) + 1):
+        spread = (np.bincount(src, weights=to_src * x[dst], minlength=n) +
+                  np.bincount(dst, weights=to_dst * x[src], minlength=n))
+        lost = float(x[dangling].sum())
+        new = (1.0 - damping) * e + damping * (spread + lost * e)
+        delta = float(np.abs(new - x).sum())
+        x = new
+        if delta < tol:
+            return x, it, True
+    return x, it, False
+
+
+def propagate_trust(ga: GraphArrays,
+                    seeds: Iterable[int],
+                    strength: float = 10.0,
+                    damping: float = 0.85,
+                    tol: float = 1e-6,
+                    max_iter: int = 100) -> PropagationResult:
+    """Aplica el bump sobre ga.trust (in-place, recortado a [0, 100])."""
+    x, it, ok = personalized_pagerank(ga, seeds, damping, tol, max_iter)
+    top = float(x.max()) if len(x) else 0.0
+    boost = float(strength) * x / top if top > 0 else np.zeros_like(x)
+    np.clip(ga.trust + boost, 0.0, 100.0, out=ga.trust)
+    return PropagationResult(scores=x, boost=boost, iterations=it, converged=ok)
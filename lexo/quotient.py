@@ -0,0 +1,318 @@
+# lexo/quotient.py - grafo cociente por comunidad (métricas aproximadas rápidas)
+"""
+Cada nodo se asigna a la comunidad (kind == COMMUNITY) más cercana por BFS
+multi-fuente; los que no alcanzan ninguna van a UNASSIGNED. Por comunidad c:
+
+    n_c, trust_sum_c, res_sum_c, G_c (Gini interno), closed_c = Σ tri(v), triads_c = Σ C(d_v, 2)
+
+y entre comunidades: cantidad de aristas y suma de confianza (links).
+
+Métricas sobre el cociente:
+- trust:    Σ trust_sum / n                                   (exacta)
+- cohesion: Σ closed / Σ triads                              (exacta al construir)
+- equity:   Σ|xi − xj| = Σ_c W_c + B + R, con W_c = 2·n_c·S_c·G_c (intra),
+            B = Σ_{c,d} n_c·n_d·|μ_c − μ_d| (entre medias) y R el solapamiento,
+            que se fija al construir → exacta al construir.
+
+apply(acción) actualiza SÓLO agregados (O(1) por acción + O(C log C) al medir):
+confianzas y recursos por nodo son exactos; G_c y R quedan fijos, y un CONNECT
+intra-comunidad suma d_u·d_v / n_c triángulos esperados (0 entre comunidades);
+repetir un CONNECT sobre un par ya unido no cambia los agregados.
+
+Runtime mantiene su cociente cacheado con sync_node / sync_edge desde los
+mismos ganchos que el índice y el watch (valores exactos por nodo, aristas
+nuevas estimadas); sólo lo descarta ante nodos nuevos o escrituras masivas.
+Acciones que necesitan el grafo real (IF, PROPAGATE_TRUST, ...) devuelven False.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Tuple
+
+import networkx as nx
+import numpy as np
+
+from lexo.optimize import INT_BUMPS
+
+UNASSIGNED = "(sin comunidad)"
+
+_LEVELS = {"ALTA": "ALTA", "HIGH": "ALTA", "BAJA": "BAJA", "LOW": "BAJA"}
+
+
+@dataclass
+class Community:
+    n: int = 0
+    trust_sum: float = 0.0
+    res_sum: float = 0.0
+    gini: float = 0.0  # Gini interno al construir (se asume estable)
+    closed: float = 0.0  # Σ tri(v) de sus miembros (cada triángulo cuenta 3 veces)
+    triads: float = 0.0  # Σ C(d_v, 2)
+    edges_in: int = 0
+
+    @property
+    def mean_trust(self) -> float:
+        return self.trust_sum / self.n if self.n else 0.0
+
+
+def assign_members(nodes: Iterable[Hashable],
+                   hubs: Iterable[Hashable],
+                   neighbors: Callable[[Hashable], Iterable[Hashable]]) -> Dict[Hashable, Hashable]:
+    """BFS multi-fuente desde `hubs` (empates: orden de los hubs); resto → UNASSIGNED."""
+    hubs = list(hubs)
+    member = {h: h for h in hubs}
+    queue = deque(hubs)
+    while queue:
+        v = queue.popleft()
+        for w in neighbors(v):
+            if w not in member:
+                member[w] = member[v]
+                queue.append(w)
+    for v in nodes:
+        member.setdefault(v, UNASSIGNED)
+    return member
+
+
+def assign_communities(g: nx.Graph) -> Dict[Hashable, Hashable]:
+    hubs = [v for v, d in g.nodes(data=True) if str(d.get("kind", "")).upper() == "COMMUNITY"]
+    return assign_members(g.nodes(), hubs, g.neighbors)
+
+
+def _pair_sums_by_group(codes: np.ndarray, x: np.ndarray, k: int) -> np.ndarray:
+    """W_c = Σ_{i,j ∈ c} |xi − xj| para todos los grupos en O(n log n)."""
+    if len(x) == 0:
+        return np.zeros(k)
+    order = np.lexsort((x, codes))
+    c, xs = codes[order], x[order]
+    sizes = np.bincount(c, minlength=k)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    rank = np.arange(len(xs)) - starts[c]
+    coef = 2.0 * rank - sizes[c] + 1.0
+    return 2.0 * np.bincount(c, weights=coef * xs, minlength=k)
+
+
+def _between(n: np.ndarray, s: np.ndarray) -> float:
+    """B = Σ_{c,d} n_c·n_d·|μ_c − μ_d| (pares ordenados) en O(C log C)."""
+    ok = n > 0
+    n, s = n[ok].astype(float), s[ok]
+    if len(n) < 2:
+        return 0.0
+    mu = s / n
+    order = np.argsort(mu, kind="stable")
+    n, mu = n[order], mu[order]
+    n_before = np.cumsum(n) - n
+    m_before = np.cumsum(n * mu) - n * mu
+    return float(2.0 * np.sum(n * (mu * n_before - m_before)))
+
+
+@dataclass
+class Quotient:
+    member: Dict[Hashable, Hashable]
+    degree: Dict[Hashable, int]
+    trust: Dict[Hashable, float]
+    resources: Dict[Hashable, float]
+    kind: Dict[Hashable, str]
+    communities: Dict[Hashable, Community]
+    links: Dict[Tuple[Hashable, Hashable], List[float]] = field(default_factory=dict)
+    overlap: float = 0.0  # R: término de solapamiento del Gini (fijo)
+    approximate: bool = False  # True tras aplicar un CONNECT estimado
+    has_edge: Callable[[Hashable, Hashable], bool] | None = None  # graph.has_edge del Runtime
+    added: set = field(default_factory=set)  # pares agregados por apply(CONNECT) en esta copia
+
+    # ---------- construcción ----------
+    @classmethod
+    def from_runtime(cls, rt) -> "Quotient":
+        g = rt.graph
+        member = assign_communities(g)
+        names = list(g.nodes())
+        trust = {v: float(rt._get_node_trust(v)) for v in names}
+        resources = {v: float(rt._get_node_resources(v)) for v in names}
+        kind = {v: str(d.get("kind", "")).upper() for v, d in g.nodes(data=True)}
+        degree = {v: sum(1 for w in g[v] if w != v) for v in names}
+        tri = nx.triangles(g)
+
+        comms: Dict[Hashable, Community] = {}
+        for v in names:
+            c = comms.setdefault(member[v], Community())
+            c.n += 1
+            c.trust_sum += trust[v]
+            c.res_sum += resources[v]
+            c.closed += tri.get(v, 0)
+            c.triads += degree[v] * (degree[v] - 1) / 2
+
+        links: Dict[Tuple[Hashable, Hashable], List[float]] = {}
+        for u, v, d in g.edges(data=True):
+            if u == v:
+                continue
+            cu, cv = member[u], member[v]
+            if cu == cv:
+                comms[cu].edges_in += 1
+            else:
+                key = cls._link_key(cu, cv)
+                slot = links.setdefault(key, [0, 0.0])
+                slot[0] += 1
+                slot[1] += float(d.get("confianza", d.get("trust", 50.0)))
+
+        keys = list(comms)
+        code = {c: i for i, c in enumerate(keys)}
+        codes = np.fromiter((code[member[v]] for v in names), dtype=np.int64, count=len(names))
+        x = np.fromiter((resources[v] for v in names), dtype=float, count=len(names))
+        within = _pair_sums_by_group(codes, x, len(keys))
+        for c, w in zip(keys, within):
+            com = comms[c]
+            com.gini = float(w) / (2.0 * com.n * com.res_sum) if com.res_sum > 0 else 0.0
+        exact = float(_pair_sums_by_group(np.zeros(len(x), dtype=np.int64), x, 1)[0])
+        q = cls(member, degree, trust, resources, kind, comms, links, has_edge=g.has_edge)
+        q.overlap = exact - q._pair_sum_no_overlap()
+        return q
+
+    @staticmethod
+    def _link_key(a, b):
+        return (a, b) if repr(a) <= repr(b) else (b, a)
+
+    def copy(self) -> "Quotient":
+        # member/kind no cambian con las acciones: se comparten
+        return Quotient(self.member, dict(self.degree), dict(self.trust),
+                        dict(self.resources), self.kind,
+                        {c: Community(**vars(com)) for c, com in self.communities.items()},
+                        {k: list(v) for k, v in self.links.items()},
+                        self.overlap, self.approximate, self.has_edge, set(self.added))
+
+    # ---------- métricas ----------
+    def _arrays(self):
+        coms = list(self.communities.values())
+        n = np.array([c.n for c in coms], dtype=float)
+        s = np.array([c.res_sum for c in coms], dtype=float)
+        gini = np.array([c.gini for c in coms], dtype=float)
+        return n, s, gini
+
+    def _pair_sum_no_overlap(self) -> float:
+        n, s, gini = self._arrays()
+        return float(np.sum(2.0 * n * s * gini)) + _between(n, s)
+
+    def values(self) -> Tuple[float, float, float]:
+        """(trust, cohesion, equity) sin redondear, como IncrementalMetrics.values()."""
+        n_total = sum(c.n for c in self.communities.values())
+        trust = sum(c.trust_sum for c in self.communities.values()) / n_total if n_total else 0.0
+        closed = sum(c.closed for c in self.communities.values())
+        triads = sum(c.triads for c in self.communities.values())
+        cohesion = 100.0 * closed / triads if closed and triads else 0.0
+        res = sum(c.res_sum for c in self.communities.values())
+        equity = 0.0
+        if n_total and res > 0:
+            pair = self._pair_sum_no_overlap() + self.overlap
+            gini = max(0.0, min(1.0, pair / (2.0 * n_total * res)))
+            equity = 100.0 * (1.0 - gini)
+        return trust, cohesion, equity
+
+    def metrics(self) -> Dict[str, float]:
+        t, c, e = self.values()
+        return {"trust": round(t, 2), "cohesion": round(c, 2), "equity": round(e, 2)}
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Super-nodos para el reporte."""
+        return [{"community": c, "n": com.n, "mean_trust": round(com.mean_trust, 2),
+                 "resources": round(com.res_sum, 2), "edges_in": com.edges_in,
+                 "links": {str(b if a == c else a): int(w[0]) for (a, b), w in self.links.items()
+                           if c in (a, b)}}
+                for c, com in self.communities.items()]
+
+    # ---------- acciones (sólo agregados) ----------
+    def _set_trust(self, v, new: float) -> None:
+        new = max(0.0, min(100.0, float(new)))
+        self.communities[self.member[v]].trust_sum += new - self.trust[v]
+        self.trust[v] = new
+
+    def _set_resources(self, v, new: float) -> None:
+        new = max(0.0, float(new))
+        self.communities[self.member[v]].res_sum += new - self.resources[v]
+        self.resources[v] = new
+
+    def _connect(self, a, b, props) -> None:
+        if a == b:
+            return
+        pair = frozenset((a, b))
+        if pair in self.added or (self.has_edge is not None and self.has_edge(a, b)):
+            return  # re-CONNECT: el grafo sólo actualiza la confianza de la arista
+        self.added.add(pair)
+        self._add_edge(a, b, props)
+
+    def _add_edge(self, a, b, props) -> None:
+        ca, cb = self.member[a], self.member[b]
+        da, db = self.degree[a], self.degree[b]
+        self.communities[ca].triads += da
+        self.communities[cb].triads += db
+        if ca == cb:
+            com = self.communities[ca]
+            # triángulos esperados: vecinos comunes ≈ d_a·d_b / n_c (acotado)
+            common = min(da, db, da * db / max(com.n, 1))
+            com.closed += 3.0 * common  # tri(a), tri(b) y tri(tercero): +1 c/u
+            com.edges_in += 1
+        else:
+            slot = self.links.setdefault(self._link_key(ca, cb), [0, 0.0])
+            slot[0] += 1
+            slot[1] += float(props.get("confianza", props.get("trust", 50.0)))
+        self.degree[a] = da + 1
+        self.degree[b] = db + 1
+        self.approximate = True
+
+    # ---------- mantenimiento desde el Runtime (cache de rt.quotient()) ----------
+    def sync_node(self, v, trust: float, resources: float) -> bool:
+        """Valores exactos de un nodo tras una acción; False si el nodo es nuevo."""
+        if v not in self.member:
+            return False
+        self._set_trust(v, trust)
+        self._set_resources(v, resources)
+        return True
+
+    def sync_edge(self, u, v, degree_u: int, props) -> bool:
+        """
+        Arista tocada en el grafo real (ya aplicada). Si el grado de u creció es
+        nueva y se estima su aporte como en apply(CONNECT); si no, sólo cambió
+        su confianza. False si algún extremo es nuevo.
+        """
+        if u not in self.member or v not in self.member:
+            return False
+        if u != v and degree_u != self.degree[u]:
+            self._add_edge(u, v, props)
+        return True
+
+    def apply(self, act: Tuple) -> bool:
+        """Aplica una acción del AST; False si requiere el grafo completo."""
+        tag = act[0]
+        if tag == "CONNECT":
+            _, a, b, props = act
+            if a not in self.member or b not in self.member:
+                return False  # nodo fuera del cociente (p.ej. creado en el mismo WHAT_IF)
+            self._connect(a, b, props or {})
+            return True
+        if tag in ("STRENGTHEN_TIES", "CARE_NETWORK"):
+            _, target, props = act
+            level = str(props.get("intensity", props.get("intensidad", "MEDIA")) or "MEDIA").upper()
+            bump = INT_BUMPS[_LEVELS.get(level, "MEDIA")][0]
+            if target in self.trust:
+                self._set_trust(target, self.trust[target] + bump)
+            return True
+        if tag == "LAUNCH_INITIATIVE":
+            _, _, props = act
+            inc = int(props.get("trust_boost", 15))
+            target = props.get("target") or props.get("community") or props.get("COMMUNITY")
+            targets = [target] if target else [v for v, k in self.kind.items() if k == "COMMUNITY"]
+            for v in targets:
+                if v in self.trust:
+                    self._set_trust(v, self.trust[v] + inc)
+            return True
+        if tag == "REDISTRIBUTE_RESOURCES":
+            _, giver, receiver, props = act
+            if giver not in self.resources or receiver not in self.resources:
+                return True
+            fraction = float(props.get("fraction", props.get("fraccion", 0.2)))
+            min_left = float(props.get("min_left", props.get("minimo", 2.0)))
+            g = self.resources[giver]
+            move = max(0.0, min(g - min_left, g * fraction)) if g > min_left else 0.0
+            if move > 0:
+                self._set_resources(giver, g - move)
+                self._set_resources(receiver, self.resources[receiver] + move)
+            return True
+        # acciones sin efecto sobre métricas
+        if tag in ("MEASURE_IMPACT", "SHOW_NETWORK", "COMPARE"):
+            return True
+        return False
@@ -0,0 +1,154 @@
+# lexo/reports.py - formatos del reporte de corrida (run_*.json) y escritor en streaming
+"""
+El grueso de run_*.json en grafos grandes son los mapas por nodo de
+"resources" (by_node, percentages, community_percentages). NodeTable guarda
+esos datos como tres listas paralelas y los mapas se generan al escribir,
+nodo por nodo, sin armar los dicts ni el JSON completo en memoria.
+
+Formatos (write_report):
+    json     el de siempre: indent=2, payload completo (único que materializa dicts)
+    compact  JSON sin espacios, escrito en streaming
+    gzip     compact comprimido (.json.gz)
+    ndjson   línea 1: la corrida ({"type": "run", ...} sin mapas por nodo);
+             luego una línea por nodo {"type": "node", "id", "resources", "pct", "community"}
+
+Perfiles:
+    full     con mapas por nodo
+    summary  sin mapas por nodo: resources = {"total", "nodes"} (cantidad)
+
+Con perfil full, compact y gzip cargan (json.load) exactamente al mismo
+contenido que el json de siempre; ndjson lleva los mismos datos por nodo.
+"""
+import gzip
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Tuple
+
+FORMATS = ("json", "compact", "gzip", "ndjson")
+PROFILES = ("full", "summary")
+_SUFFIX = {"json": ".json", "compact": ".json", "gzip": ".json.gz", "ndjson": ".ndjson"}
+_COMPACT = {"ensure_ascii": False, "separators": (",", ":")}
+
+
+@dataclass(frozen=True)
+class NodeTable:
+    """Recursos finales por nodo (mismo redondeo que el reporte histórico)."""
+    names: Tuple[Any, ...]
+    resources: Tuple[float, ...]  # redondeados a 2 decimales
+    community: Tuple[bool, ...]
+    total: float
+
+    @classmethod
+    def from_runtime(cls, rt) -> "NodeTable":
+        names, res, comm = [], [], []
+        total = 0.0
+        for n, d in rt.graph.nodes(data=True):
+            r = round(float(d.get("resources", d.get("recursos", 0.0))), 2)
+            names.append(n)
+            res.append(r)
+            comm.append(str(d.get("kind", "")).upper() == "COMMUNITY")
+            total += r
+        return cls(tuple(names), tuple(res), tuple(comm), round(total, 2))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def pct(self, r: float) -> float:
+        return round((r / self.total) * 100.0, 2) if self.total > 0 else 0.0
+
+    def by_node(self) -> Iterator[Tuple[Any, float]]:
+        return zip(self.names, self.resources)
+
+    def percentages(self) -> Iterator[Tuple[Any, float]]:
+        return ((n, self.pct(r)) for n, r in zip(self.names, self.resources))
+
+    def community_percentages(self) -> Iterator[Tuple[Any, float]]:
+        return ((n, self.pct(r)) for n, r, c in zip(self.names, self.resources, self.community) if c)
+
+    def summary(self) -> Dict[str, Any]:
+        return {"total": self.total, "nodes": len(self)}
+
+    def as_dict(self) -> Dict[str, Any]:
+        """El bloque "resources" materializado (formato json y consumidores como --store)."""
+        return {"total": self.total,
+                "by_node": dict(self.by_node()),
+                "percentages": dict(self.percentages()),
+                "community_percentages": dict(self.community_percentages())}
+
+
+def report_path(base: str, fmt: str) -> str:
+    """'run_x.json' → 'run_x.json.gz' / 'run_x.ndjson' según el formato."""
+    stem = base[:-len(".json")] if base.endswith(".json") else base
+    return stem + _SUFFIX[fmt]
+
+
+def write_report(path: str, payload: Dict[str, Any], nodes: NodeTable,
+                 fmt: str = "json", profile: str = "full") -> str:
+    """
+    Escribe payload + bloque "resources" (de nodes) en path con el formato pedido.
+    Devuelve la ruta efectiva (report_path).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"formato de reporte desconocido: {fmt!r} (usar {FORMATS})")
+    if profile not in PROFILES:
+        raise ValueError(f"perfil de reporte desconocido: {profile!r} (usar {PROFILES})")
+    path = report_path(path, fmt)
+    full = profile == "full"
+
+    if fmt == "json":
+        data = dict(payload, resources=nodes.as_dict() if full else nodes.summary())
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return path
+
+    opener = gzip.open if fmt == "gzip" else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        if fmt == "ndjson":
+            f.write(json.dumps(dict(payload, type="run", resources=nodes.summary()), **_COMPACT))
+            f.write("\n")
+            if full:
+                for n, r, c in zip(nodes.names, nodes.resources, nodes.community):
+                    f.write(json.dumps({"type": "node", "id": n, "resources": r,
+                                        "pct": nodes.pct(r), "community": c}, **_COMPACT))
+                    f.write("\n")
+            return path
+
+        f.write("{")
+        for k, v in payload.items():
+            f.write(json.dumps(k) + ":" + json.dumps(v, **_COMPACT) + ",")
+        f.write('"resources":')
+        if not full:
+            f.write(json.dumps(nodes.summary(), **_COMPACT))
+        else:
+            f.write('{"total":' + json.dumps(nodes.total))
+            for key, items in (("by_node", nodes.by_node()), ("percentages", nodes.percentages()),
+                               ("community_percentages", nodes.community_percentages())):
+                f.write(f',"{key}":')
+                _write_map(f, items)
+            f.write("}")
+        f.write("}")
+    return path
+
+
+def _write_map(f, items, batch: int = 4096) -> None:
+    # nombres de nodo → claves string, como hace json.dump con un dict
+    f.write("{")
+    buf, sep = [], ""
+    for k, v in items:
+        buf.append(json.dumps(str(k), ensure_ascii=False) + ":" + json.dumps(v))
+        if len(buf) >= batch:
+            f.write(sep + ",".join(buf))
+            buf.clear()
+            sep = ","
+    if buf:
+        f.write(sep + ",".join(buf))
+    f.write("}")
+
+
+def read_ndjson(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """(corrida, nodos) de un reporte ndjson (acepta .gz)."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        run = json.loads(f.readline())
+        nodes = [json.loads(line) for line in f if line.strip()]
+    return run, nodes
@@ -0,0 +1,125 @@
+# lexo/robustness.py - ROBUSTNESS: impacto de quitar cada nodo o arista
+"""
+Leave-one-out incremental sobre IncrementalMetrics (sin clonar ni medir N veces):
+
+- trust:    (S − t_v) / (n − 1)
+- cohesion: quitar v borra tri(v) triángulos y C(d_v, 2) tríadas propias, y cada
+            vecino w pierde d_w − 1 tríadas. Quitar la arista (u, v) borra
+            |N(u) ∩ N(v)| triángulos y (d_u − 1) + (d_v − 1) tríadas.
+- equity:   Σ|xi − xj| pierde 2·D(x_v), con D(x) = Σ_j |x − xj| vectorizado
+            con searchsorted + prefijos sobre el arreglo ordenado.
+
+tri(v) sale de un único pase O(Σ deg²) por intersección de vecindarios.
+"""
+import csv
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+
+from lexo.incremental import IncrementalMetrics
+from lexo.sweep import METRICS
+
+
+@dataclass
+class Impact:
+    kind: str  # "node" | "edge"
+    target: Any  # nodo o (u, v)
+    delta: Dict[str, float]  # métrica tras quitar − métrica actual
+
+    @property
+    def score(self) -> float:
+        """Vulnerabilidad: suma de las caídas (las subas no compensan)."""
+        return -sum(min(0.0, d) for d in self.delta.values())
+
+
+def node_triangles(adj) -> Dict[Any, int]:
+    """Triángulos que pasan por cada nodo."""
+    return {v: sum(len(nb & adj[w]) for w in nb) // 2 for v, nb in adj.items()}
+
+
+def abs_deviations(state: IncrementalMetrics, values: np.ndarray) -> np.ndarray:
+    """D(x) = Σ_j |x − xj| para cada x de `values` (vectorizado)."""
+    n = len(state.xs)
+    c = np.searchsorted(state.xs, values, side="left")
+    below = state.prefix[c]
+    return values * c - below + (state.res_sum - below) - values * (n - c)
+
+
+def _equity(pair_sum, res_sum, n):
+    safe = np.where((res_sum > 0) & (n > 0), 2.0 * n * res_sum, 1.0)
+    gini = np.clip(pair_sum / safe, 0.0, 1.0)
+    return np.where((res_sum > 0) & (n > 0), 100.0 * (1.0 - gini), 0.0)
+
+
+def _cohesion(triangles, triads):
+    ok = (triangles > 0) & (triads > 0)
+    return np.where(ok, 300.0 * triangles / np.where(triads > 0, triads, 1), 0.0)
+
+
+def node_impacts(state: IncrementalMetrics, tri: Dict[Any, int] | None = None,
+                 dev: np.ndarray | None = None) -> List[Impact]:
+    """tri (node_triangles) y dev (abs_deviations, en el orden de state.trust)
+    se pueden pasar si ya están calculados (ver lexo/attribution.py)."""
+    nodes = list(state.trust)
+    n = len(nodes)
+    if n == 0:
+        return []
+    trust0, coh0, eq0 = state.values()
+    adj = state.adj
+    deg = {v: len(adj.get(v, ())) for v in nodes}
+    tri = node_triangles(adj) if tri is None else tri
+
+    t = np.array([state.trust[v] for v in nodes], dtype=float)
+    x = np.array([state.resources[v] for v in nodes], dtype=float)
+    d = np.array([deg[v] for v in nodes], dtype=float)
+    tv = np.array([tri.get(v, 0) for v in nodes], dtype=float)
+    nb_loss = np.array([sum(deg[w] - 1 for w in adj.get(v, ())) for v in nodes], dtype=float)
+
+    rest = n - 1
+    trust = np.where(rest > 0, (state.trust_sum - t) / max(rest, 1), 0.0)
+    cohesion = _cohesion(state.triangles - tv, state.triads - d * (d - 1) / 2 - nb_loss)
+    dev = abs_deviations(state, x) if dev is None else dev
+    equity = _equity(state.pair_sum - 2.0 * dev,
+                     state.res_sum - x, rest)
+
+    out = []
+    for k, v in enumerate(nodes):
+        out.append(Impact("node", v, {"trust": float(trust[k] - trust0),
+                                      "cohesion": float(cohesion[k] - coh0),
+                                      "equity": float(equity[k] - eq0)}))
+    return out
+
+
+def edge_impacts(state: IncrementalMetrics) -> List[Impact]:
+    """Quitar una arista sólo mueve la cohesión (trust/equity son nodales)."""
+    _, coh0, _ = state.values()
+    adj = state.adj
+    order = {v: i for i, v in enumerate(adj)}
+    out = []
+    for u, nb in adj.items():
+        for v in nb:
+            if order[u] > order[v]:  # cada arista no dirigida una vez
+                continue
+            common = len(nb & adj[v])
+            triangles = state.triangles - common
+            triads = state.triads - (len(nb) - 1) - (len(adj[v]) - 1)
+            coh = 300.0 * triangles / triads if triangles and triads else 0.0
+            out.append(Impact("edge", (u, v), {"trust": 0.0, "cohesion": coh - coh0,
+                                               "equity": 0.0}))
+    return out
+
+
+def rank(impacts: List[Impact], top: int | None = None) -> List[Impact]:
+    ranked = sorted(impacts, key=lambda im: (-im.score, repr(im.target)))
+    return ranked[:top] if top else ranked
+
+
+def save_csv(impacts: List[Impact], path: str) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["kind", "target", "score"] + [f"d_{m}" for m in METRICS])
+        for im in impacts:
+            target = "–".join(map(str, im.target)) if im.kind == "edge" else im.target
+            w.writerow([im.kind, target, round(im.score, 4)] +
+                       [round(im.delta[m], 4) for m in METRICS])
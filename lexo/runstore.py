@@ -0,0 +1,290 @@
+# lexo/runstore.py - base de corridas indexada (SQLite por defecto, vía SQLAlchemy)
+"""
+Cada corrida queda en una base en vez de repartida en run_*.json, report.csv,
+blockade_summary.json y CHANGELOG.md:
+
+    runs          id, created_at, source, status (OK/BLOCKED), lint_status
+    run_metrics   métricas finales por corrida (una columna por métrica)
+    run_alerts    alertas éticas y fallas del blocker
+    run_whatifs   WHAT_IF: base/new/delta/% por (escenario, métrica)
+    run_resources recursos finales por nodo (+ % y si es comunidad)
+
+Índices en tiempo, estado, (estado, tiempo) y cada métrica, así
+"bloqueadas la última semana con equity < 60" es una consulta indexada.
+Cada corrida se escribe en UNA transacción (add_all + commit).
+
+Misma configuración que app.py (DeclarativeBase de SQLAlchemy 2.x, URL de
+entorno, pool_recycle/pool_pre_ping) pero sin importar app: eso levantaría
+Flask y sus rutas en cada corrida del CLI.
+
+    python -m lexo.runstore --status BLOCKED --since 2025-10-12 --max equity=60
+    python -m lexo.runstore --import .     # carga el historial de archivos
+"""
+import argparse
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import (Boolean, DateTime, Float, ForeignKey, Index, Integer, String, Text,
+                        create_engine, select)
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, relationship
+
+METRICS = ("trust", "cohesion", "equity")
+DEFAULT_URL = "sqlite:///instance/runs.db"
+ENGINE_OPTIONS = {"pool_recycle": 300, "pool_pre_ping": True}  # como app.py
+
+
+class RunBase(DeclarativeBase):
+    pass
+
+
+class Run(RunBase):
+    __tablename__ = "runs"
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, index=True)
+    source: Mapped[str | None] = mapped_column(String(255))
+    status: Mapped[str | None] = mapped_column(String(16), index=True)
+    lint_status: Mapped[str | None] = mapped_column(String(16))
+    metrics: Mapped["RunMetrics"] = relationship(back_populates="run", cascade="all, delete-orphan",
+                                                 uselist=False)
+    alerts: Mapped[List["RunAlert"]] = relationship(cascade="all, delete-orphan")
+    whatifs: Mapped[List["RunWhatIf"]] = relationship(cascade="all, delete-orphan")
+    resources: Mapped[List["RunResource"]] = relationship(cascade="all, delete-orphan")
+
+    __table_args__ = (Index("ix_runs_status_created", "status", "created_at"),)
+
+    def to_dict(self) -> Dict[str, Any]:
+        m = self.metrics
+        return {"id": self.id, "created_at": self.created_at.isoformat(sep=" "),
+                "source": self.source, "status": self.status, "lint_status": self.lint_status,
+                "metrics": {k: getattr(m, k) for k in METRICS} if m is not None else {}}
+
+
+class RunMetrics(RunBase):
+    __tablename__ = "run_metrics"
+    run_id: Mapped[str] = mapped_column(ForeignKey("runs.id", ondelete="CASCADE"), primary_key=True)
+    trust: Mapped[float | None] = mapped_column(Float, index=True)
+    cohesion: Mapped[float | None] = mapped_column(Float, index=True)
+    equity: Mapped[float | None] = mapped_column(Float, index=True)
+    run: Mapped[Run] = relationship(back_populates="metrics")
+
+
+class RunAlert(RunBase):
+    __tablename__ = "run_alerts"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    run_id: Mapped[str] = mapped_column(ForeignKey("runs.id", ondelete="CASCADE"), index=True)
+    kind: Mapped[str] = mapped_column(String(16))  # "ethics" | "blocker"
+    metric: Mapped[str | None] = mapped_column(String(32))
+    value: Mapped[float | None] = mapped_column(Float)
+    required: Mapped[float | None] = mapped_column(Float)
+    message: Mapped[str] = mapped_column(Text)
+
+
+class RunWhatIf(RunBase):
+    __tablename__ = "run_whatifs"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    run_id: Mapped[str] = mapped_column(ForeignKey("runs.id", ondelete="CASCADE"), index=True)
+    title: Mapped[str] = mapped_column(String(255))
+    metric: Mapped[str] = mapped_column(String(32))
+    base: Mapped[float | None] = mapped_column(Float)
+    new: Mapped[float | None] = mapped_column(Float)
+    delta: Mapped[float | None] = mapped_column(Float)
+    pct: Mapped[float | None] = mapped_column(Float)
+
+
+class RunResource(RunBase):
+    __tablename__ = "run_resources"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    run_id: Mapped[str] = mapped_column(ForeignKey("runs.id", ondelete="CASCADE"), index=True)
+    node: Mapped[str] = mapped_column(String(255))
+    amount: Mapped[float] = mapped_column(Float)
+    pct: Mapped[float] = mapped_column(Float)
+    community: Mapped[bool] = mapped_column(Boolean, default=False)
+
+
+def store_url(url: str | None = None) -> str:
+    """URL explícita > LEXO_RUNS_URL > sqlite:///instance/runs.db (rutas sueltas → sqlite)."""
+    url = url or os.environ.get("LEXO_RUNS_URL") or DEFAULT_URL
+    return url if "://" in url else f"sqlite:///{url}"
+
+
+class RunStore:
+
+    def __init__(self, url: str | None = None):
+        self.url = store_url(url)
+        if self.url.startswith("sqlite:///"):
+            folder = os.path.dirname(self.url[len("sqlite:///"):])
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self.engine = create_engine(self.url)
+        else:
+            self.engine = create_engine(self.url, **ENGINE_OPTIONS)
+        RunBase.metadata.create_all(self.engine)
+
+    # ---------- escritura ----------
+    def record_run(self, run_id: str, report: Dict[str, Any], status: str | None = None,
+                   fails: Sequence[Tuple[str, float, float]] = (), lint_status: str | None = None,
+                   source: str | None = None, created_at: datetime | None = None) -> Run:
+        """
+        Guarda una corrida completa en una sola transacción. report es el payload
+        que arma execute() (final_metrics, ethics_alerts, what_if, resources);
+        re-grabar el mismo run_id lo reemplaza.
+        """
+        run = Run(id=str(run_id), created_at=created_at or datetime.now(), source=source,
+                  status=status, lint_status=lint_status)
+        final = report.get("final_metrics") or {}
+        run.metrics = RunMetrics(**{k: _num(final.get(k)) for k in METRICS})
+        run.alerts = [RunAlert(kind="ethics", message=str(a)) for a in report.get("ethics_alerts") or []]
+        run.alerts += [RunAlert(kind="blocker", metric=m, value=_num(v), required=_num(r),
+                                message=f"{m}={_fmt(v)} < {_fmt(r)}") for m, v, r in fails]
+        run.whatifs = [RunWhatIf(title=w.get("title", ""), metric=k,
+                                 base=_num((w.get("base") or {}).get(k)),
+                                 new=_num((w.get("new") or {}).get(k)),
+                                 delta=_num((w.get("deltas") or {}).get(k)),
+                                 pct=_num((w.get("pct") or {}).get(k)))
+                       for w in report.get("what_if") or []
+                       for k in (w.get("deltas") or w.get("new") or {})]
+        res = report.get("resources") or {}
+        pct, comm = res.get("percentages") or {}, res.get("community_percentages") or {}
+        run.resources = [RunResource(node=str(n), amount=float(a), pct=float(pct.get(n, 0.0)),
+                                     community=n in comm)
+                         for n, a in (res.get("by_node") or {}).items()]
+        with Session(self.engine, expire_on_commit=False) as s, s.begin():
+            old = s.get(Run, run.id)
+            if old is not None:
+                s.delete(old)
+                s.flush()
+            s.add(run)
+        return run
+
+    def import_history(self, history) -> int:
+        """Vuelca un lexo.calibrate.History (archivos viejos) en una transacción."""
+        runs = []
+        seen = set()
+        for key, src, st, row in zip(history.keys, history.sources, history.status, history.metrics):
+            rid = f"{src}:{key}"
+            n = 2
+            while rid in seen:
+                rid, n = f"{src}:{key}#{n}", n + 1
+            seen.add(rid)
+            run = Run(id=rid, created_at=_from_key(key), source=src,
+                      status={1: "BLOCKED", 0: "OK"}.get(int(st)))
+            run.metrics = RunMetrics(**{k: (None if v != v else float(v)) for k, v in zip(METRICS, row)})
+            runs.append(run)
+        with Session(self.engine) as s, s.begin():
+            for run in runs:
+                s.merge(run)
+        return len(runs)
+
+    # ---------- consulta ----------
+    def find_runs(self, status: str | None = None, since: datetime | None = None,
+                  until: datetime | None = None, max_metrics: Dict[str, float] | None = None,
+                  min_metrics: Dict[str, float] | None = None, limit: int | None = None) -> List[Run]:
+        """Corridas filtradas por estado, rango de tiempo y métricas (max: <, min: >=)."""
+        q = select(Run).join(RunMetrics, isouter=True).order_by(Run.created_at.desc())
+        if status:
+            q = q.where(Run.status == status.upper())
+        if since is not None:
+            q = q.where(Run.created_at >= since)
+        if until is not None:
+            q = q.where(Run.created_at < until)
+        for k, v in (max_metrics or {}).items():
+            q = q.where(getattr(RunMetrics, _metric(k)) < float(v))
+        for k, v in (min_metrics or {}).items():
+            q = q.where(getattr(RunMetrics, _metric(k)) >= float(v))
+        if limit:
+            q = q.limit(limit)
+        with Session(self.engine, expire_on_commit=False) as s:
+            runs = list(s.scalars(q))
+            for r in runs:
+                _ = r.metrics  # cargar antes de cerrar la sesión
+            return runs
+
+    def get(self, run_id: str) -> Dict[str, Any] | None:
+        with Session(self.engine) as s:
+            run = s.get(Run, run_id)
+            if run is None:
+                return None
+            out = run.to_dict()
+            out["alerts"] = [{"kind": a.kind, "metric": a.metric, "message": a.message} for a in run.alerts]
+            out["what_if"] = [{"title": w.title, "metric": w.metric, "base": w.base, "new": w.new,
+                               "delta": w.delta, "pct": w.pct} for w in run.whatifs]
+            out["resources"] = {r.node: r.amount for r in run.resources}
+            return out
+
+
+def _num(v) -> float | None:
+    try:
+        return None if v is None else float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _fmt(v) -> str:
+    try:
+        return f"{float(v):.2f}"
+    except (TypeError, ValueError):
+        return str(v)
+
+
+def _metric(k: str) -> str:
+    if k not in METRICS:
+        raise ValueError(f"métrica desconocida: {k!r} (usar {METRICS})")
+    return k
+
+
+def _from_key(key: str) -> datetime:
+    try:
+        return datetime.strptime(key[:14], "%Y%m%d%H%M%S")
+    except ValueError:
+        return datetime.now()
+
+
+def _parse_bounds(items: Iterable[str]) -> Dict[str, float]:
+    out = {}
+    for item in items:
+        k, _, v = item.partition("=")
+        out[_metric(k.strip())] = float(v)
+    return out
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m lexo.runstore",
+                                 description="Consulta la base de corridas.")
+    ap.add_argument("--db", default=None, help=f"URL o ruta SQLite (default: $LEXO_RUNS_URL o {DEFAULT_URL}).")
+    ap.add_argument("--status", default=None, help="OK | BLOCKED")
+    ap.add_argument("--since", default=None, help="YYYY-MM-DD[ HH:MM:SS] o Nd (últimos N días).")
+    ap.add_argument("--until", default=None, help="YYYY-MM-DD[ HH:MM:SS]")
+    ap.add_argument("--max", action="append", default=[], metavar="METRIC=V", help="métrica < V")
+    ap.add_argument("--min", action="append", default=[], metavar="METRIC=V", help="métrica >= V")
+    ap.add_argument("--limit", type=int, default=50)
+    ap.add_argument("--import", dest="import_root", default=None, metavar="DIR",
+                    help="Importar run_*.json / blockade_summary.json / CHANGELOG.md de DIR.")
+    args = ap.parse_args(argv)
+
+    store = RunStore(args.db)
+    if args.import_root:
+        from lexo.calibrate import load_history
+        n = store.import_history(load_history(args.import_root))
+        print(f"[OK] {n} corrida(s) importadas en {store.url}")
+        return 0
+
+    def when(text):
+        if text is None:
+            return None
+        if text.endswith("d") and text[:-1].isdigit():
+            return datetime.now() - timedelta(days=int(text[:-1]))
+        return datetime.fromisoformat(text)
+
+    runs = store.find_runs(args.status, when(args.since), when(args.until),
+                           _parse_bounds(args.max), _parse_bounds(args.min), args.limit)
+    for r in runs:
+        d = r.to_dict()
+        mv = " ".join(f"{k}={v:.2f}" for k, v in d["metrics"].items() if v is not None)
+        print(f"{d['created_at']}  {d['status'] or '-':<8} {d['id']:<28} {mv}")
+    print(f"== {len(runs)} corrida(s) ==")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
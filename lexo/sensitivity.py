@@ -0,0 +1,197 @@
+# lexo/sensitivity.py - sensibilidad de métricas finales respecto de parámetros de acciones
+"""
+Diferencias finitas sobre cada parámetro de cada acción del programa:
+
+    dM/dp ≈ (M(p + h) − M(p − h)) / 2h      (unilateral en los bordes)
+
+Las corridas perturbadas comparten el prefijo sin cambios: se ejecuta la
+corrida base acción por acción y, al llegar a una acción con parámetros, se
+toma un checkpoint (clone) desde el que sólo se re-ejecuta la acción
+perturbada + el sufijo. Costo: Σ_k 2·|params_k|·|sufijo_k| acciones en vez
+de 2·|params| corridas completas.
+"""
+import csv
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from lexo.sweep import METRICS
+
+LEVELS = ["BAJA", "MEDIA", "ALTA"]  # orden de intensidades (paso = 1 nivel)
+
+# (tag, clave en props) → paso absoluto
+STEPS: Dict[Tuple[str, str], float] = {
+    ("REDISTRIBUTE_RESOURCES", "fraction"): 0.01,
+    ("REDISTRIBUTE_RESOURCES", "min_left"): 0.5,
+    ("LAUNCH_INITIATIVE", "trust_boost"): 1.0,
+    ("CONNECT", "trust"): 1.0,
+    ("STRENGTHEN_TIES", "intensity"): 1.0,
+    ("CARE_NETWORK", "intensity"): 1.0,
+    ("PROPAGATE_TRUST", "strength"): 1.0,
+    ("PROPAGATE_TRUST", "damping"): 0.01,
+}
+
+# Defaults del executor (para parámetros omitidos en el .lexo)
+DEFAULTS: Dict[Tuple[str, str], Any] = {
+    ("REDISTRIBUTE_RESOURCES", "fraction"): 0.2,
+    ("REDISTRIBUTE_RESOURCES", "min_left"): 2.0,
+    ("LAUNCH_INITIATIVE", "trust_boost"): 15,
+    ("CONNECT", "trust"): 50.0,
+    ("STRENGTHEN_TIES", "intensity"): "MEDIA",
+    ("CARE_NETWORK", "intensity"): "MEDIA",
+    ("PROPAGATE_TRUST", "strength"): 10.0,
+    ("PROPAGATE_TRUST", "damping"): 0.85,
+}
+
+# Confianza de aristas: ninguna métrica la lee directo (trust es nodal, cohesion
+# es topológica, equity es de recursos), así que su gradiente es 0 salvo que una
+# acción posterior la use como peso. Sólo se perturba en ese caso.
+EDGE_TRUST_PARAMS = {("CONNECT", "trust")}
+EDGE_TRUST_READERS = {"PROPAGATE_TRUST", "SIMULATE_TICKS"}
+
+# alias ES/EN que el parser deja tal cual en props
+_ALIASES = {
+    "trust": ("trust", "confianza"),
+    "intensity": ("intensity", "intensidad"),
+    "fraction": ("fraction", "fraccion"),
+    "min_left": ("min_left", "minimo"),
+    "trust_boost": ("trust_boost",),
+    "strength": ("strength", "fuerza"),
+    "damping": ("damping", "amortiguacion", "amortiguación"),
+}
+
+_NORM_LEVEL = {"HIGH": "ALTA", "MEDIUM": "MEDIA", "LOW": "BAJA"}
+
+
+def _props(action: Tuple) -> Dict[str, Any]:
+    return action[-1] if action and isinstance(action[-1], dict) else {}
+
+
+def _lookup(props: Dict[str, Any], name: str) -> Tuple[str | None, Any]:
+    for key in _ALIASES.get(name, (name,)):
+        if key in props:
+            return key, props[key]
+    return None, None
+
+
+def action_params(action: Tuple, suffix: Sequence[Tuple] = ()) -> List[str]:
+    """Nombres canónicos de parámetros perturbables de una acción (suffix: acciones siguientes)."""
+    tag = action[0]
+    reads_edges = any(a[0] in EDGE_TRUST_READERS for a in suffix)
+    return [p for (t, p) in STEPS
+            if t == tag and (reads_edges or (t, p) not in EDGE_TRUST_PARAMS)]
+
+
+def param_value(action: Tuple, name: str) -> Any:
+    _, v = _lookup(_props(action), name)
+    return DEFAULTS[(action[0], name)] if v is None else v
+
+
+def perturb(action: Tuple, name: str, direction: int) -> Tuple[Tuple, float] | None:
+    """
+    Acción con el parámetro movido un paso en `direction` (±1).
+    Devuelve (acción, desplazamiento efectivo) o None si se sale de rango.
+    """
+    tag = action[0]
+    step = STEPS[(tag, name)]
+    props = dict(_props(action))
+    key, _ = _lookup(props, name)
+    key = key or name
+    value = param_value(action, name)
+
+    if name == "intensity":
+        level = _NORM_LEVEL.get(str(value).upper(), str(value).upper())
+        idx = LEVELS.index(level) if level in LEVELS else 1
+        new_idx = idx + direction
+        if not 0 <= new_idx < len(LEVELS):
+            return None
+        props[key] = LEVELS[new_idx]
+        shift = float(direction)
+    else:
+        new = float(value) + direction * step
+        if new < 0 or (name == "fraction" and new > 1) or (name == "damping" and new >= 1):
+            return None
+        props[key] = new
+        shift = direction * step
+    return action[:-1] + (props,), shift
+
+
+@dataclass
+class SensitivityRow:
+    index: int  # posición de la acción en ast.actions
+    action: str  # tag + destino legible
+    param: str
+    value: Any
+    step: float
+    grad: Dict[str, float]  # métrica → dM/dp
+
+
+def _label(action: Tuple) -> str:
+    names = [str(x) for a in action[1:]
+             for x in (a if isinstance(a, tuple) else (a,)) if isinstance(x, str)]
+    return f"{action[0]}(" + ", ".join(names) + ")"
+
+
+def analyze(base: Any,
+            actions: Sequence[Tuple],
+            run: Callable[[Any, Sequence[Tuple]], None],
+            measure: Callable[[Any], Tuple[float, ...]]) -> Tuple[Dict[str, float], List[SensitivityRow]]:
+    """
+    base: runtime con las declaraciones ya cargadas (se muta: queda en el estado final).
+    run(rt, actions): ejecuta acciones sobre rt.
+    measure(rt): métricas SIN redondear en orden METRICS.
+    Devuelve (métricas finales base, filas de sensibilidad).
+    """
+    actions = list(actions)
+    rows: List[SensitivityRow] = []
+    pending = []  # (k, param, valor, {dir: (métricas, shift)})
+
+    rt = base
+    for k, act in enumerate(actions):
+        suffix = actions[k + 1:]
+        params = action_params(act, suffix)
+        if params:
+            checkpoint = rt.clone()
+            for p in params:
+                runs = {}
+                for direction in (-1, 1):
+                    moved = perturb(act, p, direction)
+                    if moved is None:
+                        continue
+                    new_act, shift = moved
+                    r = checkpoint.clone()
+                    run(r, [new_act] + suffix)
+                    runs[direction] = (measure(r), shift)
+                pending.append((k, p, param_value(act, p), runs))
+        run(rt, [act])
+
+    final = measure(rt)
+    for k, p, value, runs in pending:
+        if not runs:
+            continue
+        # central si hay ambos lados; si no, unilateral contra la corrida base
+        hi, h_hi = runs.get(1, (final, 0.0))
+        lo, h_lo = runs.get(-1, (final, 0.0))
+        span = h_hi - h_lo
+        grad = {m: round((hi[j] - lo[j]) / span, 6) for j, m in enumerate(METRICS)}
+        rows.append(SensitivityRow(index=k, action=_label(actions[k]), param=p,
+                                   value=value, step=abs(span), grad=grad))
+    return dict(zip(METRICS, (round(x, 4) for x in final))), rows
+
+
+def rank(rows: List[SensitivityRow], metric: str | None = None) -> List[SensitivityRow]:
+    """Ordena por |gradiente| (de una métrica o el máximo entre métricas)."""
+    if metric:
+        key = lambda r: -abs(r.grad[metric])
+    else:
+        key = lambda r: -max(abs(v) for v in r.grad.values())
+    return sorted(rows, key=key)
+
+
+def save_csv(rows: List[SensitivityRow], path: str) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["index", "action", "param", "value", "step"] +
+                   [f"d_{m}" for m in METRICS])
+        for r in rows:
+            w.writerow([r.index, r.action, r.param, r.value, r.step] +
+                       [r.grad[m] for m in METRICS])
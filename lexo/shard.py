@@ -0,0 +1,415 @@
+# lexo/shard.py - runtime particionado por comunidad en N procesos
+"""
+ShardedRuntime reparte los nodos por comunidad (BFS desde los hubs COMMUNITY,
+ver lexo/quotient) entre N shards. Cada shard es un proceso con su propio
+Runtime que guarda:
+
+- los nodos que le pertenecen (owned) con todos sus atributos;
+- TODAS las aristas incidentes a sus nodos; si el otro extremo vive en otro
+  shard, se crea un nodo fantasma (kind = GHOST) sólo para sostener la arista.
+
+El coordinador mantiene owner[nodo] y la tabla de fronteras (aristas entre
+shards) y enruta cada acción del DSL al shard dueño. Las métricas globales
+salen por map-reduce:
+
+- trust:    Σ sumas parciales / Σ cantidades
+- cohesion: tríadas = Σ C(d_v, 2) de nodos propios (el grado local ya incluye
+            fantasmas); triángulos = Σ tri(v) / 3, donde los pares (x, y) de
+            vecinos fantasmas se consultan al dueño de x en una segunda ronda.
+- equity:   histogramas exactos (np.unique con conteos) de cada shard, mezclados
+            en el coordinador → mismo Gini que Runtime.measure().
+
+Sólo multiprocessing (Pipe + Process); processes=False corre los shards en el
+mismo proceso con el mismo protocolo (útil para depurar).
+"""
+import multiprocessing as mp
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Tuple
+
+import numpy as np
+
+from lexo.quotient import UNASSIGNED, assign_members
+
+GHOST = "GHOST"
+
+# Acciones que el modo sharded sabe enrutar
+SUPPORTED = ("CONNECT", "STRENGTHEN_TIES", "CARE_NETWORK",
+             "REDISTRIBUTE_RESOURCES", "LAUNCH_INITIATIVE")
+
+
+# =========================
+# Particionado
+# =========================
+def partition(kinds: Dict[Hashable, str],
+              edges: Iterable[Tuple[Hashable, Hashable]],
+              n_shards: int) -> Dict[Hashable, int]:
+    """
+    owner[nodo] ∈ [0, n_shards). Comunidades enteras por shard, asignadas de
+    mayor a menor tamaño al shard más liviano (LPT).
+    """
+    adj: Dict[Hashable, List[Hashable]] = {v: [] for v in kinds}
+    for u, v in edges:
+        if u in adj and v in adj and u != v:
+            adj[u].append(v)
+            adj[v].append(u)
+    hubs = [v for v, k in kinds.items() if str(k).upper() == "COMMUNITY"]
+    member = assign_members(kinds, hubs, adj.__getitem__)
+
+    sizes: Dict[Hashable, int] = {}
+    for c in member.values():
+        sizes[c] = sizes.get(c, 0) + 1
+    load = [0] * max(1, int(n_shards))
+    shard_of: Dict[Hashable, int] = {}
+    for c in sorted(sizes, key=lambda c: (-sizes[c], c == UNASSIGNED, repr(c))):
+        k = min(range(len(load)), key=load.__getitem__)
+        shard_of[c] = k
+        load[k] += sizes[c]
+    return {v: shard_of[c] for v, c in member.items()}
+
+
+def pair_sum_from_histogram(values: np.ndarray, counts: np.ndarray) -> Tuple[float, float, int]:
+    """
+    (Σ_{i,j} |xi − xj|, Σ x, n) a partir de valores únicos ordenados y sus conteos.
+    Un bloque de c valores iguales con rango inicial r0 aporta u·c·(2·r0 + c − n).
+    """
+    n = int(counts.sum())
+    if n == 0:
+        return 0.0, 0.0, 0
+    r0 = np.cumsum(counts) - counts
+    pair = 2.0 * float(np.sum(values * counts * (2.0 * r0 + counts - n)))
+    return pair, float(np.dot(values, counts)), n
+
+
+# =========================
+# Shard (vive en el worker)
+# =========================
+class Shard:
+
+    def __init__(self, index: int, runtime_factory: Callable[[], Any]):
+        self.index = index
+        self.rt = runtime_factory()
+        self.ghost_owner: Dict[Hashable, int] = {}
+
+    # ---------- carga ----------
+    def add_nodes(self, items: List[Tuple[Hashable, str, dict]]) -> int:
+        for name, kind, props in items:
+            self.rt.ensure_node(kind, name, props)
+        return len(items)
+
+    def _ensure_ghost(self, name, owner: int) -> None:
+        g = self.rt.graph
+        if not g.has_node(name):
+            g.add_node(name, kind=GHOST)
+            self.ghost_owner[name] = owner
+
+    def connect(self, a, b, props: dict, ghosts: Dict[Hashable, int]) -> None:
+        for name, owner in ghosts.items():
+            self._ensure_ghost(name, owner)
+        self.rt.connect(a, b, props)
+
+    def connect_many(self, items: List[Tuple[Hashable, Hashable, dict, Dict[Hashable, int]]]) -> int:
+        for a, b, props, ghosts in items:
+            self.connect(a, b, props, ghosts)
+        return len(items)
+
+    # ---------- acciones ----------
+    def _ghost_edges(self, target) -> List[Tuple[Hashable, Hashable, float]]:
+        g = self.rt.graph
+        out = []
+        for w in g[target]:
+            if w in self.ghost_owner:
+                d = g[target][w]
+                out.append((target, w, float(d.get("confianza", d.get("trust", 50.0)))))
+        return out
+
+    def strengthen_ties(self, target, props: dict):
+        self.rt.strengthen_ties(target, props)
+        return self._ghost_edges(target)
+
+    def care_network(self, target, intensity, plan):
+        self.rt.care_network(target, intensity=intensity, mitigation_plan=plan)
+        return self._ghost_edges(target)
+
+    def launch_initiative(self, target, inc: int) -> None:
+        if target is not None:
+            self.rt.launch_initiative(target, inc=inc)
+            return
+        for n, d in list(self.rt.graph.nodes(data=True)):
+            if d.get("kind") == "COMMUNITY":
+                self.rt.launch_initiative(n, inc=inc)
+
+    def redistribute(self, giver, receiver, fraction: float, min_left: float) -> None:
+        self.rt.redistribute_resources(giver, receiver, fraction=fraction, min_left=min_left)
+
+    def get_resources(self, name) -> float | None:
+        if not self.rt.graph.has_node(name) or name in self.ghost_owner:
+            return None
+        return float(self.rt._get_node_resources(name))
+
+    def set_resources(self, name, value: float) -> None:
+        self.rt._set_node_resources(name, value)
+
+    def set_edge_trust(self, u, v, value: float) -> None:
+        g = self.rt.graph
+        if g.has_edge(u, v):
+            g[u][v]["confianza"] = value
+            g[u][v]["trust"] = value
+            self.rt._touch_edge(u, v)
+
+    # ---------- map ----------
+    def partials(self) -> Dict[str, Any]:
+        g = self.rt.graph
+        ghosts = self.ghost_owner
+        trust_sum, n, triads, closed = 0.0, 0, 0, 0
+        queries: Dict[int, List[Tuple[Hashable, Hashable]]] = {}
+        res = []
+        for v in g.nodes():
+            if v in ghosts:
+                continue
+            n += 1
+            trust_sum += float(self.rt._get_node_trust(v))
+            res.append(float(self.rt._get_node_resources(v)))
+            nbs = [w for w in g[v] if w != v]
+            d = len(nbs)
+            triads += d * (d - 1) // 2
+            for i, x in enumerate(nbs):
+                for y in nbs[i + 1:]:
+                    if x not in ghosts:
+                        closed += g.has_edge(x, y)
+                    elif y not in ghosts:
+                        closed += g.has_edge(y, x)
+                    else:
+                        queries.setdefault(ghosts[x], []).append((x, y))
+        values, counts = np.unique(np.asarray(res, dtype=float), return_counts=True)
+        return {"trust_sum": trust_sum, "n": n, "triads": triads, "closed": closed,
+                "queries": queries, "values": values, "counts": counts}
+
+    def has_edges(self, pairs: List[Tuple[Hashable, Hashable]]) -> int:
+        g = self.rt.graph
+        return sum(1 for x, y in pairs if g.has_edge(x, y))
+
+    def node_count(self) -> int:
+        return sum(1 for v in self.rt.graph.nodes() if v not in self.ghost_owner)
+
+
+def _serve(conn, index: int, runtime_factory: Callable[[], Any]) -> None:
+    shard = Shard(index, runtime_factory)
+    while True:
+        cmd, args = conn.recv()
+        if cmd == "stop":
+            conn.close()
+            return
+        try:
+            conn.send(("ok", getattr(shard, cmd)(*args)))
+        except Exception as e:  # el error viaja al coordinador
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class _Remote:
+
+    def __init__(self, index: int, factory, ctx):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_serve, args=(child, index, factory), daemon=True)
+        self.proc.start()
+        child.close()
+
+    def send(self, cmd: str, *args) -> None:
+        self.conn.send((cmd, args))
+
+    def recv(self):
+        status, value = self.conn.recv()
+        if status == "error":
+            raise RuntimeError(f"shard: {value}")
+        return value
+
+    def call(self, cmd: str, *args):
+        self.send(cmd, *args)
+        return self.recv()
+
+    def close(self) -> None:
+        try:
+            self.conn.send(("stop", ()))
+        except (BrokenPipeError, OSError):
+            pass
+        self.proc.join(timeout=5)
+
+
+class _Local:
+    """Mismo protocolo que _Remote, en el proceso actual."""
+
+    def __init__(self, index: int, factory):
+        self.shard = Shard(index, factory)
+        self._pending = None
+
+    def send(self, cmd: str, *args) -> None:
+        self._pending = getattr(self.shard, cmd)(*args)
+
+    def recv(self):
+        value, self._pending = self._pending, None
+        return value
+
+    def call(self, cmd: str, *args):
+        return getattr(self.shard, cmd)(*args)
+
+    def close(self) -> None:
+        pass
+
+
+# =========================
+# Coordinador
+# =========================
+@dataclass
+class ShardStats:
+    shards: int
+    nodes_per_shard: List[int]
+    boundary_edges: int
+
+
+class ShardedRuntime:
+
+    def __init__(self, owner: Dict[Hashable, int], n_shards: int,
+                 runtime_factory: Callable[[], Any], processes: bool = True):
+        self.owner = dict(owner)
+        self.n_shards = max(1, int(n_shards))
+        ctx = mp.get_context()
+        self.shards = [_Remote(k, runtime_factory, ctx) if processes else _Local(k, runtime_factory)
+                       for k in range(self.n_shards)]
+        self.boundary: Dict[Tuple[Hashable, Hashable], dict] = {}
+        self.kind: Dict[Hashable, str] = {}
+
+    # ---------- ciclo de vida ----------
+    def close(self) -> None:
+        for s in self.shards:
+            s.close()
+
+    def __enter__(self) -> "ShardedRuntime":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _broadcast(self, cmd: str, per_shard: List[tuple]) -> List[Any]:
+        for s, args in zip(self.shards, per_shard):
+            s.send(cmd, *args)
+        return [s.recv() for s in self.shards]
+
+    # ---------- carga ----------
+    def load(self,
+             nodes: Iterable[Tuple[Hashable, str, dict]],
+             edges: Iterable[Tuple[Hashable, Hashable, dict]] = ()) -> None:
+        batches: List[List] = [[] for _ in self.shards]
+        for name, kind, props in nodes:
+            k = self.owner.setdefault(name, len(self.kind) % self.n_shards)
+            self.kind[name] = str(kind).upper()
+            batches[k].append((name, kind, props))
+        self._broadcast("add_nodes", [(b,) for b in batches])
+        self.connect_many(edges)
+
+    def connect_many(self, edges: Iterable[Tuple[Hashable, Hashable, dict]]) -> None:
+        batches: List[List] = [[] for _ in self.shards]
+        for a, b, props in edges:
+            for k, item in self._connect_items(a, b, props or {}):
+                batches[k].append(item)
+        self._broadcast("connect_many", [(b,) for b in batches])
+
+    def _connect_items(self, a, b, props):
+        if a not in self.owner or b not in self.owner:
+            return []
+        ka, kb = self.owner[a], self.owner[b]
+        if ka == kb:
+            return [(ka, (a, b, props, {}))]
+        self.boundary[(a, b)] = dict(props)
+        return [(ka, (a, b, props, {b: kb})), (kb, (a, b, props, {a: ka}))]
+
+    # ---------- acciones ----------
+    def _sync_ghost_edges(self, updates) -> None:
+        for u, w, value in updates:
+            self.shards[self.owner[w]].call("set_edge_trust", u, w, value)
+            key = (u, w) if (u, w) in self.boundary else (w, u)
+            if key in self.boundary:
+                self.boundary[key]["trust"] = value
+
+    def apply(self, act: Tuple) -> None:
+        """Enruta una acción del AST (ver SUPPORTED) al/los shard(s) dueños."""
+        tag = act[0]
+        if tag == "CONNECT":
+            _, a, b, props = act
+            for k, item in self._connect_items(a, b, props or {}):
+                self.shards[k].call("connect", *item)
+        elif tag == "STRENGTHEN_TIES":
+            _, target, props = act
+            if target in self.owner:
+                self._sync_ghost_edges(
+                    self.shards[self.owner[target]].call("strengthen_ties", target, props))
+        elif tag == "CARE_NETWORK":
+            _, target, props = act
+            if target in self.owner:
+                updates = self.shards[self.owner[target]].call(
+                    "care_network", target, props.get("intensity") or "MEDIA",
+                    props.get("mitigation_plan"))
+                self._sync_ghost_edges(updates)
+        elif tag == "LAUNCH_INITIATIVE":
+            _, _, props = act
+            inc = int(props.get("trust_boost", 15))
+            target = props.get("target") or props.get("community") or props.get("COMMUNITY")
+            if target:
+                if target in self.owner:
+                    self.shards[self.owner[target]].call("launch_initiative", target, inc)
+            else:
+                self._broadcast("launch_initiative", [(None, inc)] * self.n_shards)
+        elif tag == "REDISTRIBUTE_RESOURCES":
+            _, giver, receiver, props = act
+            if giver not in self.owner or receiver not in self.owner:
+                return
+            fraction = float(props.get("fraction", 0.2))
+            min_left = float(props.get("min_left", 2.0))
+            kg, kr = self.owner[giver], self.owner[receiver]
+            if kg == kr:
+                self.shards[kg].call("redistribute", giver, receiver, fraction, min_left)
+                return
+            # cruza shards: misma regla que Runtime.redistribute_resources
+            g = self.shards[kg].call("get_resources", giver)
+            r = self.shards[kr].call("get_resources", receiver)
+            if g is None or r is None or g <= min_left:
+                return
+            move = max(0.0, min(g - min_left, g * fraction))
+            if move > 0:
+                self.shards[kg].call("set_resources", giver, g - move)
+                self.shards[kr].call("set_resources", receiver, r + move)
+        else:
+            raise ValueError(f"{tag} no está soportado en modo sharded")
+
+    # ---------- reduce ----------
+    def values(self) -> Tuple[float, float, float]:
+        parts = self._broadcast("partials", [()] * self.n_shards)
+        n = sum(p["n"] for p in parts)
+        trust = sum(p["trust_sum"] for p in parts) / n if n else 0.0
+
+        # segunda ronda: pares de vecinos fantasmas → dueño del primero
+        asks: List[List] = [[] for _ in self.shards]
+        for p in parts:
+            for k, pairs in p["queries"].items():
+                asks[k].extend(pairs)
+        closed = sum(p["closed"] for p in parts) + sum(
+            self._broadcast("has_edges", [(a,) for a in asks]))
+        triads = sum(p["triads"] for p in parts)
+        cohesion = 100.0 * closed / triads if closed and triads else 0.0
+
+        values = np.concatenate([p["values"] for p in parts]) if parts else np.array([])
+        counts = np.concatenate([p["counts"] for p in parts]) if parts else np.array([], dtype=int)
+        uniq, inv = np.unique(values, return_inverse=True)
+        merged = np.bincount(inv.ravel(), weights=counts, minlength=len(uniq))
+        pair, total, m = pair_sum_from_histogram(uniq, merged)
+        equity = 0.0
+        if m and total > 0:
+            equity = 100.0 * (1.0 - max(0.0, min(1.0, pair / (2.0 * m * total))))
+        return trust, cohesion, equity
+
+    def measure(self) -> Dict[str, float]:
+        """Mismo formato (y redondeo) que Runtime.measure()."""
+        t, c, e = self.values()
+        return {"trust": round(t, 2), "cohesion": round(c, 2), "equity": round(e, 2)}
+
+    def stats(self) -> ShardStats:
+        counts = self._broadcast("node_count", [()] * self.n_shards)
+        return ShardStats(self.n_shards, counts, len(self.boundary))
@@ -0,0 +1,186 @@
+# lexo/stream.py - blocker en streaming con reglas por ventana (corte temprano)
+"""
+Blocker y core_helpers.blocker_decision juzgan un único dict final. Para
+programas largos o por ticks, StreamingBlocker consume la serie de métricas
+(una muestra por acción o por tick muestreado) y aplica reglas de ventana:
+
+    mean_below   media móvil de `window` muestras < threshold durante k muestras seguidas
+    slope_below  pendiente (mínimos cuadrados, por muestra) de la ventana < threshold
+                 durante k muestras seguidas (p.ej. -0.5 = cae más de 0.5 por paso)
+
+Estado O(window) por (métrica, ventana): deque + sumas corridas Σy y Σi·y, así
+cada muestra cuesta O(reglas) sin recorrer la ventana. Una regla sólo se evalúa
+con la ventana llena. La primera violación de severidad block queda en
+`stopped` y dispara on_stop(evento): execute() corta ahí en vez de esperar al
+final de la corrida.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+KINDS = ("mean_below", "slope_below")
+
+
+class StreamStop(RuntimeError):
+    """Una regla de ventana con severidad block se cumplió durante la ejecución."""
+
+    def __init__(self, event: "StreamEvent"):
+        super().__init__(f"{event.rule} en {event.source} paso {event.step}: {event.detail}")
+        self.event = event
+
+
+@dataclass
+class StreamRule:
+    id: str
+    metric: str
+    kind: str  # "mean_below" | "slope_below"
+    threshold: float
+    window: int = 5
+    k: int = 1  # muestras seguidas en violación antes de disparar
+    severity: str = "block"
+
+    def __post_init__(self):
+        if self.kind not in KINDS:
+            raise ValueError(f"regla de stream desconocida: {self.kind!r} (usar {KINDS})")
+        if self.window < 1 or self.k < 1:
+            raise ValueError("window y k deben ser ≥ 1")
+        if self.kind == "slope_below" and self.window < 2:
+            raise ValueError("slope_below necesita window ≥ 2")
+
+
+@dataclass
+class StreamEvent:
+    step: int
+    source: str  # "acción" / "tick" / etiqueta libre
+    rule: str
+    severity: str
+    value: float
+    detail: str
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"step": self.step, "source": self.source, "rule": self.rule,
+                "severity": self.severity, "value": round(self.value, 4), "detail": self.detail}
+
+
+class _Window:
+    """Últimas `size` muestras de una métrica con Σy y Σi·y (i = índice absoluto)."""
+
+    __slots__ = ("size", "ys", "i0", "sy", "siy")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.ys: deque = deque()
+        self.i0 = 0  # índice absoluto de ys[0]
+        self.sy = 0.0
+        self.siy = 0.0
+
+    def push(self, y: float) -> None:
+        i = self.i0 + len(self.ys)
+        self.ys.append(y)
+        self.sy += y
+        self.siy += i * y
+        if len(self.ys) > self.size:
+            old = self.ys.popleft()
+            self.sy -= old
+            self.siy -= self.i0 * old
+            self.i0 += 1
+            if self.i0 >= 1 << 20:  # re-basar índices: acota error de redondeo
+                self._rebase()
+
+    def _rebase(self) -> None:
+        self.i0 = 0
+        self.sy = sum(self.ys)
+        self.siy = sum(i * y for i, y in enumerate(self.ys))
+
+    @property
+    def full(self) -> bool:
+        return len(self.ys) == self.size
+
+    def mean(self) -> float:
+        return self.sy / len(self.ys)
+
+    def slope(self) -> float:
+        # x centrado: Σ(i − ī)·y = Σi·y − ī·Σy ;  Σ(i − ī)² = w(w² − 1)/12
+        w = len(self.ys)
+        ibar = self.i0 + (w - 1) / 2.0
+        return (self.siy - ibar * self.sy) / (w * (w * w - 1) / 12.0)
+
+
+@dataclass
+class StreamingBlocker:
+    rules: List[StreamRule]
+    on_stop: Callable[[StreamEvent], None] | None = None
+    max_events: int = 100
+    step: int = 0
+    events: List[StreamEvent] = field(default_factory=list)
+    stopped: StreamEvent | None = None
+
+    def __post_init__(self):
+        self._windows: Dict[Tuple[str, int], _Window] = {}
+        for r in self.rules:
+            key = (r.metric, r.window)
+            if key not in self._windows:
+                self._windows[key] = _Window(r.window)
+        self._streak = {r.id: 0 for r in self.rules}
+        self._counts = {r.id: 0 for r in self.rules}
+
+    @property
+    def metrics(self) -> frozenset:
+        """Métricas que hace falta medir en cada muestra."""
+        return frozenset(r.metric for r in self.rules)
+
+    def push(self, metrics: Dict[str, float], source: str = "") -> List[StreamEvent]:
+        """Agrega una muestra; devuelve los eventos que dispara (métricas ausentes se ignoran)."""
+        self.step += 1
+        for (metric, _), win in self._windows.items():
+            if metric in metrics:
+                win.push(float(metrics[metric]))
+        fired = []
+        for r in self.rules:
+            win = self._windows[(r.metric, r.window)]
+            if r.metric not in metrics or not win.full:
+                continue
+            value = win.mean() if r.kind == "mean_below" else win.slope()
+            if value >= r.threshold:
+                self._streak[r.id] = 0
+                continue
+            self._streak[r.id] += 1
+            if self._streak[r.id] != r.k:  # dispara una vez por racha
+                continue
+            what = "media" if r.kind == "mean_below" else "pendiente"
+            ev = StreamEvent(self.step, source, r.id, r.severity, value,
+                             f"{r.metric}: {what} {value:.2f} < {r.threshold:.2f} "
+                             f"en ventana {r.window} ({r.k} muestra(s) seguidas)")
+            fired.append(ev)
+            self._counts[r.id] += 1
+            if len(self.events) < self.max_events:
+                self.events.append(ev)
+            if r.severity == "block" and self.stopped is None:
+                self.stopped = ev
+                if self.on_stop is not None:
+                    self.on_stop(ev)
+        return fired
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "samples": self.step,
+            "rules": [{"id": r.id, "metric": r.metric, "kind": r.kind, "threshold": r.threshold,
+                       "window": r.window, "k": r.k, "severity": r.severity} for r in self.rules],
+            "counts": dict(self._counts),
+            "events": [e.as_dict() for e in self.events],
+            "stopped": self.stopped.as_dict() if self.stopped is not None else None,
+        }
+
+
+def policy_rules(mins: Dict[str, float], window: int = 5, k: int = 1,
+                 slope: float | None = None, severity: str = "block") -> List[StreamRule]:
+    """
+    Reglas por defecto a partir de umbrales mínimos por métrica (ethics.yaml o
+    BlockerPolicy.min): media móvil bajo el mínimo y, si se pide, pendiente < slope.
+    """
+    rules = [StreamRule(f"{m}_mean", m, "mean_below", float(v), window, k, severity)
+             for m, v in mins.items()]
+    if slope is not None:
+        rules += [StreamRule(f"{m}_slope", m, "slope_below", float(slope), max(2, window), k, severity)
+                  for m in mins]
+    return rules
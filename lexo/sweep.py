@@ -0,0 +1,119 @@
+# lexo/sweep.py - WHAT_IF_SWEEP: barrido de parámetros + frente de Pareto
+import csv
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+from lexo.pool import map_with_base
+
+METRICS = ("trust", "cohesion", "equity")
+
+
+def expand_range(start: float, stop: float, step: float) -> List[float]:
+    """
+    Valores start, start+step, ... hasta stop INCLUSIVE (tolerante a float).
+    range(0.05, 0.5, 0.05) → [0.05, 0.1, ..., 0.5]
+    """
+    start, stop, step = float(start), float(stop), float(step)
+    if step == 0:
+        raise ValueError("range: step no puede ser 0")
+    if (stop - start) * step < 0:
+        return []
+    count = int(np.floor((stop - start) / step + 1e-9)) + 1
+    return [round(start + k * step, 10) for k in range(count)]
+
+
+def expand_grid(space: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Producto cartesiano {param: valores} → lista de combinaciones (dicts)."""
+    names = list(space.keys())
+    values = [list(v) if isinstance(v, (list, tuple)) else [v]
+              for v in space.values()]
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def pareto_mask(values: np.ndarray, block: int = 512) -> np.ndarray:
+    """
+    Máscara de puntos no dominados (se MAXIMIZAN todas las columnas).
+    Un punto j domina a i si j >= i en todo y j > i en al menos una columna.
+    Comparación vectorizada por bloques para acotar memoria.
+    """
+    v = np.asarray(values, dtype=float)
+    if v.ndim != 2 or len(v) == 0:
+        return np.zeros(len(v), dtype=bool)
+    keep = np.ones(len(v), dtype=bool)
+    for lo in range(0, len(v), block):
+        cur = v[lo:lo + block, None, :]
+        ge = (v[None, :, :] >= cur).all(axis=2)
+        gt = (v[None, :, :] > cur).any(axis=2)
+        keep[lo:lo + block] = ~(ge & gt).any(axis=1)
+    return keep
+
+
+@dataclass
+class SweepResult:
+    title: str
+    params: List[str]
+    combos: List[Dict[str, Any]]
+    metrics: np.ndarray  # N×len(METRICS), columnas en orden METRICS
+    dims: List[str] = field(default_factory=lambda: list(METRICS))
+
+    def pareto(self) -> np.ndarray:
+        cols = [METRICS.index(d) for d in self.dims if d in METRICS]
+        return pareto_mask(self.metrics[:, cols])
+
+    def rows(self, only: np.ndarray | None = None) -> List[Dict[str, Any]]:
+        idx = range(len(self.combos)) if only is None else np.flatnonzero(only)
+        out = []
+        for i in idx:
+            row = dict(self.combos[i])
+            row.update({k: float(self.metrics[i, j]) for j, k in enumerate(METRICS)})
+            out.append(row)
+        return out
+
+    def save_csv(self, path: str) -> None:
+        mask = self.pareto()
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(self.params + list(METRICS) + ["pareto"])
+            for i, combo in enumerate(self.combos):
+                w.writerow([combo.get(p, "") for p in self.params] +
+                           [f"{x:.2f}" for x in self.metrics[i]] +
+                           [int(mask[i])])
+
+    def save_npz(self, path: str) -> None:
+        arrays = {
+            "metrics": self.metrics,
+            "metric_names": np.array(METRICS),
+            "pareto": self.pareto(),
+        }
+        for p in self.params:
+            col = [c.get(p) for c in self.combos]
+            try:
+                arrays[f"param_{p}"] = np.array(col, dtype=float)
+            except (TypeError, ValueError):
+                arrays[f"param_{p}"] = np.array([str(x) for x in col])
+        np.savez_compressed(path, **arrays)
+
+
+def run_sweep(title: str,
+              base: Any,
+              space: Dict[str, Sequence[Any]],
+              evaluate: Callable[[Any, Dict[str, Any]], Dict[str, float]],
+              dims: List[str] | None = None,
+              workers: int | None = None) -> SweepResult:
+    """
+    Evalúa evaluate(base, params) para cada combinación del espacio.
+    - base se comparte una vez por proceso (ver lexo.pool.map_with_base).
+    - evaluate devuelve un dict de métricas {"trust", "cohesion", "equity"}.
+    """
+    combos = expand_grid(space)
+    results = map_with_base(evaluate, base, combos, workers=workers)
+    metrics = np.array([[float(m.get(k, 0.0)) for k in METRICS] for m in results],
+                       dtype=float).reshape(len(combos), len(METRICS))
+    return SweepResult(title=title,
+                       params=list(space.keys()),
+                       combos=combos,
+                       metrics=metrics,
+                       dims=list(dims or METRICS))
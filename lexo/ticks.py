@@ -0,0 +1,130 @@
+# lexo/ticks.py - SIMULATE_TICKS: dinámica por tick vectorizada sobre GraphArrays
+"""
+Cada tick aplica, sobre TODO el grafo a la vez:
+
+1) decay:     confianza de aristas → baseline        et += decay·(baseline − et)
+2) diffusion: confianza nodal → media de vecinos     t  += α·(Σ w·t_j / Σ w − t)
+              ponderada por w = et/100
+3) flow:      recursos fluyen del más rico al más pobre por cada arista
+              f_e = β·w·(r_u − r_v) / (2·max(d_u, d_v))
+              (conserva el total y nunca deja recursos negativos con β ≤ 1)
+
+La topología no cambia durante los ticks, así que la cohesión es constante.
+"""
+import csv
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from lexo.arrays import GraphArrays, equity_of
+from lexo.sweep import METRICS
+
+
+@dataclass
+class TickConfig:
+    ticks: int
+    decay: float = 0.0
+    baseline: float = 50.0
+    diffusion: float = 0.0
+    flow: float = 0.0
+    sample_every: int = 10
+
+
+def run_ticks(ga: GraphArrays, cfg: TickConfig, cohesion: float,
+              on_sample: Callable[[Sequence[float]], bool] | None = None) -> np.ndarray:
+    """
+    Muta ga.trust / ga.resources / ga.edge_trust in-place (edge trust y baseline
+    se asumen en [0, 100], así que el decay nunca sale de rango).
+    Devuelve muestras (tick, trust, cohesion, equity) cada sample_every ticks
+    (más el tick 0 y el último). on_sample(muestra) → True corta los ticks ahí
+    (el estado queda el de ese tick; ver lexo/stream.py).
+    """
+    if cfg.ticks < 0:
+        raise ValueError("SIMULATE_TICKS: n debe ser ≥ 0")
+    for name in ("decay", "diffusion", "flow"):
+        if not 0.0 <= float(getattr(cfg, name)) <= 1.0:
+            raise ValueError(f"SIMULATE_TICKS: {name} debe estar en [0, 1]")
+    every = max(1, int(cfg.sample_every))
+
+    loop = ga.src == ga.dst
+    keep = np.flatnonzero(~loop)
+    # ordenar por src hace que bincount(src) escriba de forma secuencial
+    keep = keep[np.argsort(ga.src[keep], kind="stable")]
+    src, dst = ga.src[keep], ga.dst[keep]
+    n = ga.n
+    t, r = ga.trust, ga.resources
+
+    def wsum(w):
+        return (np.bincount(src, weights=w, minlength=n) +
+                np.bincount(dst, weights=w, minlength=n))
+
+    # decay tiene forma cerrada: et_k = baseline + (et_0 − baseline)·(1 − decay)^k,
+    # así que w_k = a + q^k·c y Σw_k = Σa + q^k·Σc (sin recalcular por tick)
+    et0 = ga.edge_trust[keep].copy()
+    q = 1.0 - float(cfg.decay)
+    a = np.full_like(et0, float(cfg.baseline) / 100.0) if cfg.decay else et0 / 100.0
+    c = (et0 - float(cfg.baseline)) / 100.0 if cfg.decay else np.zeros_like(et0)
+    wdeg_a, wdeg_c = wsum(a), wsum(c)
+
+    deg = ga.degree().astype(float)
+    inv = cfg.flow / (2.0 * np.maximum(np.maximum(deg[src], deg[dst]), 1.0))
+    fa, fc = a * inv, c * inv  # β·w/(2·max d) = fa + q^k·fc
+    avg = np.empty(n)
+    buf = np.empty(len(src))
+
+    def sample(tick: int) -> List[float]:
+        return [tick, float(t.mean()) if n else 0.0, cohesion, equity_of(r)]
+
+    samples = [sample(0)]
+    stop = on_sample is not None and bool(on_sample(samples[-1]))
+    qk = 1.0
+    w = a
+    ran = 0  # ticks efectivamente aplicados (0 si ticks=0 o corte en la muestra inicial)
+    for tick in range(1, 0 if stop else cfg.ticks + 1):
+        ran = tick
+        qk *= q
+        if cfg.decay:
+            w = a + qk * c
+        if cfg.diffusion:
+            wdeg = wdeg_a + qk * wdeg_c if cfg.decay else wdeg_a
+            np.multiply(w, t[dst], out=buf)
+            num = np.bincount(src, weights=buf, minlength=n)
+            np.multiply(w, t[src], out=buf)
+            num += np.bincount(dst, weights=buf, minlength=n)
+            np.divide(num, wdeg, out=avg, where=wdeg > 0)
+            np.copyto(avg, t, where=wdeg <= 0)
+            t += cfg.diffusion * (avg - t)
+            np.clip(t, 0.0, 100.0, out=t)
+        if cfg.flow:
+            np.subtract(r[src], r[dst], out=buf)
+            buf *= fa + qk * fc if cfg.decay else fa
+            r -= np.bincount(src, weights=buf, minlength=n)
+            r += np.bincount(dst, weights=buf, minlength=n)
+            np.maximum(r, 0.0, out=r)
+        if tick % every == 0 or tick == cfg.ticks:
+            samples.append(sample(tick))
+            if on_sample is not None and on_sample(samples[-1]):
+                break
+    # sin ticks aplicados las aristas quedan como estaban (w = a sería el baseline)
+    ga.edge_trust[keep] = 100.0 * w if cfg.decay and ran else et0
+    return np.array(samples, dtype=float).reshape(-1, 1 + len(METRICS))
+
+
+def summarize(samples: np.ndarray) -> Dict[str, Dict[str, float]]:
+    """Primera/última muestra y mínimo por métrica."""
+    out = {}
+    for j, k in enumerate(METRICS, start=1):
+        col = samples[:, j]
+        out[k] = {"start": round(float(col[0]), 2),
+                  "end": round(float(col[-1]), 2),
+                  "min": round(float(col.min()), 2)}
+    return out
+
+
+def save_csv(samples: np.ndarray, path: str) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["tick"] + list(METRICS))
+        for row in samples.tolist():
+            w.writerow([int(row[0])] + [round(x, 4) for x in row[1:]])
@@ -0,0 +1,277 @@
+# lexo/watch.py - reglas éticas evaluadas en continuo, acción por acción
+"""
+EthicsWatch engancha al Runtime (rt._watch) y recibe cada nodo/arista que
+tocan los métodos que mutan. Tras cada acción:
+
+1. Vuelca lo tocado en un IncrementalMetrics (LiveMetrics.sync: trust,
+   resources, aristas y nodos nuevos) y anota qué métricas pueden haber cambiado.
+2. Re-evalúa SÓLO las reglas suscriptas a eso:
+     on="node"   → los nodos tocados      (y los extremos de aristas tocadas)
+     on="edge"   → las aristas tocadas
+     on="trust" | "cohesion" | "equity" → si esa métrica cambió
+   Las reglas por elemento guardan el conjunto de infractores activos, así
+   una acción cuesta O(tocados), no O(n).
+3. Registra las transiciones a violación; con severidad "block" la acción
+   queda marcada y execute() puede abortar (EthicsAbort).
+
+Las reglas salen de ETHICS (ethics.yaml, severidad warn salvo las listadas en
+watch_block) y de las reglas YAML del linter evaluables sobre el grafo vivo
+(metric_drop_percent contra las métricas iniciales, min_links_per_node).
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Set
+
+from lexo.incremental import IncrementalMetrics, LiveMetrics
+
+METRIC_DEPS = ("trust", "cohesion", "equity")
+
+
+class EthicsAbort(RuntimeError):
+    """Una regla con severidad block se violó durante la ejecución."""
+
+    def __init__(self, event: "WatchEvent"):
+        super().__init__(f"{event.rule} ({event.severity}) tras {event.action}: {event.detail}")
+        self.event = event
+
+
+@dataclass
+class WatchRule:
+    id: str
+    on: str  # "node" | "edge" | "trust" | "cohesion" | "equity"
+    test: Callable[..., Any]  # node/edge: (watch, key) → valor si viola; métrica: (watch) → detalle
+    severity: str = "warn"
+    label: str = ""
+
+
+@dataclass
+class WatchEvent:
+    step: int
+    action: str
+    rule: str
+    severity: str
+    detail: str
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"step": self.step, "action": self.action, "rule": self.rule,
+                "severity": self.severity, "detail": self.detail}
+
+
+@dataclass
+class EthicsWatch:
+    rt: Any
+    rules: List[WatchRule]
+    start: Dict[str, float]  # métricas al comenzar (Runtime.measure)
+    start_edges: Dict[Any, float] = field(default_factory=dict)  # snapshot_state(rt)["edges"]
+
+    def __post_init__(self):
+        self.live = LiveMetrics(self.rt)
+        self.metrics = self.state.metrics()
+        self.step = 0
+        self.events: List[WatchEvent] = []
+        self.active: Dict[str, Dict[Any, Any]] = {r.id: {} for r in self.rules}
+        self.blocking: WatchEvent | None = None
+        self.evaluations = 0
+        self._by_dep: Dict[str, List[WatchRule]] = {}
+        for r in self.rules:
+            self._by_dep.setdefault(r.on, []).append(r)
+        self._evaluate(list(self.rt.graph.nodes()), list(self.live.edge_key.values()),
+                       set(METRIC_DEPS), action="(inicio)")
+
+    @property
+    def state(self) -> IncrementalMetrics:
+        return self.live.state
+
+    # ---------- notificaciones del Runtime ----------
+    def touch_node(self, n) -> None:
+        self.live.touch_node(n)
+
+    def touch_edge(self, u, v) -> None:
+        self.live.touch_edge(u, v)
+
+    def invalidate(self) -> None:
+        """Escrituras masivas al grafo (p.ej. SIMULATE_TICKS): re-sincronizar todo."""
+        self.live.invalidate()
+
+    # ---------- tras cada acción ----------
+    def after_action(self, act) -> List[WatchEvent]:
+        self.step += 1
+        name = str(act[0]) if act else "?"
+        nodes, edges, changed = self.live.sync()
+        if not nodes and not edges and not changed:
+            return []
+        return self._evaluate(nodes, edges, changed, action=name)
+
+    def _evaluate(self, nodes: Iterable, edges: Iterable, changed: Set[str],
+                  action: str) -> List[WatchEvent]:
+        if changed:
+            self.metrics = self.state.metrics()
+        new: List[WatchEvent] = []
+        g = self.rt.graph
+        for on, keys in (("node", [n for n in nodes if g.has_node(n)]),
+                         ("edge", [e for e in edges if g.has_edge(*e)])):
+            for rule in self._by_dep.get(on, ()):
+                active = self.active[rule.id]
+                for key in keys:
+                    self.evaluations += 1
+                    value = rule.test(self, key)
+                    if value is None:
+                        active.pop(key, None)
+                    elif key not in active:
+                        active[key] = value
+                        new.append(self._event(rule, action, f"{_label(key)} ({_fmt(value)})"))
+                    else:
+                        active[key] = value
+        for dep in (d for d in METRIC_DEPS if d in changed):
+            for rule in self._by_dep.get(dep, ()):
+                self.evaluations += 1
+                detail = rule.test(self)
+                active = self.active[rule.id]
+                if detail is None:
+                    active.clear()
+                elif not active:
+                    active[None] = detail
+                    new.append(self._event(rule, action, detail))
+        return new
+
+    def _event(self, rule: WatchRule, action: str, detail: str) -> WatchEvent:
+        ev = WatchEvent(self.step, action, rule.id, rule.severity,
+                        f"{rule.label}: {detail}" if rule.label else detail)
+        self.events.append(ev)
+        if rule.severity == "block" and self.blocking is None:
+            self.blocking = ev
+        return ev
+
+    # ---------- resumen ----------
+    def summary(self, max_events: int = 100) -> Dict[str, Any]:
+        return {
+            "steps": self.step,
+            "evaluations": self.evaluations,
+            "blocked_at": self.blocking.as_dict() if self.blocking else None,
+            "active": {r.id: len(self.active[r.id]) for r in self.rules if self.active[r.id]},
+            "events_total": len(self.events),
+            "events": [e.as_dict() for e in self.events[:max_events]],
+        }
+
+
+def _label(key) -> str:
+    return "–".join(map(str, key)) if isinstance(key, tuple) else str(key)
+
+
+def _fmt(value) -> str:
+    return f"{value:.1f}" if isinstance(value, float) else str(value)
+
+
+# ---------- reglas ----------
+def ethics_rules(ethics: Dict[str, Any]) -> List[WatchRule]:
+    """Mismas reglas y umbrales que lint_compare_v2, suscriptas a lo que leen."""
+    block = {str(x) for x in (ethics.get("watch_block") or [])}
+    rules: List[WatchRule] = []
+
+    def add(key, on, test, label):
+        if key in ethics:
+            rules.append(WatchRule(key, on, test, "block" if key in block else "warn", label))
+
+    def below(value, limit):
+        return value if value < limit else None
+
+    add("low_node_trust", "node",
+        lambda w, n: below(w.rt._get_node_trust(n), float(ethics["low_node_trust"])),
+        "confianza de nodo muy baja")
+    add("min_node_degree", "node",
+        lambda w, n: below(w.rt.graph.degree(n), int(ethics["min_node_degree"])),
+        "nodo aislado")
+    add("min_resources_per_node", "node",
+        lambda w, n: below(w.rt._get_node_resources(n), float(ethics["min_resources_per_node"])),
+        "recursos insuficientes")
+    add("low_edge_trust", "edge",
+        lambda w, e: below(w.rt._edge_trust(*e), float(ethics["low_edge_trust"])),
+        "vínculo con confianza muy baja")
+
+    def edge_drop(w, e):
+        prev = w.start_edges.get(e, w.start_edges.get((e[1], e[0])))
+        if prev is None:
+            return None
+        drop = prev - w.rt._edge_trust(*e)
+        return drop if drop > float(ethics["max_edge_trust_drop"]) else None
+
+    add("max_edge_trust_drop", "edge", edge_drop, "caída de confianza del vínculo")
+
+    def metric_min(metric, key):
+        def test(w):
+            v = w.metrics[metric]
+            return f"{metric}={v:.2f} < {ethics[key]}" if v < float(ethics[key]) else None
+        return test
+
+    add("min_avg_trust", "trust", metric_min("trust", "min_avg_trust"), "confianza promedio")
+    add("min_equity_score", "equity", metric_min("equity", "min_equity_score"), "equidad")
+    add("min_cohesion_score", "cohesion", metric_min("cohesion", "min_cohesion_score"), "cohesión")
+
+    def trust_drop(w):
+        t0 = w.start.get("trust", 0.0)
+        if t0 <= 0:
+            return None
+        pct = (t0 - w.metrics["trust"]) * 100.0 / t0
+        return f"{pct:.1f}% > {ethics['max_trust_drop_pct']}%" if pct > float(ethics["max_trust_drop_pct"]) else None
+
+    add("max_trust_drop_pct", "trust", trust_drop, "caída de confianza")
+
+    def gini_increase(w):
+        g0 = 1.0 - w.start.get("equity", 100.0) / 100.0
+        if g0 <= 0:
+            return None
+        pct = ((1.0 - w.metrics["equity"] / 100.0) - g0) * 100.0 / g0
+        limit = float(ethics["max_gini_increase_pct"])
+        return f"gini +{pct:.1f}% > {limit}%" if pct > limit else None
+
+    add("max_gini_increase_pct", "equity", gini_increase, "aumento de inequidad")
+
+    def top_share(w):
+        st = w.state
+        share = float(st.xs[-1]) / st.res_sum if st.res_sum > 0 and len(st.xs) else 0.0
+        limit = float(ethics["max_resource_share"])
+        return f"{share * 100:.1f}% > {limit * 100:.0f}%" if share > limit else None
+
+    add("max_resource_share", "equity", top_share, "concentración de recursos")
+    return rules
+
+
+def yaml_rules(rules: Iterable[Dict[str, Any]]) -> List[WatchRule]:
+    """
+    Reglas de ethics_rules.yaml evaluables sobre el grafo vivo. El resto
+    (required_subnetwork, expr) depende de tags del source y queda en el pre-lint.
+    """
+    out: List[WatchRule] = []
+    for rule in rules or ():
+        cond = rule.get("condition") or {}
+        ctype = str(cond.get("type") or "").lower()
+        p = cond.get("params") or {}
+        rid = str(rule.get("id", "UNKNOWN"))
+        sev = str(rule.get("severity") or "warn").lower()
+        name = str(rule.get("name", rid))
+        if ctype == "metric_drop_percent" and p.get("metric") in METRIC_DEPS:
+            out.append(WatchRule(rid, p["metric"], _drop_test(p["metric"], float(p.get("max_drop_percent", 0))),
+                                 sev, name))
+        elif ctype == "min_links_per_node":
+            ignore = {str(t).upper() for t in (p.get("ignore_types") or [])}
+            min_deg = int(p.get("min_degree", 1))
+
+            def links(w, n, ignore=ignore, min_deg=min_deg):
+                if str(w.rt.graph.nodes[n].get("kind", "")).upper() in ignore:
+                    return None
+                d = w.rt.graph.degree(n)
+                return d if d < min_deg else None
+
+            out.append(WatchRule(rid, "node", links, sev, name))
+    return out
+
+
+def _drop_test(metric: str, max_drop: float):
+    def test(w):
+        prev = float(w.start.get(metric, 0.0))
+        if prev <= 0:
+            return None
+        drop = (prev - w.metrics[metric]) * 100.0 / prev
+        if drop > max_drop:
+            return f"caída {drop:.2f}% > {max_drop:.2f}% (prev={prev:.2f}, actual={w.metrics[metric]:.2f})"
+        return None
+    return test
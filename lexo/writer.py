@@ -0,0 +1,82 @@
+# lexo/writer.py - escritura de reportes en segundo plano (cola acotada)
+"""
+ReportWriter saca la serialización y la escritura de reportes (run_*.json,
+report.csv, blockade_summary.json, CHANGELOG.md) del camino de la corrida:
+execute() encola el trabajo y sigue apenas tiene las métricas.
+
+- Un hilo trabajador, cola FIFO acotada (maxsize): el orden de escritura se
+  respeta (las líneas de CHANGELOG quedan en orden) y, si el disco no da abasto,
+  submit() bloquea en vez de acumular payloads sin límite.
+- flush() espera a que la cola se vacíe; close() además termina el hilo. Se
+  registra close() con atexit, así todo lo encolado se escribe antes de salir
+  (también tras sys.exit / SystemExit).
+- Los errores de un trabajo no matan al hilo: se imprimen como [WARN] y quedan
+  en .errors.
+
+El hilo es daemon a propósito: threading espera a los hilos no-daemon ANTES de
+correr atexit, y uno bloqueado en get() colgaría la salida.
+"""
+import atexit
+import queue
+import threading
+from typing import Any, Callable, List, Tuple
+
+_STOP = object()
+
+
+class ReportWriter:
+
+    def __init__(self, maxsize: int = 8):
+        self._q: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self.errors: List[Tuple[str, BaseException]] = []
+        self.done = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="lexo-report-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self) -> None:
+        while True:
+            job = self._q.get()
+            try:
+                if job is _STOP:
+                    return
+                fn, args, kwargs = job
+                try:
+                    fn(*args, **kwargs)
+                    self.done += 1
+                except Exception as e:  # un reporte fallido no frena a los siguientes
+                    name = getattr(fn, "__name__", repr(fn))
+                    self.errors.append((name, e))
+                    print(f"[WARN] Escritura en segundo plano falló ({name}): {e}")
+            finally:
+                self._q.task_done()
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> None:
+        """Encola fn(*args, **kwargs); bloquea si la cola está llena. Cerrado → síncrono."""
+        if self._closed:
+            fn(*args, **kwargs)
+            return
+        self._q.put((fn, args, kwargs))
+
+    def flush(self) -> None:
+        """Espera a que se escriba todo lo encolado hasta ahora."""
+        if not self._closed:
+            self._q.join()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._q.put(_STOP)
+        self._thread.join()
+        self._closed = True
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,9 +1,14 @@
 # linter.py — v0.4
+import copy
+import hashlib
+import os
 from dataclasses import dataclass, field
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Tuple
 
 import yaml
 
+from lexo.expr import ExprError, Scope, compile_expr, scope_for
+
 
 @dataclass
 class Violation:
@@ -21,10 +26,108 @@ class LintReport:
   def should_block(self) -> bool:
     return any(v.severity == "block" for v in self.violations)
 
+# === Cache de YAML + plan compilado ===
+# Clave: ruta absoluta. Si el mtime no cambió se reutiliza; si cambió pero el
+# contenido (sha1) es el mismo, también. Compartido por todas las corridas del proceso.
+_YAML_CACHE: Dict[str, Tuple[int, str, Any]] = {}
+_PLAN_CACHE: Dict[Tuple[str, str], "RulePlan"] = {}
+
+
+def _read_cached(path: str) -> Tuple[str, Any]:
+  """(sha1, datos) del YAML; parsea sólo si el archivo cambió de verdad."""
+  key = os.path.abspath(path)
+  mtime = os.stat(key).st_mtime_ns
+  hit = _YAML_CACHE.get(key)
+  if hit and hit[0] == mtime:
+    return hit[1], hit[2]
+  with open(key, "rb") as f:
+    raw = f.read()
+  digest = hashlib.sha1(raw).hexdigest()
+  if hit and hit[1] == digest:
+    data = hit[2]
+  else:
+    data = yaml.safe_load(raw.decode("utf-8"))
+  _YAML_CACHE[key] = (mtime, digest, data)
+  return digest, data
+
+
+def load_yaml(path: str) -> Any:
+  """yaml.safe_load(path) con cache por mtime + hash; devuelve una copia que se puede mutar
+  (el objeto cacheado queda interno, lo comparte sólo compile_plan)."""
+  return copy.deepcopy(_read_cached(path)[1])
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+  id: str
+  severity: str
+  when: str  # "pre" | "post" | "both"
+  message: str  # "nombre: descripción"
+  remediation: str | None
+  check: Callable[[Dict[str, Any]], Tuple[bool, str]]  # params ya ligados
+  metrics: frozenset = frozenset()  # métricas plan/previous que necesita
+
+
+@dataclass
+class RulePlan:
+  digest: str
+  config: Dict[str, Any]
+  rules: List[CompiledRule]
+
+  def __post_init__(self):
+    self._by_phase = {ph: [r for r in self.rules if r.when in (ph, "both")]
+                      for ph in ("pre", "post")}
+
+  def metrics(self, phase: str | None = None) -> frozenset:
+    """Métricas que leen las reglas (de una fase o de todas); el resto no hace falta calcularlas."""
+    rules = self.rules if phase is None else self.phase(phase)
+    return frozenset().union(*(r.metrics for r in rules))
+
+  def phase(self, phase: str) -> List[CompiledRule]:
+    return self._by_phase.get(phase, [])
+
+
+def compile_rules(config: Dict[str, Any]) -> List[CompiledRule]:
+  """YAML → reglas con el tipo de condición resuelto y schema.defaults mezclados."""
+  defaults = ((config.get("schema") or {}).get("defaults") or {})
+  out: List[CompiledRule] = []
+  for rule in config.get("rules") or []:
+    when = (rule.get("when") or "both").lower()
+    if when not in ("pre", "post", "both"):
+      continue
+    cond = rule.get("condition") or {}
+    ctype = (cond.get("type") or "").lower()
+    params = {**(defaults.get(ctype) or {}), **(cond.get("params") or {})}
+    binder = _BINDERS.get(ctype)
+    check = binder(params) if binder else _unknown(ctype)
+    name = rule.get("name", rule.get("id", "Regla"))
+    out.append(CompiledRule(
+      id=rule.get("id", "UNKNOWN"),
+      severity=(rule.get("severity") or "warn").lower(),
+      when=when,
+      message=f"{name}: {rule.get('description', '')}",
+      remediation=rule.get("remediation"),
+      check=check,
+      metrics=_rule_metrics(ctype, params),
+    ))
+  return out
+
+
+def compile_plan(rules_path: str) -> RulePlan:
+  """Plan compilado para rules_path; se recompila sólo si cambia el contenido."""
+  digest, config = _read_cached(rules_path)
+  key = (os.path.abspath(rules_path), digest)
+  plan = _PLAN_CACHE.get(key)
+  if plan is None:
+    config = config or {}
+    plan = _PLAN_CACHE[key] = RulePlan(digest, config, compile_rules(config))
+  return plan
+
+
 class EthicsLinter:
   def __init__(self, rules_path: str):
-    with open(rules_path, "r", encoding="utf-8") as f:
-      self.config = yaml.safe_load(f)
+    self.plan = compile_plan(rules_path)
+    self.config = self.plan.config
     self.rules = self.config.get("rules", [])
 
   def run_pre(self, ctx: Dict[str, Any]) -> LintReport:
@@ -35,24 +138,18 @@ class EthicsLinter:
 
   def _run_for_phase(self, phase: str, ctx: Dict[str, Any]) -> LintReport:
     report = LintReport(phase=phase)
-    for rule in self.rules:
-      when = (rule.get("when") or "both").lower()
-      if when not in ("pre", "post", "both"):
-        continue
-      if when != phase and when != "both":
-        continue
-
-      cond = rule.get("condition", {})
-      ctype = (cond.get("type") or "").lower()
-      params = cond.get("params", {})
-      ok, detail = self._eval_condition(ctype, params, ctx)
+    # un Scope por corrida: las reglas expr comparten agregados y grados
+    ctx = dict(ctx)
+    ctx["_expr_scope"] = Scope(ctx)
+    for rule in self.plan.phase(phase):
+      ok, detail = rule.check(ctx)
       if not ok:
         report.violations.append(
           Violation(
-            rule_id=rule.get("id", "UNKNOWN"),
-            severity=(rule.get("severity") or "warn").lower(),
-            message=self._format_message(rule, detail),
-            remediation=rule.get("remediation"),
+            rule_id=rule.id,
+            severity=rule.severity,
+            message=f"{rule.message} — {detail}" if detail else rule.message,
+            remediation=rule.remediation,
           )
       )
     return report
@@ -64,68 +161,103 @@ class EthicsLinter:
         return f"{name}: {desc} — {detail}"
       return f"{name}: {desc}"
 
+  def _eval_condition(self, ctype: str, params: Dict[str, Any], ctx: Dict[str, Any]):
+      binder = _BINDERS.get(ctype)
+      return (binder(params) if binder else _unknown(ctype))(ctx)
+
 
 # === Evaluadores de condiciones ===
-  def _eval_condition(self, ctype: str, params: Dict[str, Any], ctx: Dict[str, Any]):
-      if ctype == "metric_drop_percent":
-        return self._check_metric_drop_percent(params, ctx)
-      if ctype == "min_links_per_node":
-        return self._check_min_links_per_node(params, ctx)
-      if ctype == "required_subnetwork":
-        return self._check_required_subnetwork(params, ctx)
-      if ctype == "expr":
-        return self._check_expr(params, ctx)
-      return True, f"Tipo de condición desconocido: {ctype} (ignorada)"
-
-  def _check_metric_drop_percent(self, p: Dict[str, Any], ctx: Dict[str, Any]):
-      metric = p.get("metric")
-      max_drop = float(p.get("max_drop_percent", 0))
-      baseline_src = (p.get("baseline_source") or "previous").lower()
-      # ctx: {"metrics": {"previous": {"equity": 62}, "plan": {"equity": 55}}}
-      prev = (ctx.get("metrics", {}).get("previous", {}) or {})
-      plan = (ctx.get("metrics", {}).get("plan", {}) or {})
-      if metric not in prev or metric not in plan:
-        return True, f"Métrica {metric} no disponible en contexto (prev/plan)."
-      prev_val = float(prev[metric])
-      plan_val = float(plan[metric])
-      if prev_val <= 0:
-        return True, "Baseline cero/no válida; no se evalúa caída porcentual."
-      drop = ((prev_val - plan_val) / prev_val) * 100.0
-      if drop > max_drop:
-        return False, f"Caída {drop:.2f}% > {max_drop:.2f}% (prev={prev_val:.2f}, plan={plan_val:.2f})."
-      return True, f"Caída {drop:.2f}% dentro de umbral (≤ {max_drop:.2f}%)."
-
-  def _check_min_links_per_node(self, p: Dict[str, Any], ctx: Dict[str, Any]):
-      min_deg = int(p.get("min_degree", 1))
-      ignore_types = set((p.get("ignore_types") or []))
-      # ctx["graph"] = {"nodes": [{"id":..., "type":...}], "edges": [{"u":..., "v":..., "tags": [...]}]}
-      g = ctx.get("graph", {})
-      nodes = g.get("nodes", [])
-      edges = g.get("edges", [])
-      deg = {n["id"]: 0 for n in nodes if n.get("type") not in ignore_types}
-      for e in edges:
-        u, v = e.get("u"), e.get("v")
-        if u in deg: deg[u] += 1
-        if v in deg: deg[v] += 1
-      bad = [nid for nid, d in deg.items() if d < min_deg]
-      if bad:
-        return False, f"Nodos con grado < {min_deg}: {bad}"
-      return True, "Todos los nodos cumplen el grado mínimo."
-
-  def _check_required_subnetwork(self, p: Dict[str, Any], ctx: Dict[str, Any]):
-      tag = p.get("tag")
-      min_edges = int(p.get("min_edges", 1))
-      g = ctx.get("graph", {})
-      edges = g.get("edges", [])
-      count = 0
-      for e in edges:
-        tags = set(e.get("tags") or [])
-        if tag in tags:
-            count += 1
-      if count < min_edges:
-          return False, f"Se requieren ≥{min_edges} vínculos con tag '{tag}', encontrados: {count}."
-      return True, f"Subred '{tag}' válida con {count} vínculos."
-
-  def _check_expr(self, p: Dict[str, Any], ctx: Dict[str, Any]):
-    # Espacio para expresiones avanzadas (opcional v0.4)
-    return True, "expr no evaluada (placeholder)."
\ No newline at end of file
+# Cada binder recibe los params (con defaults ya mezclados), convierte tipos
+# una sola vez y devuelve check(ctx) → (ok, detalle).
+def _bind_metric_drop_percent(p: Dict[str, Any]):
+  metric = p.get("metric")
+  max_drop = float(p.get("max_drop_percent", 0))
+
+  def check(ctx: Dict[str, Any]):
+    # ctx: {"metrics": {"previous": {"equity": 62}, "plan": {"equity": 55}}}
+    prev = (ctx.get("metrics", {}).get("previous", {}) or {})
+    plan = (ctx.get("metrics", {}).get("plan", {}) or {})
+    if metric not in prev or metric not in plan:
+      return True, f"Métrica {metric} no disponible en contexto (prev/plan)."
+    prev_val = float(prev[metric])
+    plan_val = float(plan[metric])
+    if prev_val <= 0:
+      return True, "Baseline cero/no válida; no se evalúa caída porcentual."
+    drop = ((prev_val - plan_val) / prev_val) * 100.0
+    if drop > max_drop:
+      return False, f"Caída {drop:.2f}% > {max_drop:.2f}% (prev={prev_val:.2f}, plan={plan_val:.2f})."
+    return True, f"Caída {drop:.2f}% dentro de umbral (≤ {max_drop:.2f}%)."
+  return check
+
+
+def _bind_min_links_per_node(p: Dict[str, Any]):
+  min_deg = int(p.get("min_degree", 1))
+  ignore_types = frozenset(p.get("ignore_types") or [])
+
+  def check(ctx: Dict[str, Any]):
+    # ctx["graph"] = {"nodes": [{"id":..., "type":...}], "edges": [{"u":..., "v":..., "tags": [...]}]}
+    g = ctx.get("graph", {})
+    deg = {n["id"]: 0 for n in g.get("nodes", []) if n.get("type") not in ignore_types}
+    for e in g.get("edges", []):
+      u, v = e.get("u"), e.get("v")
+      if u in deg: deg[u] += 1
+      if v in deg: deg[v] += 1
+    bad = [nid for nid, d in deg.items() if d < min_deg]
+    if bad:
+      return False, f"Nodos con grado < {min_deg}: {bad}"
+    return True, "Todos los nodos cumplen el grado mínimo."
+  return check
+
+
+def _bind_required_subnetwork(p: Dict[str, Any]):
+  tag = p.get("tag")
+  min_edges = int(p.get("min_edges", 1))
+
+  def check(ctx: Dict[str, Any]):
+    edges = ctx.get("graph", {}).get("edges", [])
+    count = sum(1 for e in edges if tag in (e.get("tags") or ()))
+    if count < min_edges:
+      return False, f"Se requieren ≥{min_edges} vínculos con tag '{tag}', encontrados: {count}."
+    return True, f"Subred '{tag}' válida con {count} vínculos."
+  return check
+
+
+def _bind_expr(p: Dict[str, Any]):
+  # params: {expr: "count(edges where 'care_network' in tags) >= 3"} (ver lexo/expr.py)
+  src = p.get("expr") or p.get("expression") or ""
+  try:
+    compiled = compile_expr(src)
+  except ExprError as e:
+    err = f"expr inválida ({e})"
+    return lambda ctx: (False, err)
+
+  def check(ctx: Dict[str, Any]):
+    try:
+      ok = bool(compiled.evaluate(scope_for(ctx)))
+    except ExprError as e:
+      return True, f"expr no evaluable ({e}); no se aplica."
+    return (True, f"Cumple: {src}") if ok else (False, f"No cumple: {src}")
+  return check
+
+
+def _rule_metrics(ctype: str, p: Dict[str, Any]) -> frozenset:
+  if ctype == "metric_drop_percent" and p.get("metric"):
+    return frozenset([p["metric"]])
+  if ctype == "expr":
+    try:
+      return compile_expr(p.get("expr") or p.get("expression") or "").metrics
+    except ExprError:
+      return frozenset()
+  return frozenset()
+
+
+def _unknown(ctype: str):
+  return lambda ctx: (True, f"Tipo de condición desconocido: {ctype} (ignorada)")
+
+
+_BINDERS: Dict[str, Callable[[Dict[str, Any]], Callable]] = {
+  "metric_drop_percent": _bind_metric_drop_percent,
+  "min_links_per_node": _bind_min_links_per_node,
+  "required_subnetwork": _bind_required_subnetwork,
+  "expr": _bind_expr,
+}
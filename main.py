@@ -6,7 +6,7 @@
 # =========================
 # IMPORTS
 # =========================
-from linter import EthicsLinter 
+from linter import EthicsLinter, compile_plan, load_yaml
 from core_helpers import append_changelog_lint
 from core_helpers import build_lint_context
 
@@ -32,10 +32,29 @@ from core_helpers import (
     load_ethics_thresholds, blocker_decision,
     write_blockade_summary, append_changelog, ensure_whatif_never_mutates,
 )
+from lexo.sweep import expand_range, run_sweep
+from lexo.montecarlo import run_montecarlo
+from lexo.incremental import IncrementalMetrics, LiveMetrics
+from lexo.optimize import OptimizeConfig, optimize
+from lexo.blocker import BlockerPolicy
+from lexo import sensitivity
+from lexo.arrays import GraphArrays
+from lexo.propagate import propagate_trust
+from lexo.recommend import adjacency, recommend_connections
+from lexo import robustness
+from lexo.attribution import attribute, top_contributors
+from lexo.quotient import Quotient
+from lexo.indexes import RuntimeIndex
+from lexo.offenders import OffenderSink, scan_snapshots
+from lexo.watch import EthicsAbort, EthicsWatch, ethics_rules, yaml_rules
+from lexo.stream import StreamStop, StreamingBlocker, policy_rules
+from lexo.history import MetricsHistory
+from lexo.writer import ReportWriter
+from lexo.reports import FORMATS as REPORT_FORMATS, PROFILES as REPORT_PROFILES, NodeTable, write_report
+from lexo.shard import SUPPORTED as SHARD_SUPPORTED, ShardedRuntime, partition
+from lexo.ticks import TickConfig, run_ticks, summarize as summarize_ticks, save_csv as save_ticks_csv
 
 
-warnings.filterwarnings(
-    "ignore",
 import warnings
 import time
 import random
@@ -67,6 +86,30 @@ WHATIF_SAVED: bool = False
 NO_WHATIF_TABLE: bool = False
 WHATIF_DIMS: list[str] | None = None
 SORT_WHATIF_BY: str | None = None  # "trust" | "cohesion" | "equity" | None
+SWEEP_LOG: list[dict] = []  # resúmenes de WHAT_IF_SWEEP para el reporte
+SWEEP_WORKERS: int | None = None  # None = os.cpu_count()
+SIMULATE_LOG: list[dict] = []  # resúmenes de SIMULATE N para el reporte
+OPTIMIZE_LOG: list[dict] = []  # planes sugeridos por OPTIMIZE
+TICKS_LOG: list[dict] = []  # resúmenes de SIMULATE_TICKS
+ROBUSTNESS_LOG: list[dict] = []  # rankings de vulnerabilidad (ROBUSTNESS)
+COARSE_MODE: bool = False  # WHAT_IF sobre el grafo cociente por comunidad
+COARSE_REFINE: bool = False  # además, confirmar con el grafo completo
+RECOMMEND_K: int = 5  # sugerencias CONNECT en el reporte (0 = desactivado)
+ETHICS_TOP_K: int = 3  # peores infractores por regla en las alertas
+ETHICS_OFFENDERS_PATH: str | None = None  # CSV con todos los infractores (--offenders)
+ETHICS_HITS: dict = {}  # último conteo/top-k por regla (lint_compare_v2)
+WATCH_MODE: bool = False  # reglas éticas evaluadas tras cada acción (--watch)
+WATCH_ABORT: bool = False  # abortar ante la primera violación block (--abort-on-block)
+WATCH_RULES_PATH: str = "ethics_rules.yaml"
+STREAM_WINDOW: int = 0  # blocker por ventana sobre la serie de métricas (0 = desactivado)
+STREAM_K: int = 1  # muestras seguidas en violación antes de cortar
+STREAM_SLOPE: float | None = None  # además, cortar si la pendiente por muestra < esto
+RUN_STORE = None  # lexo.runstore.RunStore (--store); None = sólo archivos
+METRICS_HISTORY = None  # lexo.history.MetricsHistory (--history DIR)
+REPORT_WRITER = None  # lexo.writer.ReportWriter (--async-reports); None = escritura síncrona
+FILE_EXPORTS: bool = True  # run_*.json, report.csv, blockade_summary.json, CHANGELOG.md
+REPORT_FORMAT: str = "json"  # lexo.reports.FORMATS (--report-format)
+REPORT_PROFILE: str = "full"  # "summary" = sin mapas por nodo (--report-profile)
 
 # Globals (arriba del archivo, junto a los otros)
 WHATIF_TABLE_PRINTED = False
@@ -89,9 +132,7 @@ def apply_ethics_yaml_once(path="ethics.yaml"):
     if ETHICS_LOADED:
         return
     try:
-        import yaml
-        with open(path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
+        data = load_yaml(path) or {}
         if isinstance(data, dict) and data:
             ETHICS.update(data)
             
@@ -137,6 +178,16 @@ TOKEN_MAP = {
         r"\bmostrar_red\b": "SHOW_NETWORK",
         r"\bwhat_if\b": "WHAT_IF",
         r"\bque_pasa_si\b": "WHAT_IF",
+        r"\bwhat_if_sweep\b": "WHAT_IF_SWEEP",
+        r"\bque_pasa_si_barrido\b": "WHAT_IF_SWEEP",
+        r"\bsimular\b": "SIMULATE",
+        r"\bsimulate\b": "SIMULATE",
+        r"\bsimular_pasos\b": "SIMULATE_TICKS",
+        r"\bsimulate_ticks\b": "SIMULATE_TICKS",
+        r"\boptimizar\b": "OPTIMIZE",
+        r"\boptimize\b": "OPTIMIZE",
+        r"\brobustez\b": "ROBUSTNESS",
+        r"\brobustness\b": "ROBUSTNESS",
         r"\baplicar\b": "APPLY",
         r"\bapply\b": "APPLY",
         r"\bcomparar\b": "COMPARE",
@@ -160,6 +211,7 @@ TOKEN_MAP = {
         r"\bcompromiso\b": "commitment",
         r"\bredistribuir_recursos\b": "REDISTRIBUTE_RESOURCES",
         r"\bcuidar_red\b": "CARE_NETWORK",
+        r"\bpropagar_confianza\b": "PROPAGATE_TRUST",
         r"\bplan_mitigación\b": "mitigation_plan",
         r"\bplan_mitigacion\b": "mitigation_plan",
         r"\brecursos\b": "resources",
@@ -189,6 +241,16 @@ TOKEN_MAP = {
         r"\bshow_network\b": "SHOW_NETWORK",
         r"\bwhat_if\b": "WHAT_IF",
         r"\bque_pasa_si\b": "WHAT_IF",
+        r"\bwhat_if_sweep\b": "WHAT_IF_SWEEP",
+        r"\bque_pasa_si_barrido\b": "WHAT_IF_SWEEP",
+        r"\bsimular\b": "SIMULATE",
+        r"\bsimulate\b": "SIMULATE",
+        r"\bsimular_pasos\b": "SIMULATE_TICKS",
+        r"\bsimulate_ticks\b": "SIMULATE_TICKS",
+        r"\boptimizar\b": "OPTIMIZE",
+        r"\boptimize\b": "OPTIMIZE",
+        r"\brobustez\b": "ROBUSTNESS",
+        r"\brobustness\b": "ROBUSTNESS",
         r"\baplicar\b": "APPLY",
         r"\bapply\b": "APPLY",
         r"\bcomparar\b": "COMPARE",
@@ -205,6 +267,7 @@ TOKEN_MAP = {
         r"\bcommitment\b": "commitment",
         r"\bredistribute_resources\b": "REDISTRIBUTE_RESOURCES",
         r"\bcare_network\b": "CARE_NETWORK",
+        r"\bpropagate_trust\b": "PROPAGATE_TRUST",
         r"\bmitigation_plan\b": "mitigation_plan",
         r"\bresources\b": "resources",
         r"\bHIGH\b": "HIGH",
@@ -259,18 +322,32 @@ def lint_compare(prev_metrics, new_metrics):
     return alerts
 
 
-def lint_compare_v2(prev_snap, new_snap, prev_m, new_m):
+def lint_compare_v2(prev_snap, new_snap, prev_m, new_m, attribution=None):
+    """attribution: filas de attribute() sobre new_snap si ya se calcularon (si no, a pedido)."""
     alerts = []
 
+    # Reglas por nodo/arista (1, 4, 5, 6, 7): un único pase, conteo + k peores
+    k = max(1, ETHICS_TOP_K)
+    sink = OffenderSink(ETHICS_OFFENDERS_PATH) if ETHICS_OFFENDERS_PATH else None
+    try:
+        hits = scan_snapshots(prev_snap, new_snap, ETHICS, k=k, sink=sink)
+    finally:
+        if sink is not None:
+            sink.close()
+    ETHICS_HITS.clear()
+    ETHICS_HITS.update(hits)
+    if sink is not None:
+        print(f"[OK] {sink.rows} infractores guardados en {sink.path}")
+
     # --- Reglas incrementales (comparan antes vs después) ---
-    # 1) Caída fuerte en algún vínculo
-    for e, prev_t in prev_snap["edges"].items():
-        new_t = new_snap["edges"].get(e, prev_t)
-        if prev_t - new_t > ETHICS["max_edge_trust_drop"]:
-            u, v = e
-            alerts.append(
-                f"[ETHICS] El vínculo {u}–{v} perdió {prev_t-new_t:.1f} pts (> {ETHICS['max_edge_trust_drop']}). "
-                f"Sugerencia: cuidar_red('{u}' o '{v}', intensity=ALTA).")
+    # 1) Caída fuerte en vínculos
+    drop = hits["edge_drop"]
+    if drop.count:
+        u, v = drop.worst[0][0]
+        alerts.append(
+            f"[ETHICS] {drop.count} vínculo(s) perdieron más de {ETHICS['max_edge_trust_drop']} pts; "
+            f"peores: {drop.sample()}. "
+            f"Sugerencia: cuidar_red('{u}' o '{v}', intensity=ALTA).")
 
     # 2) Aumento de inequidad (gini)
     if prev_snap["gini"] > 0:
@@ -291,47 +368,45 @@ def lint_compare_v2(prev_snap, new_snap, prev_m, new_m):
         )
 
     # 4) Nodos con confianza muy baja
-    low_nodes = [
-        n for n, t in new_snap["node_trust"].items()
-        if t < ETHICS["low_node_trust"]
-    ]
-    if low_nodes:
-        sample = ", ".join(list(low_nodes)[:3])
+    low = hits["low_node_trust"]
+    if low.count:
         alerts.append(
-            f"[ETHICS] Nodos con confianza muy baja (<{ETHICS['low_node_trust']}): {sample}..."
+            f"[ETHICS] {low.count} nodo(s) con confianza muy baja (<{ETHICS['low_node_trust']}); "
+            f"peores: {low.sample()}."
             f" Sugerencia: cuidar_red(target), mentorías o pequeñas victorias visibles."
         )
 
     # 5) Vínculos con confianza muy baja
-    low_edges = [(u, v) for (u, v), t in new_snap["edges"].items()
-                 if t < ETHICS["low_edge_trust"]]
-    if low_edges:
-        u, v = low_edges[0]
+    low = hits["low_edge_trust"]
+    if low.count:
+        u, v = low.worst[0][0]
         alerts.append(
-            f"[ETHICS] Hay vínculos con confianza muy baja (<{ETHICS['low_edge_trust']}), ej. {u}–{v}. "
+            f"[ETHICS] {low.count} vínculo(s) con confianza muy baja (<{ETHICS['low_edge_trust']}); "
+            f"peores: {low.sample()}. "
             f"Sugerencia: cuidar_red('{u}' o '{v}', intensity=MEDIA/ALTA).")
 
-    # 6) Nodos aislados / grado insuficiente
-    isolated = [
-        n for n, d in new_snap["degrees"].items()
-        if d < ETHICS["min_node_degree"]
-    ]
-    if isolated:
-        sample = ", ".join(list(isolated)[:3])
+    # 6) Nodos aislados / grado insuficiente (sugerencias sólo para los k peores)
+    isolated = hits["low_degree"]
+    if isolated.count:
+        adj = adjacency(new_snap["degrees"], new_snap["edges"])
+        recs = recommend_connections(adj, k=3, focus=isolated.keys())
+        if recs:
+            hint = "; ".join(f"conectar('{r.a}','{r.b}') (cohesión {r.cohesion_before:.1f}→{r.cohesion_after:.1f})"
+                             for r in recs)
+        else:
+            hint = "conectar(nodo, 'Barrio Sur') o introducir puentes"
         alerts.append(
-            f"[ETHICS] Nodos aislados o casi aislados: {sample}..."
-            f" Sugerencia: conectar(nodo, 'Barrio Sur') o introducir puentes.")
+            f"[ETHICS] {isolated.count} nodo(s) aislados o casi aislados; "
+            f"peores: {isolated.sample('{:.0f}')}."
+            f" Sugerencia: {hint}.")
 
     # 7) Recursos por debajo del mínimo
-    starved = [
-        n for n, r in new_snap["res_by_node"].items()
-        if r < ETHICS["min_resources_per_node"]
-    ]
-    if starved:
-        sample = ", ".join(list(starved)[:3])
+    starved = hits["starved"]
+    if starved.count:
         alerts.append(
-            f"[ETHICS] Nodos con recursos insuficientes (<{ETHICS['min_resources_per_node']}): {sample}..."
-            f" Sugerencia: redistribuir_recursos(dador, '{starved[0]}', fraction=0.1–0.3)."
+            f"[ETHICS] {starved.count} nodo(s) con recursos insuficientes (<{ETHICS['min_resources_per_node']}); "
+            f"peores: {starved.sample()}."
+            f" Sugerencia: redistribuir_recursos(dador, '{starved.worst[0][0]}', fraction=0.1–0.3)."
         )
 
     # 8) Concentración excesiva (antimonopolio de recursos)
@@ -341,11 +416,50 @@ def lint_compare_v2(prev_snap, new_snap, prev_m, new_m):
             f"Sugerencia: redistribuir_recursos(dador_rico, receptor_con_menos, fraction=0.15–0.30)."
         )
 
-    # 9) Reglas v0.1
+    # 9) Atribución: qué nodos explican la inequidad / la falta de cohesión
+    low_eq = new_m["equity"] < ETHICS["min_equity_score"]
+    low_coh = new_m["cohesion"] < ETHICS.get("min_cohesion_score", 0.0)
+    if low_eq or low_coh:
+        rows = attribution if attribution is not None else attribute(snapshot_metrics_state(new_snap))
+        if low_eq:
+            top = ", ".join(f"{r.node} ({r.equity_loss:.1f} pts)"
+                            for r in top_contributors(rows, "equity"))
+            alerts.append(
+                f"[ETHICS] Mayores aportes a la inequidad ({100 - new_m['equity']:.1f} pts): {top}."
+                f" Sugerencia: redistribuir_recursos desde/hacia esos nodos.")
+        if low_coh:
+            top = ", ".join(f"{r.node} ({r.cohesion_loss:.1f} pts)"
+                            for r in top_contributors(rows, "cohesion"))
+            alerts.append(
+                f"[ETHICS] La cohesión es {new_m['cohesion']:.1f} (< {ETHICS['min_cohesion_score']}). "
+                f"Mayores aportes de tríadas abiertas: {top}."
+                f" Sugerencia: conectar vecinos de esos nodos entre sí.")
+
+    # 10) Reglas v0.1
     alerts += lint_compare(prev_m, new_m)
     return alerts
 
 
+def snapshot_metrics_state(snap) -> IncrementalMetrics:
+    """Estado incremental a partir de un snapshot_state (sin tocar el Runtime)."""
+    return IncrementalMetrics(trust=snap["node_trust"], resources=snap["res_by_node"],
+                              edges=snap["edges"])
+
+
+def attribution_report(snap, k: int = 5, rows=None) -> dict:
+    """Top-k nodos por aporte a (100 − equity) y (100 − cohesion) para el reporte."""
+    if rows is None:
+        rows = attribute(snapshot_metrics_state(snap))
+    return {
+        "equity": [{"node": r.node, "points": round(r.equity_loss, 4),
+                    "marginal": round(r.marginal["equity"], 4)}
+                   for r in top_contributors(rows, "equity", k)],
+        "cohesion": [{"node": r.node, "points": round(r.cohesion_loss, 4),
+                      "marginal": round(r.marginal["cohesion"], 4)}
+                     for r in top_contributors(rows, "cohesion", k)],
+    }
+
+
 import json, csv, os
 
 
@@ -421,13 +535,13 @@ def save_whatif_csv(path: str = "whatif.csv") -> None:
     except Exception as e:
         print(f"[WARN] No se pudo guardar {path}: {e}")
 
-def evaluate_ethics(rt, start_snap, final_snap, start_metrics, final_metrics):
+def evaluate_ethics(rt, start_snap, final_snap, start_metrics, final_metrics, attribution=None):
     """
     Wrapper del linter ético v2: compara estado inicial vs final y devuelve lista de alertas.
     """
     # Asume que tenés lint_compare_v2(prev_snap, new_snap, prev_m, new_m) ya definido.
     return lint_compare_v2(start_snap, final_snap, start_metrics,
-                           final_metrics)
+                           final_metrics, attribution=attribution)
 
 
 # =========================
@@ -725,9 +839,7 @@ def load_ethics_from_yaml(path="ethics.yaml"):
     if not os.path.exists(path):
         return None
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
-        return data
+        return load_yaml(path) or {}
     except Exception as e:
         print(f"[WARN] No se pudo leer {path}: {e}")
         return None
@@ -766,6 +878,7 @@ ETHICS.update({
     "min_resources_per_node": 2.0,  # umbral mínimo de recursos por nodo
     "max_resource_share":
     0.50,  # si un solo nodo concentra >40% de los recursos
+    "min_cohesion_score": 30.0,  # mismo mínimo que BlockerPolicy.min["cohesion"]
 })
 
 WS = r"[ \t]*"
@@ -1058,6 +1171,111 @@ def print_whatif_table(log: list[dict], dims: list[str] | None):
         print(line)
 
 
+_RANGE_CALL = re.compile(r"\b(?:range|rango)\s*\(([^)]*)\)", flags=re.I)
+
+
+def _expand_range_calls(text: str) -> str:
+    """range(a, b, paso) → [a, a+paso, ..., b] para que parse_properties lo lea como lista."""
+
+    def _sub(m):
+        args = [_parse_number(x.strip()) for x in m.group(1).split(",")]
+        if len(args) == 2:
+            args.append(1)
+        if len(args) != 3 or any(a is None for a in args):
+            raise ValueError(f"range(...) inválido en WHAT_IF_SWEEP: {m.group(0)!r}")
+        return "[" + ", ".join(repr(x) for x in expand_range(*args)) + "]"
+
+    return _RANGE_CALL.sub(_sub, text)
+
+
+def _split_apply_body(body: str, stmt: str):
+    """
+    Cuerpo '{ opciones  APPLY { ... }  resto }' compartido por WHAT_IF_SWEEP y SIMULATE.
+    Devuelve (texto_opciones, apply_block, texto_resto).
+    """
+    m_apply = re.search(r"\bAPPLY\b", body, flags=re.I)
+    if not m_apply:
+        raise ValueError(f"Expected APPLY in {stmt}")
+    brace_pos = body.find("{", m_apply.end())
+    if brace_pos == -1:
+        raise ValueError("Expected '{' after APPLY")
+    apply_block, end_apply = extract_block(body, brace_pos)
+    return body[:m_apply.start()], apply_block, body[end_apply:]
+
+
+def _parse_sweep_body(body: str):
+    """
+    Cuerpo de WHAT_IF_SWEEP:
+        fraction: range(0.05, 0.5, 0.05),
+        min_left: [2, 8]
+        APPLY { redistribuir_recursos("A","B") { fraction: $fraction, min_left: $min_left } }
+        COMPARE: ["trust","equity"]        (opcional)
+    Devuelve (space, apply_block, dims).
+    """
+    head, apply_block, rest = _split_apply_body(body, "WHAT_IF_SWEEP")
+    space = {}
+    for k, v in parse_properties(_expand_range_calls(head)).items():
+        space[k] = v if isinstance(v, list) else [v]
+    if not space:
+        raise ValueError("WHAT_IF_SWEEP sin parámetros a barrer")
+
+    dims = ["trust", "cohesion", "equity"]
+    m_cmp = re.search(rf"COMPARE{WS}:{WS}\[(.*?)\]", rest, flags=re.S | re.I)
+    if m_cmp:
+        dims = [
+            d.strip().strip("\"'").lower()
+            for d in re.split(r"[,\n]", m_cmp.group(1)) if d.strip()
+        ]
+        dims = [d for d in dims if d in ("trust", "cohesion", "equity")]
+    return space, apply_block, dims or ["trust", "cohesion", "equity"]
+
+
+# Opciones de SIMULATE (ES/EN → canónico)
+_SIMULATE_KEYS = {
+    "semilla": "seed",
+    "ruido": "trust_noise",
+    "ruido_confianza": "trust_noise",
+    "prob_vinculo": "edge_prob",
+    "prob_vínculo": "edge_prob",
+    "percentiles": "percentiles",
+}
+
+
+def _parse_simulate_body(body: str):
+    """
+    Cuerpo de SIMULATE:
+        seed: 42, trust_noise: 0.3, edge_prob: 0.9, percentiles: [5, 50, 95]
+        APPLY { ... }
+    Devuelve (opts, apply_block).
+    """
+    head, apply_block, _ = _split_apply_body(body, "SIMULATE")
+    opts = {_SIMULATE_KEYS.get(k, k): v for k, v in parse_properties(head).items()}
+    return opts, apply_block
+
+
+# Opciones de SIMULATE_TICKS (ES/EN → campo de TickConfig)
+_TICKS_KEYS = {
+    "decaimiento": "decay",
+    "linea_base": "baseline",
+    "línea_base": "baseline",
+    "difusion": "diffusion",
+    "difusión": "diffusion",
+    "flujo": "flow",
+    "muestreo": "sample_every",
+    "cada": "sample_every",
+}
+
+
+def _tick_config(ticks: int, props: dict) -> TickConfig:
+    cfg = TickConfig(ticks=ticks)
+    for k, v in props.items():
+        key = _TICKS_KEYS.get(k, k)
+        if key not in ("decay", "baseline", "diffusion", "flow", "sample_every"):
+            raise ValueError(f"SIMULATE_TICKS: opción desconocida '{k}'")
+        setattr(cfg, key, int(v) if key == "sample_every" else float(v))
+    return cfg
+
+
 def parse_program(src: str):
     src = strip_line_comments(src)
     i = 0
@@ -1228,6 +1446,29 @@ def parse_program(src: str):
             ast.actions.append(("CARE_NETWORK", target, props))
             continue
 
+        # ------------------- PROPAGATE_TRUST ----------------
+        # PROPAGATE_TRUST("A", "B", ...) { damping: 0.85, strength: 10 }
+        if startswith_token(src, i, "PROPAGATE_TRUST"):
+            i += len("PROPAGATE_TRUST")
+            i = skip_ws_and_comments(src, i)
+            if i >= n or src[i] != "(":
+                raise ValueError("Expected '(' after PROPAGATE_TRUST")
+            arg_text, after_paren = extract_parens(src, i)
+            targets = tuple(re.findall(r'"([^"]+)"|\'([^\']+)\'', arg_text))
+            targets = tuple(a or b for a, b in targets)
+            if not targets:
+                raise ValueError("PROPAGATE_TRUST expects at least one quoted target")
+            i = after_paren
+
+            i = skip_ws_and_comments(src, i)
+            props = {}
+            if i < n and src[i] == "{":
+                props_text, i = extract_block(src, i)
+                props = parse_properties(props_text)
+
+            ast.actions.append(("PROPAGATE_TRUST", targets, props))
+            continue
+
         # -------------------- INTERVENE_IF ------------------
         if startswith_token(src, i, "INTERVENE_IF"):
             i += len("INTERVENE_IF")
@@ -1331,6 +1572,79 @@ def parse_program(src: str):
             ast.actions.append(("SHOW_NETWORK", ))
             continue
 
+        # WHAT_IF_SWEEP "Nombre" { param: [..] | range(a, b, paso), APPLY { ... $param ... } COMPARE: [ ... ] }
+        if startswith_token(src, i, "WHAT_IF_SWEEP"):
+            i += len("WHAT_IF_SWEEP")
+            i = skip_ws_and_comments(src, i)
+            title = ""
+            if i < n and src[i] in "\"'":
+                quote = src[i]
+                j = src.find(quote, i + 1)
+                if j == -1:
+                    raise ValueError("Unclosed WHAT_IF_SWEEP title")
+                title = src[i + 1:j].strip()
+                i = j + 1
+            i = skip_ws_and_comments(src, i)
+            if i >= n or src[i] != "{":
+                raise ValueError("Expected '{' after WHAT_IF_SWEEP")
+            body, i = extract_block(src, i)
+            space, apply_block, dims = _parse_sweep_body(body)
+            ast.actions.append(
+                ("WHAT_IF_SWEEP", title, space, apply_block, dims))
+            continue
+
+        # SIMULATE_TICKS N { decay: 0.01, baseline: 50, diffusion: 0.1, flow: 0.05, sample_every: 10 }
+        if startswith_token(src, i, "SIMULATE_TICKS"):
+            m = re.match(rf"SIMULATE_TICKS{WS}(\d+){WS}", src[i:], flags=re.I)
+            if not m:
+                raise ValueError("SIMULATE_TICKS expects a tick count: SIMULATE_TICKS N { ... }")
+            ticks = int(m.group(1))
+            i = skip_ws_and_comments(src, i + m.end())
+            props = {}
+            if i < n and src[i] == "{":
+                props_text, i = extract_block(src, i)
+                props = parse_properties(props_text)
+            ast.actions.append(("SIMULATE_TICKS", ticks, props))
+            continue
+
+        # SIMULATE N "Nombre" { seed: 42, trust_noise: 0.3, edge_prob: 0.9, APPLY { ... } }
+        if startswith_token(src, i, "SIMULATE"):
+            m = re.match(rf"SIMULATE{WS}(\d+){WS}(\"([^\"]*)\")?{WS}", src[i:],
+                         flags=re.I)
+            if not m:
+                raise ValueError("SIMULATE expects a replication count: SIMULATE N { ... }")
+            reps = int(m.group(1))
+            title = (m.group(3) or "").strip()
+            i = skip_ws_and_comments(src, i + m.end())
+            if i >= n or src[i] != "{":
+                raise ValueError("Expected '{' after SIMULATE N")
+            body, i = extract_block(src, i)
+            opts, apply_block = _parse_simulate_body(body)
+            ast.actions.append(("SIMULATE", reps, title, opts, apply_block))
+            continue
+
+        # OPTIMIZE "Nombre" { CONNECT: 3, STRENGTHEN_TIES: 2, beam: 4, weights: [..] }
+        if startswith_token(src, i, "OPTIMIZE"):
+            m = re.match(rf"OPTIMIZE{WS}(\"([^\"]*)\")?{WS}", src[i:], flags=re.I)
+            title = (m.group(2) or "").strip()
+            i = skip_ws_and_comments(src, i + m.end())
+            props = {}
+            if i < n and src[i] == "{":
+                props_text, i = extract_block(src, i)
+                props = parse_properties(props_text)
+            ast.actions.append(("OPTIMIZE", title, props))
+            continue
+
+        # ROBUSTNESS { top: 10, mode: "nodes" | "edges" }
+        if startswith_token(src, i, "ROBUSTNESS"):
+            i = skip_ws_and_comments(src, i + len("ROBUSTNESS"))
+            props = {}
+            if i < n and src[i] == "{":
+                props_text, i = extract_block(src, i)
+                props = parse_properties(props_text)
+            ast.actions.append(("ROBUSTNESS", props))
+            continue
+
         # WHAT_IF "Nombre" { APPLY { ... } COMPARE: [ ... ] }
         if startswith_token(src, i, "WHAT_IF"):
             # Header (título opcional)
@@ -1463,10 +1777,73 @@ class Runtime:
 
     def __init__(self):
         self.graph = nx.Graph()
+        # Modo estocástico (SIMULATE N): rng = np.random.Generator; None = determinista
+        self.rng = None
+        self.stochastic = {}  # {"trust_noise": float, "edge_prob": float}
+        self._quotient = None  # cache de lexo.quotient (se mantiene en _touch_node/_touch_edge)
+        self._index = None  # lexo.indexes; lo mantienen los métodos que mutan
+        self._watch = None  # lexo.watch.EthicsWatch (modo --watch)
+        self._stream = None  # lexo.stream.StreamingBlocker (modo --stream-window)
+        self._live = None  # lexo.incremental.LiveMetrics que alimenta a _stream (sin --watch)
+        self.report = None  # payload del reporte final (execute con finalize=True), sin "resources"
+        self.report_nodes = None  # lexo.reports.NodeTable: recursos por nodo del reporte final
+
+    def quotient(self) -> Quotient:
+        """Grafo cociente por comunidad; se reconstruye sólo si hubo acciones que mutan."""
+        if self._quotient is None:
+            self._quotient = Quotient.from_runtime(self)
+        return self._quotient
+
+    def invalidate_quotient(self):
+        self._quotient = None
+
+    def index(self) -> RuntimeIndex:
+        """Índices secundarios: kind siempre; trust/resources/grado/aristas al primer uso."""
+        if self._index is None:
+            self._index = RuntimeIndex.from_runtime(self)
+        return self._index
+
+    def invalidate_index(self, kinds: bool = True):
+        """Para quien escriba self.graph sin pasar por los métodos del Runtime.
+        kinds=False: sólo cambiaron valores (no nodos ni kinds), se conserva el mapa de kind."""
+        if kinds or self._index is None:
+            self._index = None
+        else:
+            self._index.invalidate_values()
+        if self._watch is not None:
+            self._watch.invalidate()
+        if self._live is not None:
+            self._live.invalidate()
+        self._quotient = None
+
+    def _touch_node(self, n):
+        if self._index is not None:
+            self._index.update_node(self, n)
+        if self._quotient is not None and not self._quotient.sync_node(
+                n, self._get_node_trust(n), self._get_node_resources(n)):
+            self._quotient = None  # nodo nuevo: se rearma al próximo uso
+        if self._watch is not None:
+            self._watch.touch_node(n)
+        if self._live is not None:
+            self._live.touch_node(n)
+
+    def _touch_edge(self, u, v):
+        if self._index is not None:
+            self._index.update_edge(self, u, v)
+        if self._quotient is not None:
+            nb = self.graph[u]
+            if not self._quotient.sync_edge(u, v, len(nb) - (u in nb), self.graph.edges[u, v]):
+                self._quotient = None
+        if self._watch is not None:
+            self._watch.touch_edge(u, v)
+        if self._live is not None:
+            self._live.touch_edge(u, v)
 
     def clone(self):
         import copy
         new = Runtime()
+        new.rng = self.rng
+        new.stochastic = dict(self.stochastic)
         new.graph = nx.Graph()
         # Copia profunda de nodos
         for n, d in self.graph.nodes(data=True):
@@ -1501,12 +1878,14 @@ class Runtime:
         val = float(max(0, min(100, val)))
         self.graph.nodes[n]["confianza"] = val
         self.graph.nodes[n]["trust"] = val
+        self._touch_node(n)
 
     def _set_node_resources(self, n, val):
         val = float(max(0.0, val))
         self.graph.nodes[n]["resources"] = val
         self.graph.nodes[n]["recurso"] = val
         self.graph.nodes[n]["recursos"] = val
+        self._touch_node(n)
 
     def _norm_intensity(self, x):
         if not x: return "MEDIA"
@@ -1530,6 +1909,7 @@ class Runtime:
         ndata.setdefault(
             "resources",
             float(props.get("resources", props.get("recursos", 0.0))))
+        self._touch_node(name)
 
     def _edge_trust(self, u, v, default=50.0):
         if self.graph.has_edge(u, v):
@@ -1540,11 +1920,13 @@ class Runtime:
         if not self.graph.has_edge(u, v):
             self.graph.add_edge(u, v)
         self.graph[u][v]["trust"] = float(max(0.0, min(100.0, value)))
+        self._touch_edge(u, v)
 
     def _bump_node_trust(self, node, delta):
         if self.graph.has_node(node):
             t = float(self.graph.nodes[node].get("trust", 50.0)) + float(delta)
             self.graph.nodes[node]["trust"] = max(0.0, min(100.0, t))
+            self._touch_node(node)
 
     # --- Helpers internos ---
 
@@ -1558,6 +1940,23 @@ class Runtime:
             "BAJA": (3, 2)
         }.get(norm, (6, 4))
 
+    def _noisy(self, bump):
+        """
+        Bump de confianza; en modo estocástico se sortea ~ N(bump, trust_noise·bump),
+        así la varianza crece con la intensidad. Sin rng devuelve bump tal cual.
+        """
+        noise = float(self.stochastic.get("trust_noise", 0.0) or 0.0)
+        if self.rng is None or noise <= 0:
+            return bump
+        return max(0.0, float(self.rng.normal(bump, noise * abs(bump))))
+
+    def _edge_forms(self):
+        """En modo estocástico un CONNECT sólo se concreta con probabilidad edge_prob."""
+        p = float(self.stochastic.get("edge_prob", 1.0) or 0.0)
+        if self.rng is None or p >= 1.0:
+            return True
+        return bool(self.rng.random() < p)
+
     # --- Acciones con efecto real ---
 
     def strengthen_ties(self, target, props):
@@ -1572,16 +1971,18 @@ class Runtime:
         # subir confianza del nodo
         node_conf = self.graph.nodes[target].get(
             "confianza", self.graph.nodes[target].get("trust", 50))
-        node_conf = max(0, min(100, node_conf + bump_node))
+        node_conf = max(0, min(100, node_conf + self._noisy(bump_node)))
         self.graph.nodes[target]["confianza"] = node_conf
         self.graph.nodes[target]["trust"] = node_conf
+        self._touch_node(target)
 
         # subir confianza de aristas incidentes
         for u, v, d in self.graph.edges(target, data=True):
             conf = float(d.get("confianza", d.get("trust", 50)))
-            conf = max(0, min(100, conf + bump_edge))
+            conf = max(0, min(100, conf + self._noisy(bump_edge)))
             d["confianza"] = conf
             d["trust"] = conf
+            self._touch_edge(u, v)
 
     def care_network(self, target, intensity="MEDIA", mitigation_plan=None):
         if DEBUG_ACTIONS:
@@ -1595,17 +1996,19 @@ class Runtime:
         # subir confianza del nodo
         node_conf = self.graph.nodes[target].get(
             "confianza", self.graph.nodes[target].get("trust", 50))
-        node_conf = max(0, min(100, node_conf + bump_node))
+        node_conf = max(0, min(100, node_conf + self._noisy(bump_node)))
         self.graph.nodes[target]["confianza"] = node_conf
         self.graph.nodes[target]["trust"] = node_conf
+        self._touch_node(target)
 
         # reforzar SOLO vínculos muy bajos
         for u, v, d in self.graph.edges(target, data=True):
             conf = float(d.get("confianza", d.get("trust", 50)))
             if conf < 50:
-                conf = max(0, min(100, conf + max(4, bump_edge)))
+                conf = max(0, min(100, conf + self._noisy(max(4, bump_edge))))
                 d["confianza"] = conf
                 d["trust"] = conf
+                self._touch_edge(u, v)
 
         if mitigation_plan:
             plans = self.graph.nodes[target].get("mitigation_plans", [])
@@ -1656,14 +2059,47 @@ class Runtime:
             return
         node = self.graph.nodes[target]
         cur = node.get("confianza", node.get("trust", 50))
-        node["confianza"] = self._clamp(cur + int(inc))
+        node["confianza"] = self._clamp(cur + self._noisy(int(inc)))
         node["trust"] = node["confianza"]
+        self._touch_node(target)
+
+    def propagate_trust(self, targets, strength=10.0, damping=0.85,
+                        tol=1e-6, max_iter=100):
+        """
+        Derrame de confianza tipo PageRank personalizado desde `targets`
+        (ver lexo/propagate.py). Sólo reescribe los nodos alcanzados.
+        """
+        ga = GraphArrays.from_runtime(self)
+        seeds = [ga.index[t] for t in targets if t in ga.index]
+        if not seeds:
+            return
+        before = ga.trust.copy()
+        res = propagate_trust(ga, seeds, strength=strength, damping=damping,
+                              tol=tol, max_iter=max_iter)
+        # bumps por debajo de tol (o recortados en 100) no se escriben
+        hit = abs(ga.trust - before) >= tol
+        reached = hit.nonzero()[0].tolist()
+        if 2 * len(reached) > ga.n:
+            # la mayoría cambia: una escritura masiva en vez de un hook por nodo
+            ga.trust[~hit] = before[~hit]
+            ga.write_back(self, resources=False, edges=False)
+            self.invalidate_index(kinds=False)
+        else:
+            for k in reached:
+                self._set_node_trust(ga.names[k], ga.trust[k])
+        if not res.converged:
+            print(f"[WARN] PROPAGATE_TRUST no convergió en {res.iterations} iteraciones")
+        if DEBUG_ACTIONS:
+            print(f"[DEBUG] propagate_trust → seeds={list(targets)}, "
+                  f"iter={res.iterations}, alcanzados={len(reached)}")
 
     # ---------- acciones del DSL ----------
     def connect(self, a, b, props=None):
         props = props or {}
         if not (self.graph.has_node(a) and self.graph.has_node(b)):
             return
+        if not self._edge_forms():
+            return
         self.graph.add_edge(a, b)
         d = self.graph.edges[a, b]
         # confianza de la arista
@@ -1678,42 +2114,50 @@ class Runtime:
         inten = props.get("intensidad", props.get("intensity", "MEDIA"))
         d["intensidad"] = inten
         d["intensity"] = inten
+        self._touch_edge(a, b)
 
 # ---------- métricas y visual (dejas tus versiones si ya existen) ----------
 
-    def measure(self):
+    def measure(self, only=None):
+        # only: subconjunto de {"trust","cohesion","equity"} (None = las tres);
+        # el pre-lint pide sólo las que leen sus reglas
+        want = set(only) if only is not None else {"trust", "cohesion", "equity"}
+        out = {}
+
         # Trust: promedio de confianza nodal
-        trusts = [self._get_node_trust(n) for n in self.graph.nodes()]
-        trust = sum(trusts) / len(
-            trusts) if trusts else 0.0  # <--- ESTA LÍNEA FALTABA
+        if "trust" in want:
+            trusts = [self._get_node_trust(n) for n in self.graph.nodes()]
+            trust = sum(trusts) / len(
+                trusts) if trusts else 0.0  # <--- ESTA LÍNEA FALTABA
+            out["trust"] = round(trust, 2)
 
         # Cohesion: clustering/transitividad (0..1) → 0..100
-        try:
-            coh = nx.transitivity(self.graph)  # global clustering
-            cohesion = 100.0 * float(coh)
-        except Exception:
-            cohesion = 0.0
+        if "cohesion" in want:
+            try:
+                coh = nx.transitivity(self.graph)  # global clustering
+                cohesion = 100.0 * float(coh)
+            except Exception:
+                cohesion = 0.0
+            out["cohesion"] = round(cohesion, 2)
 
         # Equity: 100*(1 - Gini) sobre resources
-        resc = [self._get_node_resources(n) for n in self.graph.nodes()]
-        equity = 0.0
-        if resc:
-            xs = sorted(float(x) for x in resc)
-            s = sum(xs)
-            if s > 0:
-                n = len(xs)
-                cum = 0.0
-                for i, x in enumerate(xs, start=1):
-                    cum += i * x
-                gini = (2 * cum) / (n * s) - (n + 1) / n
-                gini = max(0.0, min(1.0, gini))
-                equity = 100.0 * (1.0 - gini)
-
-        return {
-            "trust": round(trust, 2),
-            "cohesion": round(cohesion, 2),
-            "equity": round(equity, 2)
-        }
+        if "equity" in want:
+            resc = [self._get_node_resources(n) for n in self.graph.nodes()]
+            equity = 0.0
+            if resc:
+                xs = sorted(float(x) for x in resc)
+                s = sum(xs)
+                if s > 0:
+                    n = len(xs)
+                    cum = 0.0
+                    for i, x in enumerate(xs, start=1):
+                        cum += i * x
+                    gini = (2 * cum) / (n * s) - (n + 1) / n
+                    gini = max(0.0, min(1.0, gini))
+                    equity = 100.0 * (1.0 - gini)
+            out["equity"] = round(equity, 2)
+
+        return out
 
     def show_network(self, path="network.png", title=None):
         import matplotlib.pyplot as plt
@@ -1774,32 +2218,59 @@ def gini(xs):
 from linter import EthicsLinter
 from core_helpers import build_lint_context
 
+# Acciones cuyo cuerpo (texto ya normalizado) es un sub-programa: índices dentro de la tupla
+_NESTED_BODIES = {"IF": (2, 3), "WHAT_IF": (2,), "WHAT_IF_SWEEP": (3,), "SIMULATE": (4,)}
+
+
 def _ast_to_ir_for_linter(ast) -> dict:
     """
-    Conversión mínima y tolerante del AST a IR para el linter.
-    Si ya tenés un builder/serializer propio, usalo y reemplazá esta función.
+    IR del pre-linter a partir del AST (sirve para ES y EN):
+      nodes:     [{"name", "type", ...props}] de cada CREATE_NODE
+      relations: [{"source", "target", "tags"}] de cada CONNECT, incluidos
+                 los de cuerpos IF / WHAT_IF / WHAT_IF_SWEEP / SIMULATE.
+    Un solo recorrido; los cuerpos anidados se parsean una vez al llegar a ellos.
     """
     ir = {"nodes": [], "relations": []}
-    try:
-        for kind, type_name, name, props in getattr(ast, "decls", []):
+    seen = set()
+
+    def add_node(name, type_name=None, props=None):
+        if name in seen:
+            return
+        seen.add(name)
+        node = dict(props or {})
+        node["name"] = name
+        if type_name:
+            node["type"] = str(type_name).lower()
+        ir["nodes"].append(node)
+
+    def walk(tree):
+        for kind, type_name, name, props in getattr(tree, "decls", []):
             if kind == "CREATE_NODE":
-                ir["nodes"].append({
-                    "name": name,
-                    "type": type_name,
-                    **(props or {})
-                })
-            elif kind in ("CREATE_EDGE", "CONNECT", "LINK"):
-                # Ajustá si tu AST usa otra tupla/estructura para relaciones
-                src = props.get("source") if props else None
-                tgt = props.get("target") if props else None
-                tags = props.get("tags") if props else []
-                if src and tgt:
-                    ir["relations"].append({"source": src, "target": tgt, "tags": tags})
-    except Exception:
-        # Fallback tolerante: si algo falla, el linter seguirá pudiendo evaluar reglas de métricas
-        pass
+                add_node(name, type_name, props)
+        for act in getattr(tree, "actions", []):
+            tag = act[0]
+            if tag == "CONNECT":
+                _, a, b, props = act
+                tags = (props or {}).get("tags") or []
+                if isinstance(tags, str):
+                    tags = [tags]
+                # en minúsculas: normalize_source reescribe "care_network" → CARE_NETWORK en EN
+                ir["relations"].append({"source": a, "target": b,
+                                        "tags": sorted({str(t).lower() for t in tags})})
+                add_node(a)
+                add_node(b)
+            for k in _NESTED_BODIES.get(tag, ()):
+                body = act[k] if len(act) > k else None
+                if isinstance(body, str) and body.strip():
+                    try:
+                        walk(parse_program(body))
+                    except ValueError:
+                        pass  # cuerpo con $param u otra plantilla no parseable: se ignora
+
+    walk(ast)
     return ir
 
+
 def _print_lint_report(report):
     if not report.violations:
         print(f"[LINTER][{report.phase}] ✅ Sin violaciones.")
@@ -1832,11 +2303,359 @@ def _persist_blockade_summary(report):
 # ———— FIN PRE-LINTER v0.4 ————
 
 
+# =========================
+# WHAT_IF_SWEEP: binding de parámetros y evaluación por punto
+# =========================
+def _bind_params(value, params: dict):
+    """
+    Reemplaza placeholders $param en un valor del AST (recursivo).
+    - "$fraction" exacto → valor tipado del barrido.
+    - texto con $param adentro (bloques IF/WHAT_IF anidados) → sustitución textual.
+    """
+    if isinstance(value, str):
+        if value.startswith("$") and value[1:] in params:
+            return params[value[1:]]
+        if "$" in value:
+            for k in sorted(params, key=len, reverse=True):
+                value = value.replace(f"${k}", str(params[k]))
+        return value
+    if isinstance(value, dict):
+        return {k: _bind_params(v, params) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_bind_params(v, params) for v in value)
+    return value
+
+
+def bind_ast(template: AST, params: dict) -> AST:
+    out = AST()
+    out.decls = [_bind_params(d, params) for d in template.decls]
+    out.actions = [_bind_params(a, params) for a in template.actions]
+    return out
+
+
+def _sweep_point(base, params: dict) -> dict:
+    """Worker de WHAT_IF_SWEEP: base = (Runtime, AST plantilla) parseados una sola vez."""
+    rt, template = base
+    rt2 = rt.clone()
+    execute(rt2, bind_ast(template, params), finalize=False)
+    return rt2.measure()
+
+
+def _simulate_point(base, rng) -> dict:
+    """Réplica de SIMULATE: base = (Runtime, AST, opciones); rng = stream propio del chunk."""
+    rt, template, opts = base
+    rt2 = rt.clone()
+    rt2.rng = rng
+    rt2.stochastic = {
+        "trust_noise": float(opts.get("trust_noise", 0.0)),
+        "edge_prob": float(opts.get("edge_prob", 1.0)),
+    }
+    execute(rt2, template, finalize=False)
+    return rt2.measure()
+
+
+def _artifact_prefix(kind: str, title: str, run_id: str | None) -> str:
+    """sweep_<run_id>_<slug> / simulate_<slug>: nombre de archivo ASCII y estable."""
+    ascii_title = unicodedata.normalize("NFKD", title).encode("ascii", "ignore").decode()
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", ascii_title).strip("_").lower() or kind
+    return f"{kind}_{run_id}_{slug}" if run_id else f"{kind}_{slug}"
+
+
+# =========================
+# OPTIMIZE: configuración y formato del plan sugerido
+# =========================
+_OPTIMIZE_KEYS = {
+    "haz": "beam",
+    "pesos": "weights",
+    "restricciones": "constraints",
+    "penalizacion": "penalty",
+    "penalización": "penalty",
+    "intensity": "intensity",
+    "fracciones": "fractions",
+    "fraccion": "fractions",
+    "fraction": "fractions",
+    "minimo": "min_left",
+}
+
+
+def _optimize_config(props: dict) -> OptimizeConfig:
+    """
+    Props de OPTIMIZE → OptimizeConfig.
+      CONNECT / STRENGTHEN_TIES / REDISTRIBUTE_RESOURCES: budget por tipo
+      beam (haz), weights (pesos) = [trust, cohesion, equity]
+      constraints (restricciones) = ethics | blocker | none
+    """
+    cfg = OptimizeConfig()
+    opts = {_OPTIMIZE_KEYS.get(k, k): v for k, v in canonicalize_props(props).items()}
+    budget = {k: int(opts[k]) for k in cfg.budget if k in opts}
+    if budget:
+        cfg.budget = budget
+    if "weights" in opts:
+        w = opts["weights"]
+        cfg.weights = dict(zip(("trust", "cohesion", "equity"), (float(x) for x in w)))
+    cfg.beam = int(opts.get("beam", cfg.beam))
+    cfg.penalty = float(opts.get("penalty", cfg.penalty))
+    cfg.intensity = Runtime()._norm_intensity(opts.get("intensity", cfg.intensity))
+    cfg.min_left = float(opts.get("min_left", cfg.min_left))
+    if "fractions" in opts:
+        f = opts["fractions"]
+        cfg.fractions = tuple(float(x) for x in (f if isinstance(f, list) else [f]))
+
+    source = str(opts.get("constraints", "ethics")).lower()
+    if source == "blocker":
+        cfg.mins = {k: float(v) for k, v in BlockerPolicy().min.items()}
+    elif source == "ethics":
+        th = load_ethics_thresholds("ethics.yaml")
+        cfg.mins = {k: th[f"min_{k}"] for k in ("trust", "cohesion", "equity")}
+    else:
+        cfg.mins = {}
+    return cfg
+
+
+def _format_action(act) -> str:
+    """Acción del AST → línea DSL (ES) lista para copiar al .lexo."""
+    tag = act[0]
+    if tag == "CONNECT":
+        _, a, b, props = act
+        return f'conectar("{a}","{b}") {{ confianza: {props.get("trust", 50):g} }}'
+    if tag == "STRENGTHEN_TIES":
+        _, target, props = act
+        return f'fortalecer_vínculos("{target}") {{ intensidad: {props.get("intensity", "MEDIA")} }}'
+    if tag == "REDISTRIBUTE_RESOURCES":
+        _, giver, receiver, props = act
+        return (f'redistribuir_recursos("{giver}","{receiver}") '
+                f'{{ fraction: {props["fraction"]:g}, min_left: {props["min_left"]:g} }}')
+    return repr(act)
+
+
+# =========================
+# SENSIBILIDAD: dM/dparam con prefijo compartido
+# =========================
+# Acciones que mutan el runtime; el resto (WHAT_IF, SHOW_*, MEASURE_IMPACT…)
+# no cambia métricas y sólo imprimiría/escribiría en cada perturbación.
+_MUTATING_TAGS = ("CONNECT", "STRENGTHEN_TIES", "REDISTRIBUTE_RESOURCES",
+                  "CARE_NETWORK", "LAUNCH_INITIATIVE", "PROPAGATE_TRUST", "IF")
+
+
+def _apply_mutation(rt: Runtime, act, run_sub) -> None:
+    """Aplica una acción de _MUTATING_TAGS sobre rt; los cuerpos de IF van a run_sub(rt, ast)."""
+    tag = act[0]
+    if tag == "CONNECT":
+        _, a, b, props = act
+        rt.connect(a, b, props)
+
+    elif tag == "STRENGTHEN_TIES":
+        _, target, props = act
+        p = canonicalize_props(dict(props))
+        rt.strengthen_ties(target, p)
+
+    elif tag == "REDISTRIBUTE_RESOURCES":
+        _, giver, receiver, props = act
+        p = canonicalize_props(dict(props))
+        rt.redistribute_resources(giver,
+                                  receiver,
+                                  fraction=float(p.get("fraction", 0.2)),
+                                  min_left=float(p.get("min_left", 2.0)))
+
+    elif tag == "CARE_NETWORK":
+        _, target, props = act
+        p = canonicalize_props(dict(props))
+        rt.care_network(target,
+                        intensity=(p.get("intensity") or "MEDIA"),
+                        mitigation_plan=p.get("mitigation_plan"))
+
+    elif tag == "PROPAGATE_TRUST":
+        _, targets, props = act
+        p = canonicalize_props(dict(props))
+        rt.propagate_trust(targets,
+                           strength=float(p.get("strength", 10.0)),
+                           damping=float(p.get("damping", 0.85)),
+                           tol=float(p.get("tol", 1e-6)),
+                           max_iter=int(p.get("max_iter", 100)))
+
+    elif tag == "LAUNCH_INITIATIVE":
+        _, iname, props = act
+        target = props.get("target") or props.get(
+            "community") or props.get("COMMUNITY")
+        inc = int(props.get("trust_boost", 15))
+        if target:
+            rt.launch_initiative(target, inc=inc)
+        else:
+            for n in rt.index().nodes_of_kind("COMMUNITY"):
+                rt.launch_initiative(n, inc=inc)
+
+    elif tag == "IF":
+        _, cond, then_code, else_code = act
+        run_sub(rt, parse_program(then_code if eval_condition(rt, cond) else else_code))
+
+
+def _run_actions(rt, actions):
+    sub = AST()
+    sub.actions = list(actions)
+    execute(rt, sub, finalize=False)
+
+
+def _raw_metrics(rt):
+    """Métricas sin redondear (el redondeo a 2 decimales ensucia las diferencias finitas)."""
+    return IncrementalMetrics.from_runtime(rt).values()
+
+
+# =========================
+# DRY-RUN para el pre-lint: sólo acciones que mutan, sin prints/reportes/render
+# =========================
+def _dry_decls(rt: Runtime, ast: AST) -> None:
+    for kind, type_name, name, props in ast.decls:
+        if kind == "CREATE_NODE":
+            rt.ensure_node(type_name.upper(), name, props)
+
+
+def _dry_actions(rt: Runtime, ast: AST) -> None:
+    for act in ast.actions:
+        tag = act[0]
+        if tag in _MUTATING_TAGS:
+            _apply_mutation(rt, act, _dry_run)
+        elif tag == "SIMULATE_TICKS":
+            _, ticks, props = act
+            cfg = _tick_config(ticks, props)
+            ga = GraphArrays.from_runtime(rt)
+            run_ticks(ga, cfg, rt.measure(only=("cohesion",))["cohesion"])
+            ga.write_back(rt, edges=bool(cfg.decay))
+            rt.invalidate_index(kinds=False)
+        # WHAT_IF*, SIMULATE, OPTIMIZE, ROBUSTNESS, MEASURE_IMPACT, SHOW_*: no mutan rt
+
+
+def _dry_run(rt: Runtime, ast: AST) -> None:
+    _dry_decls(rt, ast)
+    _dry_actions(rt, ast)
+
+
+def dry_run_metrics(ast: AST, only=None) -> tuple[dict, dict]:
+    """
+    (baseline, plan) para el pre-lint: baseline = métricas tras las declaraciones,
+    plan = tras aplicar las acciones en seco (mismo redondeo que Runtime.measure).
+    `only` limita las métricas calculadas; vacío → no se ejecuta nada.
+    """
+    if only is not None and not only:
+        return {}, {}
+    rt = Runtime()
+    _dry_decls(rt, ast)
+    baseline = rt.measure(only)
+    _dry_actions(rt, ast)
+    return baseline, rt.measure(only)
+
+
+def run_sensitivity(ast: AST, run_id: str | None = None, top: int = 15):
+    rt = Runtime()
+    for kind, type_name, name, props in ast.decls:
+        if kind == "CREATE_NODE":
+            rt.ensure_node(type_name.upper(), name, props)
+    actions = [a for a in ast.actions if a[0] in _MUTATING_TAGS]
+
+    final, rows = sensitivity.analyze(rt, actions, _run_actions, _raw_metrics)
+    print(f"== SENSIBILIDAD ({len(rows)} parámetros) — métricas finales {final} ==")
+    print(f"{'acción':<44} {'param':<12} {'valor':>8} " +
+          " ".join(f"{'d_' + m:>11}" for m in ("trust", "cohesion", "equity")))
+    for r in sensitivity.rank(rows)[:top]:
+        print(f"{('#' + str(r.index) + ' ' + r.action)[:44]:<44} {r.param:<12} {str(r.value):>8} " +
+              " ".join(f"{r.grad[m]:>+11.4f}" for m in ("trust", "cohesion", "equity")))
+
+    path = f"sensitivity_{run_id}.csv" if run_id else "sensitivity.csv"
+    try:
+        sensitivity.save_csv(rows, path)
+        print(f"[OK] Sensibilidad guardada en {path}")
+    except Exception as e:
+        print(f"[WARN] No se pudo guardar {path}: {e}")
+    return final, rows
+
+
+# =========================
+# MODO SHARDED: nodos repartidos por comunidad en N procesos
+# =========================
+def run_sharded(ast: AST, n_shards: int, processes: bool = True) -> dict:
+    kinds = {name: type_name.upper() for kind, type_name, name, _ in ast.decls
+             if kind == "CREATE_NODE"}
+    edges = [(a[1], a[2]) for a in ast.actions if a[0] == "CONNECT"]
+    owner = partition(kinds, edges, n_shards)
+
+    with ShardedRuntime(owner, n_shards, Runtime, processes=processes) as srt:
+        srt.load((name, type_name.upper(), props)
+                 for kind, type_name, name, props in ast.decls if kind == "CREATE_NODE")
+        skipped = []
+        for act in ast.actions:
+            if act[0] not in SHARD_SUPPORTED:
+                skipped.append(act[0])
+                continue
+            if isinstance(act[-1], dict):
+                act = act[:-1] + (canonicalize_props(dict(act[-1])),)
+            srt.apply(act)
+        m = srt.measure()
+        st = srt.stats()
+
+    print(f"== SHARDED ({st.shards} shards, nodos {st.nodes_per_shard}, "
+          f"{st.boundary_edges} aristas de frontera) → {m}")
+    if skipped:
+        print(f"[WARN] Acciones no soportadas en modo sharded (omitidas): {sorted(set(skipped))}")
+    return m
+
+
 # =========================
 # EJECUCIÓN DEL AST
 # =========================
 final_metrics = None
 
+def _watch_yaml_rules() -> list:
+    try:
+        return compile_plan(WATCH_RULES_PATH).config.get("rules", [])
+    except Exception:
+        return []
+
+
+def _watched(rt: Runtime, actions):
+    """
+    Itera las acciones; al volver al loop (también tras un continue) evalúa
+    rt._watch con lo que tocó la acción y, con WATCH_ABORT, corta ante un block.
+    """
+    for act in actions:
+        yield act
+        watch = rt._watch
+        if watch is not None:
+            events = watch.after_action(act)
+            for ev in events[:3]:
+                print(f"[WATCH] ({ev.severity.upper()}) paso {ev.step} {ev.action}: {ev.rule} — {ev.detail}")
+            if len(events) > 3:
+                print(f"[WATCH] ... y {len(events) - 3} alerta(s) más en el paso {watch.step}")
+        if rt._stream is not None and _stream_push(rt, _live_metrics(rt), act[0]):
+            raise StreamStop(rt._stream.stopped)
+        if watch is not None and WATCH_ABORT and watch.blocking is not None:
+            raise EthicsAbort(watch.blocking)
+
+
+def _live_metrics(rt: Runtime) -> dict:
+    """
+    Métricas tras la acción desde el estado incremental (O(tocados)): el de
+    rt._watch si está, si no rt._live (se arma una vez, al primer uso).
+    """
+    if rt._watch is not None:
+        return rt._watch.metrics
+    if rt._live is None:
+        rt._live = LiveMetrics(rt)
+    return rt._live.metrics()
+
+
+def _stream_blocker() -> StreamingBlocker:
+    th = load_ethics_thresholds("ethics.yaml")
+    mins = {k: th[f"min_{k}"] for k in ("trust", "cohesion", "equity")}
+    return StreamingBlocker(policy_rules(mins, window=STREAM_WINDOW, k=STREAM_K, slope=STREAM_SLOPE))
+
+
+def _stream_push(rt: Runtime, metrics: dict, source: str) -> bool:
+    """Muestra al blocker en streaming; True si hay que cortar la ejecución."""
+    stream = rt._stream
+    for ev in stream.push(metrics, source):
+        print(f"[STREAM] ({ev.severity.upper()}) muestra {ev.step} {ev.source}: {ev.rule} — {ev.detail}")
+    return stream.stopped is not None
+
+
 def execute(rt: Runtime,
             ast: AST,
             finalize: bool = True,
@@ -1851,69 +2670,49 @@ def execute(rt: Runtime,
     # 2) Snapshot inicial
     start_m = rt.measure()
     start_snap = snapshot_state(rt)
+    if finalize and WATCH_MODE and rt._watch is None:
+        rt._watch = EthicsWatch(rt, ethics_rules(ETHICS) + yaml_rules(_watch_yaml_rules()),
+                                start=start_m, start_edges=start_snap["edges"])
+    if finalize and STREAM_WINDOW > 0 and rt._stream is None:
+        rt._stream = _stream_blocker()
     
     # 3) Acciones
-    for act in ast.actions:
+    for act in _watched(rt, ast.actions):
         tag = act[0]
-
-        if tag == "CONNECT":
-            _, a, b, props = act
-            rt.connect(a, b, props)
-
-        elif tag == "STRENGTHEN_TIES":
-            _, target, props = act
-            p = canonicalize_props(dict(props))
-            rt.strengthen_ties(target, p)
-
-        elif tag == "REDISTRIBUTE_RESOURCES":
-            _, giver, receiver, props = act
-            p = canonicalize_props(dict(props))
-            rt.redistribute_resources(giver,
-                                      receiver,
-                                      fraction=float(p.get("fraction", 0.2)),
-                                      min_left=float(p.get("min_left", 2.0)))
-
-        elif tag == "CARE_NETWORK":
-            _, target, props = act
-            p = canonicalize_props(dict(props))
-            rt.care_network(target,
-                            intensity=(p.get("intensity") or "MEDIA"),
-                            mitigation_plan=p.get("mitigation_plan"))
-
-        elif tag == "LAUNCH_INITIATIVE":
-            _, iname, props = act
-            target = props.get("target") or props.get(
-                "community") or props.get("COMMUNITY")
-            inc = int(props.get("trust_boost", 15))
-            if target:
-                rt.launch_initiative(target, inc=inc)
-            else:
-                for n, d in rt.graph.nodes(data=True):
-                    if d.get("kind") == "COMMUNITY":
-                        rt.launch_initiative(n, inc=inc)
-
-        elif tag == "IF":
-            _, cond, then_code, else_code = act
-            if eval_condition(rt, cond):
-                ast_sub = parse_program(then_code)
-                execute(rt, ast_sub, finalize=False)
-            else:
-                ast_sub = parse_program(else_code)
-                execute(rt, ast_sub, finalize=False)
+        if tag in _MUTATING_TAGS:
+            _apply_mutation(rt, act, lambda r, sub: execute(r, sub, finalize=False))
 
         elif tag == "WHAT_IF":
             # act = ("WHAT_IF", title, apply_code, dims)
             _, title, apply_code, dims = act
 
-            # 1) Baseline (sin tocar rt real)
-            base_m = rt.measure()
-
-            # 2) Clonar, aplicar y medir
-            rt2 = rt.clone()
             ast2 = parse_program(apply_code)
-            execute(rt2, ast2,
-                    finalize=False)  # sin linter ni reportes en ensayo
-            new_m = rt2.measure()
+
+            # 0) Modo coarse: primero sobre el grafo cociente (sin clonar el grafo)
+            coarse = None
+            if COARSE_MODE:
+                q = rt.quotient()
+                q2 = q.copy()
+                # create_node dentro del APPLY: el cociente no tiene a dónde asignarlo
+                complete = not ast2.decls and all([q2.apply(a) for a in ast2.actions])
+                coarse = {"base": q.metrics(), "new": q2.metrics(),
+                          "complete": complete, "approximate": q2.approximate}
+                cdims = dims or ["trust", "cohesion", "equity"]
+                pretty = ", ".join(f"{k}: {coarse['new'][k] - coarse['base'][k]:+0.2f}" for k in cdims)
+                print(f'~~ WHAT_IF "{title or "(sin título)"}" [coarse, {len(q.communities)} comunidades] → {pretty}'
+                      + ("" if complete else " (acciones no soportadas: se refina)"))
+
+            if coarse is not None and coarse["complete"] and not COARSE_REFINE:
+                base_m, new_m = coarse["base"], coarse["new"]
+            else:
+                # 1) Baseline (sin tocar rt real)
+                base_m = rt.measure()
+
+                # 2) Clonar, aplicar y medir
+                rt2 = rt.clone()
+                execute(rt2, ast2,
+                        finalize=False)  # sin linter ni reportes en ensayo
+                new_m = rt2.measure()
 
             # 3) Deltas y % (con signos)
             dims = dims or ["trust", "cohesion", "equity"]
@@ -1938,12 +2737,203 @@ def execute(rt: Runtime,
                 t = f"{base_title} #{n}"
                 n += 1
 
-            WHATIF_LOG.append({
+            entry = {
                 "title": t,
                 "deltas": deltas,
                 "pct": pct,
                 "base": base_m,
                 "new": new_m
+            }
+            if coarse is not None:
+                entry["coarse"] = coarse
+            WHATIF_LOG.append(entry)
+            continue
+
+        elif tag == "WHAT_IF_SWEEP":
+            # act = ("WHAT_IF_SWEEP", title, space, apply_code, dims)
+            _, title, space, apply_code, dims = act
+            title_safe = title or "(sin título)"
+
+            # Plantilla parseada UNA vez; cada punto sólo clona y bindea $params
+            template = parse_program(apply_code)
+            res = run_sweep(title_safe, (rt, template), space, _sweep_point,
+                            dims=dims, workers=SWEEP_WORKERS)
+            mask = res.pareto()
+            print(f'?? WHAT_IF_SWEEP "{title_safe}" → {len(res.combos)} combinaciones, '
+                  f'{int(mask.sum())} Pareto-óptimas ({", ".join(res.dims)})')
+            for row in res.rows(mask):
+                pv = ", ".join(f"{p}={row[p]}" for p in res.params)
+                mv = ", ".join(f"{k}={row[k]:.2f}" for k in res.dims)
+                print(f"   · {pv} → {mv}")
+
+            prefix = _artifact_prefix("sweep", title_safe, run_id)
+            try:
+                res.save_csv(f"{prefix}.csv")
+                res.save_npz(f"{prefix}.npz")
+                print(f"[OK] WHAT_IF_SWEEP guardado en {prefix}.csv / {prefix}.npz")
+            except Exception as e:
+                print(f"[WARN] No se pudo guardar {prefix}.*: {e}")
+
+            SWEEP_LOG.append({
+                "title": title_safe,
+                "points": len(res.combos),
+                "params": res.params,
+                "dims": res.dims,
+                "pareto": res.rows(mask),
+                "csv": f"{prefix}.csv",
+                "npz": f"{prefix}.npz",
+            })
+            continue
+
+        elif tag == "SIMULATE":
+            # act = ("SIMULATE", N, title, opts, apply_code)
+            _, reps, title, opts, apply_code = act
+            title_safe = title or "(sin título)"
+            seed = int(opts.get("seed", 42))
+
+            template = parse_program(apply_code)
+            res = run_montecarlo(title_safe, (rt, template, opts), reps,
+                                 _simulate_point, seed=seed,
+                                 percentiles=opts.get("percentiles"),
+                                 workers=SWEEP_WORKERS)
+            summary = res.summary()
+            print(f'?? SIMULATE "{title_safe}" (N={reps}, seed={seed})')
+            for k, row in summary.items():
+                bands = ", ".join(f"{q}={v:.2f}" for q, v in row.items()
+                                  if q.startswith("p"))
+                print(f"   · {k}: media {row['mean']:.2f} "
+                      f"[IC95 {row['ci95_low']:.2f}–{row['ci95_high']:.2f}] ({bands})")
+
+            prefix = _artifact_prefix("simulate", title_safe, run_id)
+            try:
+                res.save_npz(f"{prefix}.npz")
+                print(f"[OK] SIMULATE guardado en {prefix}.npz")
+            except Exception as e:
+                print(f"[WARN] No se pudo guardar {prefix}.npz: {e}")
+
+            SIMULATE_LOG.append({
+                "title": title_safe,
+                "replications": reps,
+                "seed": seed,
+                "options": {k: v for k, v in opts.items() if k != "percentiles"},
+                "summary": summary,
+                "npz": f"{prefix}.npz",
+            })
+            continue
+
+        elif tag == "SIMULATE_TICKS":
+            # act = ("SIMULATE_TICKS", N, props) — muta rt (confianzas, recursos, aristas)
+            _, ticks, props = act
+            cfg = _tick_config(ticks, props)
+            ga = GraphArrays.from_runtime(rt)
+            hook = None
+            if rt._stream is not None:
+                hook = lambda row: _stream_push(rt, dict(zip(("trust", "cohesion", "equity"), row[1:])),
+                                                f"tick {int(row[0])}")
+            samples = run_ticks(ga, cfg, rt.measure()["cohesion"], on_sample=hook)
+            ga.write_back(rt, edges=bool(cfg.decay))
+            rt.invalidate_index(kinds=False)
+            if rt._stream is not None and rt._stream.stopped is not None:
+                print(f"?? SIMULATE_TICKS {ticks} cortado en el tick {int(samples[-1][0])}")
+                raise StreamStop(rt._stream.stopped)
+            summary = summarize_ticks(samples)
+            print(f"?? SIMULATE_TICKS {ticks} (decay={cfg.decay}, diffusion={cfg.diffusion}, "
+                  f"flow={cfg.flow})")
+            for k, row in summary.items():
+                print(f"   · {k}: {row['start']:.2f} → {row['end']:.2f} (mín {row['min']:.2f})")
+
+            # ordinal en el slug: dos SIMULATE_TICKS con el mismo N no se pisan el CSV
+            prefix = _artifact_prefix("ticks", f"{ticks} {len(TICKS_LOG) + 1}", run_id)
+            try:
+                save_ticks_csv(samples, f"{prefix}.csv")
+                print(f"[OK] SIMULATE_TICKS guardado en {prefix}.csv")
+            except Exception as e:
+                print(f"[WARN] No se pudo guardar {prefix}.csv: {e}")
+
+            TICKS_LOG.append({
+                "ticks": ticks,
+                "config": {k: getattr(cfg, k) for k in
+                           ("decay", "baseline", "diffusion", "flow", "sample_every")},
+                "summary": summary,
+                "csv": f"{prefix}.csv",
+            })
+            continue
+
+        elif tag == "OPTIMIZE":
+            # act = ("OPTIMIZE", title, props) — planifica, NO muta rt
+            _, title, props = act
+            title_safe = title or "(sin título)"
+            cfg = _optimize_config(props)
+            res = optimize(IncrementalMetrics.from_runtime(rt), cfg)
+
+            # Verificación: replay del plan con el runtime real sobre un clon
+            rt2 = rt.clone()
+            plan = AST()
+            plan.actions = list(res.actions)
+            execute(rt2, plan, finalize=False)
+            replay_m = rt2.measure()
+
+            base_m = rt.measure()
+            print(f'?? OPTIMIZE "{title_safe}" → {len(res.actions)} acciones, '
+                  f'{res.evaluated} candidatos evaluados, '
+                  f'{"cumple" if res.feasible else "NO cumple"} mínimos {cfg.mins}')
+            for a in res.actions:
+                print(f"   · {_format_action(a)}")
+            print("   " + ", ".join(f"{k}: {base_m[k]:.2f} → {replay_m[k]:.2f}"
+                                  for k in ("trust", "cohesion", "equity")))
+            if replay_m != res.metrics:
+                print(f"[WARN] OPTIMIZE: métricas incrementales {res.metrics} "
+                      f"≠ replay {replay_m}")
+
+            OPTIMIZE_LOG.append({
+                "title": title_safe,
+                "budget": cfg.budget,
+                "weights": cfg.weights,
+                "mins": cfg.mins,
+                "beam": cfg.beam,
+                "plan": [_format_action(a) for a in res.actions],
+                "base": base_m,
+                "metrics": replay_m,
+                "score": res.score,
+                "feasible": res.feasible,
+                "evaluated": res.evaluated,
+            })
+            continue
+
+        elif tag == "ROBUSTNESS":
+            # act = ("ROBUSTNESS", props) — leave-one-out incremental, NO muta rt
+            _, props = act
+            top = int(props.get("top", 10))
+            mode = str(props.get("mode", props.get("modo", "nodes"))).lower()
+            state = IncrementalMetrics.from_runtime(rt)
+            if mode in ("edges", "aristas"):
+                mode = "edges"
+                impacts = robustness.edge_impacts(state)
+            else:
+                mode = "nodes"
+                impacts = robustness.node_impacts(state)
+            ranked = robustness.rank(impacts)
+            print(f"?? ROBUSTNESS ({mode}): top {min(top, len(ranked))} de {len(ranked)} más vulnerables")
+            for im in ranked[:top]:
+                target = "–".join(map(str, im.target)) if im.kind == "edge" else im.target
+                dv = ", ".join(f"{k} {v:+.2f}" for k, v in im.delta.items())
+                print(f"   · {target}: {dv}")
+
+            prefix = _artifact_prefix("robustness", mode, run_id)
+            try:
+                robustness.save_csv(ranked, f"{prefix}.csv")
+                print(f"[OK] ROBUSTNESS guardado en {prefix}.csv")
+            except Exception as e:
+                print(f"[WARN] No se pudo guardar {prefix}.csv: {e}")
+
+            ROBUSTNESS_LOG.append({
+                "mode": mode,
+                "evaluated": len(ranked),
+                "top": [{"target": list(im.target) if im.kind == "edge" else im.target,
+                         "score": round(im.score, 4),
+                         "delta": {k: round(v, 4) for k, v in im.delta.items()}}
+                        for im in ranked[:top]],
+                "csv": f"{prefix}.csv",
             })
             continue
 
@@ -1973,55 +2963,79 @@ def execute(rt: Runtime,
     if finalize:
         final_m = rt.measure()
         final_snap = snapshot_state(rt)
-        alerts = evaluate_ethics(rt, start_snap, final_snap, start_m, final_m)
+        # una sola atribución del estado final: la usan el linter (regla 9) y el payload
+        attribution = attribute(snapshot_metrics_state(final_snap))
+        alerts = evaluate_ethics(rt, start_snap, final_snap, start_m, final_m, attribution)
         print_alerts(alerts)
 
-        # -------- PLUS: desglose de recursos por nodo y % ----------
-        resources_by_node = {}
-        total_resources = 0.0
-        for n, d in rt.graph.nodes(data=True):
-            r = float(d.get("resources", d.get("recursos", 0.0)))
-            r = round(r, 2)
-            resources_by_node[n] = r
-            total_resources += r
-        total_resources = round(total_resources, 2)
-
-        resources_pct = {
-            n: (round((r / total_resources) *
-                      100.0, 2) if total_resources > 0 else 0.0)
-            for n, r in resources_by_node.items()
-        }
+        # -------- Sugerencias CONNECT (ganancia exacta de cohesión) ----------
+        suggestions = []
+        if RECOMMEND_K > 0:
+            recs = recommend_connections(
+                adjacency(final_snap["degrees"], final_snap["edges"]), k=RECOMMEND_K)
+            suggestions = [dict(r.as_dict(), dsl=_format_action(("CONNECT", r.a, r.b, {})))
+                           for r in recs if r.gain > 0]
+            if suggestions:
+                print(f"💡 Top {len(suggestions)} CONNECT por ganancia de cohesión:")
+                for sug in suggestions:
+                    print(f"   · {sug['dsl']}  → +{sug['gain']:.2f} ({sug['common']} triángulos)")
 
-        # Porcentajes sólo de nodos comunidad (si existen)
-        community_pct = {}
-        for n, d in rt.graph.nodes(data=True):
-            kind = str(d.get("kind", "")).upper()
-            if kind == "COMMUNITY":
-                community_pct[n] = resources_pct.get(n, 0.0)
+        # -------- PLUS: desglose de recursos por nodo y % ----------
+        # listas paralelas; los mapas por nodo se generan recién al escribir (lexo/reports.py)
+        nodes = NodeTable.from_runtime(rt)
 
         # -------- Persistencia: JSON “run_*” con TODO adentro ----------
+        # copias de los logs: el payload puede serializarse en otro hilo (--async-reports)
         payload = {
             "run_ts": RUN_TS,
             "run_id": run_id,
             "final_metrics": final_m,
             "ethics_alerts": alerts,
-            "what_if": WHATIF_LOG,  # escenarios simulados
-            "resources": {
-                "total": total_resources,
-                "by_node": resources_by_node,
-                "percentages": resources_pct,
-                "community_percentages": community_pct,
-            },
+            "what_if": list(WHATIF_LOG),  # escenarios simulados
+            "what_if_sweep": list(SWEEP_LOG),  # barridos (tabla completa en sweep_*.csv/npz)
+            "simulate": list(SIMULATE_LOG),  # Monte Carlo (muestras en simulate_*.npz)
+            "optimize": list(OPTIMIZE_LOG),  # planes sugeridos (no aplicados)
+            "simulate_ticks": list(TICKS_LOG),  # dinámica por tick (serie en ticks_*.csv)
+            "connect_suggestions": suggestions,  # top-k CONNECT (no aplicados)
+            "robustness": list(ROBUSTNESS_LOG),  # ranking completo en robustness_*.csv
+            "ethics_offenders": {r: h.as_dict() for r, h in ETHICS_HITS.items()},  # conteo + top-k por regla
+            "ethics_watch": rt._watch.summary() if rt._watch is not None else None,  # --watch
+            "stream": rt._stream.summary() if rt._stream is not None else None,  # --stream-window
+            "attribution": attribution_report(final_snap, rows=attribution),  # aporte por nodo a inequidad/cohesión
+            "quotient": rt.quotient().summary() if COARSE_MODE else None,  # super-nodos (--coarse)
+            # "resources" lo agrega write_report desde `nodes` (según --report-profile)
         }
 
+        rt.report = payload  # --store lo graba junto con el veredicto del blocker
+        rt.report_nodes = nodes
+        if not FILE_EXPORTS:
+            return
+
         # Nombre de archivo coherente (si hay run_id usamos prefijo “run_”)
         out_json = f"run_{run_id}.json" if run_id else "report.json"
-        with open(out_json, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
-        print(f"[OK] Reporte JSON guardado en {out_json}")
+        _write_report(_save_run_reports, payload, nodes, out_json, final_m, alerts,
+                      REPORT_FORMAT, REPORT_PROFILE)
 
-        # CSV de métricas (si ya tenías esta función, la dejamos)
-        save_report_csv(final_m, alerts, path="report.csv")
+
+def _write_report(fn, *args):
+    """fn(*args) en el ReportWriter si hay (--async-reports); si no, ya mismo."""
+    if REPORT_WRITER is not None:
+        REPORT_WRITER.submit(fn, *args)
+    else:
+        fn(*args)
+
+
+def _save_run_reports(payload, nodes, out_json, final_m, alerts, fmt="json", profile="full"):
+    out_json = write_report(out_json, payload, nodes, fmt, profile)
+    print(f"[OK] Reporte {fmt} guardado en {out_json}")
+
+    # CSV de métricas (si ya tenías esta función, la dejamos)
+    save_report_csv(final_m, alerts, path="report.csv")
+
+
+def _save_post_reports(run_id, final_metrics, thresholds, fails):
+    write_blockade_summary(run_id, final_metrics, thresholds, fails)
+    append_changelog("BLOCKED" if fails else "OK", final_metrics, fails, "CHANGELOG.md")
 
 def gini(values):
     """
@@ -2065,6 +3079,11 @@ def canonicalize_props(props: dict) -> dict:
         "recursos": "resources",
         "fraccion": "fraction",
         "minimo": "min_left",
+        "fuerza": "strength",
+        "amortiguacion": "damping",
+        "amortiguación": "damping",
+        "tolerancia": "tol",
+        "max_iteraciones": "max_iter",
         "community": "target",  # por si viene “community” dentro de props
         "COMMUNITY": "target",
     }
@@ -2219,8 +3238,8 @@ def execute_final_post(rt, run_id, save_network=True):
 
     fails = blocker_decision(final_metrics, thresholds)
 
-    write_blockade_summary(run_id, final_metrics, thresholds, fails)
-    append_changelog("BLOCKED" if fails else "OK", final_metrics, fails, "CHANGELOG.md")
+    if FILE_EXPORTS:
+        _write_report(_save_post_reports, run_id, final_metrics, thresholds, fails)
 
     if fails:
         print("🚫 BLOQUEADO por ética/umbrales.")
@@ -2232,9 +3251,6 @@ def execute_final_post(rt, run_id, save_network=True):
 # =====================================================
 # MAIN — CLI de entrada
 # =====================================================
-if __name__ == "__main__":
-    # --- CLI ---
-  
 def runtime_from_snapshot(snap) -> "Runtime":
     """
     Recrea un Runtime a partir de un snapshot.
@@ -2320,9 +3336,21 @@ def runtime_from_snapshot(snap) -> "Runtime":
 # =========================
 def main():
     global WHATIF_LOG, WHATIF_SAVED, NO_WHATIF_TABLE, WHATIF_DIMS, SORT_WHATIF_BY
-
+    global SWEEP_WORKERS, COARSE_MODE, COARSE_REFINE, ETHICS_TOP_K, ETHICS_OFFENDERS_PATH
+    global WATCH_MODE, WATCH_ABORT, STREAM_WINDOW, STREAM_K, STREAM_SLOPE
+    global RUN_STORE, FILE_EXPORTS, METRICS_HISTORY, REPORT_WRITER, REPORT_FORMAT, REPORT_PROFILE
+
+    # Reportes de una corrida anterior (modo servicio) todavía en cola: escribirlos
+    # antes de vaciar los logs globales que esos payloads referencian
+    if REPORT_WRITER is not None:
+        REPORT_WRITER.flush()
     WHATIF_LOG = []
     WHATIF_SAVED = False
+    SWEEP_LOG.clear()
+    SIMULATE_LOG.clear()
+    OPTIMIZE_LOG.clear()
+    TICKS_LOG.clear()
+    ROBUSTNESS_LOG.clear()
 
     apply_ethics_yaml_once("ethics.yaml")
 
@@ -2343,9 +3371,60 @@ def main():
         help="No guarda network.png/report.* en execute_final.")
     parser.add_argument("--no-ethics-block", action="store_true",
         help="Si el blocker ético devuelve BLOCKED, continúa (exit 0).")
+    parser.add_argument("--sensitivity", action="store_true",
+        help="Solo análisis de sensibilidad (dM/dparam por acción) y sale 0.")
+    parser.add_argument("--workers", type=int, default=None,
+        help="Procesos para WHAT_IF_SWEEP/SIMULATE (default: cpu_count; 1 = serial).")
+    parser.add_argument("--shards", type=int, default=0,
+        help="Ejecutar repartiendo nodos por comunidad en N procesos (0 = desactivado).")
+    parser.add_argument("--coarse", action="store_true",
+        help="WHAT_IF sobre el grafo cociente por comunidad (métricas aproximadas).")
+    parser.add_argument("--refine", action="store_true",
+        help="Con --coarse: confirmar cada WHAT_IF sobre el grafo completo.")
+    parser.add_argument("--ethics-top-k", type=int, default=3,
+        help="Peores infractores por regla ética que se muestran (default: 3).")
+    parser.add_argument("--offenders", default=None, metavar="CSV",
+        help="Guardar la lista completa de infractores por regla ética en CSV.")
+    parser.add_argument("--watch", action="store_true",
+        help="Evaluar las reglas éticas tras cada acción (sólo las afectadas).")
+    parser.add_argument("--abort-on-block", action="store_true",
+        help="Con --watch: abortar ante la primera violación de severidad block.")
+    parser.add_argument("--stream-window", type=int, default=0, metavar="N",
+        help="Cortar si la media móvil de N muestras (por acción/tick) queda bajo el mínimo ético.")
+    parser.add_argument("--stream-k", type=int, default=1,
+        help="Con --stream-window: muestras seguidas en violación antes de cortar (default: 1).")
+    parser.add_argument("--stream-slope", type=float, default=None,
+        help="Con --stream-window: cortar también si la pendiente por muestra cae bajo este valor.")
+    parser.add_argument("--store", nargs="?", const="", default=None, metavar="URL",
+        help="Guardar la corrida en la base indexada (default: $LEXO_RUNS_URL o sqlite:///instance/runs.db).")
+    parser.add_argument("--no-files", action="store_true",
+        help="No escribir run_*.json/report.csv/blockade_summary.json/CHANGELOG.md (usar con --store).")
+    parser.add_argument("--async-reports", action="store_true",
+        help="Serializar y escribir reportes en un hilo aparte (se vacía al salir).")
+    parser.add_argument("--history", default=None, metavar="DIR",
+        help="Agregar la corrida al historial columnar de métricas en DIR (lexo/history.py).")
+    parser.add_argument("--report-format", choices=REPORT_FORMATS, default="json",
+        help="Formato de run_*.json: json (indent), compact, gzip (.json.gz) o ndjson (una línea por nodo).")
+    parser.add_argument("--report-profile", choices=REPORT_PROFILES, default="full",
+        help="summary: el reporte omite los mapas de recursos por nodo (sólo total y cantidad).")
 
     
     args = parser.parse_args()
+    SWEEP_WORKERS = args.workers
+    COARSE_MODE, COARSE_REFINE = args.coarse, args.refine
+    ETHICS_TOP_K, ETHICS_OFFENDERS_PATH = args.ethics_top_k, args.offenders
+    WATCH_ABORT = args.abort_on_block
+    WATCH_MODE = args.watch or WATCH_ABORT
+    STREAM_WINDOW, STREAM_K, STREAM_SLOPE = args.stream_window, args.stream_k, args.stream_slope
+    FILE_EXPORTS = not args.no_files
+    REPORT_FORMAT, REPORT_PROFILE = args.report_format, args.report_profile
+    if args.store is not None:
+        from lexo.runstore import RunStore  # SQLAlchemy sólo si se pide --store
+        RUN_STORE = RunStore(args.store or None)
+    if args.history:
+        METRICS_HISTORY = MetricsHistory(args.history)
+    if args.async_reports and REPORT_WRITER is None:
+        REPORT_WRITER = ReportWriter()
 
     # --- LECTURA ---
     try:
@@ -2366,94 +3445,52 @@ def main():
   
     import re
 
-    def _ast_to_ir_for_linter(ast, raw_source: str | None = None) -> dict:
-        """
-        Construye IR solo desde el source .lexo (robusto para el linter v0.4).
-        - Detecta crear_nodo tipo("Nombre")
-        - Detecta conectar("A","B") { ... tags: [ ... ] }
-        """
-        ir = {"nodes": [], "relations": []}
-        seen = set()
-
-        def add_node(name: str):
-            if name and name not in seen:
-                seen.add(name)
-                ir["nodes"].append({"name": name})
-
-        def add_edge(u: str, v: str, tags: list[str] | None = None):
-            if u and v:
-                ir["relations"].append({"source": u, "target": v, "tags": list(set(tags or []))})
-                add_node(u)
-                add_node(v)
-
-        text = raw_source if isinstance(raw_source, str) else (str(raw_source) if raw_source is not None else "")
-
-        if not isinstance(text, str):
-            return ir
-
-        # Nodos: crear_nodo Tipo("Nombre")
-        for m in re.finditer(r'conectar\(\s*"([^"]+)"\s*,\s*"([^"]+)"\s*\)\s*\{([\s\S]*?)\}', text, flags=re.I):
-
-            add_node(m.group(1))
-
-        # Relaciones: conectar("A","B") { ... } + tags: [ ... ]
-        for m in re.finditer(r'conectar\(\s*"([^"]+)"\s*,\s*"([^"]+)"\s*\)\s*\{([^}]*)\}', text, flags=re.I):
-            u, v, body = m.group(1), m.group(2), m.group(3)
-            tags = []
-            tmatch = re.search(r'tags\s*:\s*\[([^\]]*)\]', body, flags=re.I)
-            if tmatch:
-                raw = tmatch.group(1)
-                tags = [t.strip().strip('"').strip("'") for t in raw.split(",") if t.strip()]
-            add_edge(u, v, tags)
-
-        return ir
-
     def run_linter(ast, rules_path="ethics_rules.yaml", norm_source=None,
            baseline_metrics=None, planned_metrics=None, raw_source: str | None = None):
         """
-        Compatibilidad v0.4: construye IR desde el source (raw_source) y ejecuta el PRE-lint.
+        Compatibilidad v0.4: construye IR desde el AST y ejecuta el PRE-lint.
         Devuelve un LintReport (no una lista).
         """
         # (opcional) normalizar el AST si te pasan un normalizador callable
         if callable(norm_source):
             ast = norm_source(ast)
 
-        if baseline_metrics is None:
-            baseline_metrics = {}
-        if planned_metrics is None:
-            planned_metrics = {}
+        linter = EthicsLinter(rules_path)
+
+        # Sin métricas explícitas: baseline de las declaraciones y plan de un
+        # dry-run, calculando sólo las métricas que leen las reglas PRE
+        if baseline_metrics is None or planned_metrics is None:
+            try:
+                base, plan = dry_run_metrics(ast, only=linter.plan.metrics("pre"))
+            except Exception as e:
+                print(f"[WARN] Dry-run del pre-lint falló ({e}); reglas de métricas sin datos.")
+                base, plan = {}, {}
+            baseline_metrics = base if baseline_metrics is None else baseline_metrics
+            planned_metrics = plan if planned_metrics is None else planned_metrics
 
-        # IR desde el source .lexo (usa el extractor definido arriba)
-        ast_ir = _ast_to_ir_for_linter(ast, raw_source=raw_source)
+        # IR desde el AST (raw_source queda por compatibilidad)
+        ast_ir = _ast_to_ir_for_linter(ast)
 
-        # DEBUG (temporal): confirmar que el extractor ve nodos/edges y care_network
-        
-        care_count = sum(1 for e in ast_ir["relations"] if "care_network" in (e.get("tags") or []))
-        
-        linter = EthicsLinter(rules_path)
         ctx = build_lint_context(ast_ir, baseline_metrics, planned_metrics)
         report = linter.run_pre(ctx)  # ← NO llamamos a run_linter otra vez
         return report
 
-    
-    baseline_metrics = {"equity": 70, "trust": 60, "cohesion": 65}   # p.ej. {"equity": 70, "trust": 60, "cohesion": 65}
-    planned_metrics  = {"equity": 60, "trust": 61, "cohesion": 64}   # p.ej. {"equity": 60, "trust": 62, "cohesion": 64}
 
-    # Ejecutar linter (PRE)
+    # Ejecutar linter (PRE): baseline/plan salen del dry-run del programa
     report = run_linter(
         ast,
         "ethics_rules.yaml",
         norm_source=None,
-        baseline_metrics=baseline_metrics,
-        planned_metrics=planned_metrics,
         raw_source=source,   # 👈 importante
     )
     violations = report.violations
-    append_changelog_lint("OK" if not violations else "FAIL", len(violations))
+    lint_status = "OK" if not violations else "FAIL"
+    if FILE_EXPORTS:
+        _write_report(append_changelog_lint, lint_status, len(violations))
 
     # 1) Si solo se pidió correr el linter
     if args.lint_only:
-        sys.exit(0 if not violations else 1)
+        raise SystemExit(0 if not violations else 1)
 
         # 3) Si hay violaciones pero no bloquean, se imprimen igualmente
     if violations:
@@ -2467,6 +3504,16 @@ def main():
     if report.should_block and fail_on_lint and not args.no_lint_block: 
         print(f"[LINTER] 🛑 {len(violations)} violación(es). Abortando ejecución por política fail_on_lint.")
         sys.exit(1)
+
+    # --- MODO SHARDED (sólo métricas globales por map-reduce) ---
+    if args.shards > 0:
+        run_sharded(ast, args.shards)
+        raise SystemExit(0)
+
+    # --- MODO SENSIBILIDAD (sin reportes de corrida) ---
+    if args.sensitivity:
+        run_sensitivity(ast, run_id=time.strftime("%Y%m%d_%H%M%S"))
+        raise SystemExit(0)
     # --- PARSEAR ---
     
     if ast is None:
@@ -2522,17 +3569,38 @@ def main():
         sys.exit(1)
     rt = Runtime()
     run_id = time.strftime("%Y%m%d_%H%M%S")
-    execute(rt, ast, finalize=True, run_id=run_id)
+    try:
+        execute(rt, ast, finalize=True, run_id=run_id)
+    except EthicsAbort as e:
+        print(f"🛑 [WATCH] Ejecución abortada: {e}")
+        raise SystemExit(1)
+    except StreamStop as e:
+        print(f"🛑 [STREAM] Ejecución cortada: {e}")
+        raise SystemExit(1)
 
 
     # --- RUNTIME ---
     run_id = begin_run()
     try:
         rt = Runtime()
-        execute(rt, ast, finalize=True)
+        try:
+            execute(rt, ast, finalize=True)
+        except EthicsAbort as e:
+            print(f"🛑 [WATCH] Ejecución abortada: {e}")
+            raise SystemExit(1)
+        except StreamStop as e:
+            print(f"🛑 [STREAM] Ejecución cortada: {e}")
+            raise SystemExit(1)
 
         # Post-ejecución (evalúa ética, persiste summary y actualiza changelog)
         status, fails = execute_final_post(rt, run_id, save_network=not args.no_save_network)
+        if RUN_STORE is not None and rt.report is not None:
+            report = dict(rt.report, resources=rt.report_nodes.as_dict())
+            RUN_STORE.record_run(run_id, report, status=status, fails=fails,
+                                 lint_status=lint_status, source=args.file)
+            print(f"[OK] Corrida {run_id} guardada en {RUN_STORE.url}")
+        if METRICS_HISTORY is not None and rt.report is not None:
+            METRICS_HISTORY.append_report(run_id, rt.report, status=status)
 
         # Respeto de --no-ethics-block
         if status == "BLOCKED" and args.no_ethics_block:
@@ -0,0 +1,34 @@
+import random
+
+import main
+
+
+def random_runtime(seed, nodes=30, edges=40, graph=None, community_every=0,
+                   trust=(20, 80), uniform=False, resources=(1, 3, 5, 8),
+                   edge_trust=(25, 70), span=None, solo=None):
+    """
+    Runtime aleatorio reproducible para los tests.
+
+    Sin `graph`: `nodes` nodos n0..n{nodes-1} y `edges` conexiones al azar entre
+    los primeros `span` (por defecto todos), con trust entero en `edge_trust`.
+    Con `graph` (networkx): sus nodos y aristas, todas con trust `edge_trust`.
+    Un nodo es COMMUNITY si v % community_every == 0; `solo` agrega un nodo
+    aislado "solo" con esas props.
+    """
+    rnd = random.Random(seed)
+    draw = rnd.uniform if uniform else rnd.randint
+    rt = main.Runtime()
+    for v in (graph.nodes() if graph is not None else range(nodes)):
+        kind = "COMMUNITY" if community_every and v % community_every == 0 else "PERSON"
+        rt.ensure_node(kind, f"n{v}", {"trust": draw(*trust),
+                                       "resources": rnd.choice(resources)})
+    if graph is not None:
+        for u, v in graph.edges():
+            rt.connect(f"n{u}", f"n{v}", {"trust": edge_trust})
+    else:
+        for _ in range(edges):
+            a, b = rnd.sample(range(span or nodes), 2)
+            rt.connect(f"n{a}", f"n{b}", {"trust": rnd.randint(*edge_trust)})
+    if solo is not None:
+        rt.ensure_node("PERSON", "solo", dict(solo))
+    return rt
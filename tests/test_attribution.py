@@ -0,0 +1,85 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import main
+from lexo import attribution, robustness
+from lexo.attribution import attribute, top_contributors
+from lexo.incremental import IncrementalMetrics
+
+SRC = '''
+create_node community("South") { trust: 60, resources: 40 }
+create_node person("Ana") { trust: 50, resources: 1 }
+create_node person("Leo") { trust: 40, resources: 2 }
+create_node person("Eva") { trust: 45, resources: 1 }
+create_node person("Max") { trust: 70, resources: 3 }
+create_node person("Bea") { trust: 55, resources: 2 }
+connect("Ana","South") { trust: 55 }
+connect("Leo","South") { trust: 55 }
+connect("Eva","South") { trust: 55 }
+connect("Max","South") { trust: 55 }
+connect("Bea","South") { trust: 55 }
+connect("Ana","Leo") { trust: 55 }
+'''
+
+
+class TestAttribution(unittest.TestCase):
+
+    def setUp(self):
+        ast = main.parse_program(main.normalize_source(SRC, "en"))
+        self.rt = main.Runtime()
+        main.execute(self.rt, ast, finalize=False)
+        self.state = IncrementalMetrics.from_runtime(self.rt)
+
+    def test_decomposition_is_additive(self):
+        rows = attribute(self.state)
+        trust, cohesion, equity = self.state.values()
+        self.assertAlmostEqual(sum(r.equity_loss for r in rows), 100 - equity, places=9)
+        self.assertAlmostEqual(sum(r.cohesion_loss for r in rows), 100 - cohesion, places=9)
+        # el hub concentra recursos y tríadas abiertas
+        self.assertEqual(top_contributors(rows, "equity", 1)[0].node, "South")
+        self.assertEqual(top_contributors(rows, "cohesion", 1)[0].node, "South")
+
+    def test_marginal_reuses_triangles_and_deviations(self):
+        calls = []
+        tri, dev = robustness.node_triangles, robustness.abs_deviations
+        with mock.patch.object(attribution, "node_triangles", lambda a: calls.append("tri") or tri(a)), \
+                mock.patch.object(attribution, "abs_deviations", lambda s, x: calls.append("dev") or dev(s, x)), \
+                mock.patch.object(robustness, "node_triangles", lambda a: calls.append("tri") or tri(a)), \
+                mock.patch.object(robustness, "abs_deviations", lambda s, x: calls.append("dev") or dev(s, x)):
+            rows = attribute(self.state)
+        self.assertEqual(sorted(calls), ["dev", "tri"])
+        ref = {im.target: im.delta for im in robustness.node_impacts(self.state)}
+        self.assertEqual({r.node: r.marginal for r in rows}, ref)
+
+    def test_lint_names_contributors(self):
+        snap = main.snapshot_state(self.rt)
+        m = self.rt.measure()
+        alerts = main.lint_compare_v2(snap, snap, m, m)
+        joined = "\n".join(alerts)
+        self.assertIn("Mayores aportes a la inequidad", joined)
+        self.assertIn("South (", joined)
+        self.assertIn("tríadas abiertas", joined)
+        report = main.attribution_report(snap, k=2)
+        self.assertEqual([r["node"] for r in report["equity"]][0], "South")
+
+    def test_finalize_attributes_once(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(tmp.name)
+        calls = []
+        with mock.patch.object(main, "attribute", lambda st: calls.append(1) or attribute(st)), \
+                contextlib.redirect_stdout(io.StringIO()) as out:
+            rt = main.Runtime()
+            main.execute(rt, main.parse_program(main.normalize_source(SRC, "en")), run_id="a1")
+        self.assertEqual(len(calls), 1)
+        self.assertIn("Mayores aportes a la inequidad", out.getvalue())
+        self.assertEqual(rt.report["attribution"]["equity"][0]["node"], "South")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,8 @@
 import unittest
-from lexo.blocker import Blocker, BlockerConfig, BlockerPolicy
+
+import numpy as np
+
+from lexo.blocker import METRICS, Blocker, BlockerConfig, BlockerPolicy
 
 
 class TestBlockerV02(unittest.TestCase):
@@ -97,5 +100,54 @@ class TestBlockerV02(unittest.TestCase):
         self.assertTrue(any("score" in r for r in reasons))
 
 
+class TestBlockerBatch(unittest.TestCase):
+
+    POLICIES = [
+        BlockerPolicy(),
+        BlockerPolicy(min={"trust": 50, "cohesion": 40, "equity": 60},
+                      weights={"trust": 0.25, "cohesion": 0.5, "equity": 0.25},
+                      require_fail_count=2, score_threshold=80.0),
+        BlockerPolicy(min={"trust": 0, "cohesion": 30},  # mínimo 0 y equity sin mínimo
+                      weights={"trust": 2, "cohesion": -1, "equity": 3},
+                      require_fail_count=3, score_threshold=90.0),
+        BlockerPolicy(weights={"trust": 0, "cohesion": 0, "equity": 0},  # pesos uniformes
+                      require_fail_count=0),
+    ]
+
+    def _rows(self):
+        rng = np.random.default_rng(7)
+        rows = rng.uniform(-20, 120, size=(400, 3)).round(1)
+        rows[::7, 1] = 0.0
+        rows[::11, 0] = np.nan
+        rows[5] = [50, 30, 50]  # justo en los mínimos
+        return rows
+
+    def _as_dict(self, row):
+        return {k: float(v) for k, v in zip(METRICS, row) if not np.isnan(v)}
+
+    def test_matches_evaluate(self):
+        rows = self._rows()
+        for pol in self.POLICIES:
+            for dry in (False, True):
+                b = Blocker(BlockerConfig(policy=pol, dry_run=dry))
+                res = b.evaluate_batch(rows)
+                self.assertEqual(len(res), len(rows))
+                for i, row in enumerate(rows):
+                    self.assertEqual(res.decision(i), b.evaluate(self._as_dict(row)), (pol, dry, i))
+                if dry:
+                    self.assertFalse(res.block.any())
+
+    def test_scores_and_counts(self):
+        b = Blocker(BlockerConfig(policy=self.POLICIES[1]))
+        res = b.evaluate_batch([[60, 20, 65], [60, 30, 55], [70, 50, 70]])
+        np.testing.assert_allclose(res.scores, [75.0, 100 * (0.25 + 0.375 + 0.25 * 55 / 60), 100.0])
+        self.assertEqual(res.fails.tolist(), [1, 2, 0])
+        self.assertEqual(res.block.tolist(), [True, True, False])
+
+    def test_bad_shape(self):
+        with self.assertRaises(ValueError):
+            Blocker().evaluate_batch(np.zeros((4, 2)))
+
+
 if __name__ == "__main__":
     unittest.main()
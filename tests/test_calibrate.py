@@ -0,0 +1,106 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from lexo.blocker import METRICS, Blocker, BlockerConfig, BlockerPolicy
+from lexo.calibrate import (History, block_matrix, calibrate, load_history, main,
+                            parse_values, policy_grid, reference_policy)
+
+CHANGELOG = """# Changelog
+- 2025-10-19 14:15:01 exec-final: BLOCKED | trust=51.20 cohesion=0.00 equity=58.93 | fails: trust=51.20 < 60.00
+- 2025-10-19 14:17:50 exec-final: BLOCKED | trust=64.78 cohesion=45.00 equity=83.59 | fails: cohesion=45.00 < 50.00
+- 2025-10-19 15:10:15 exec-final: OK | trust=72.17 cohesion=67.74 equity=76.94
+- 2025-10-19 15:10:15 lint-pre: OK
+"""
+REF = reference_policy({"min_trust": 60, "min_cohesion": 50, "min_equity": 60})
+
+
+class TestCalibrate(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        root = self.tmp.name
+        with open(os.path.join(root, "CHANGELOG.md"), "w", encoding="utf-8") as f:
+            f.write(CHANGELOG)
+        # la última corrida también está en blockade_summary.json: no se duplica
+        with open(os.path.join(root, "blockade_summary.json"), "w", encoding="utf-8") as f:
+            json.dump({"run_id": "run_20251019-151010", "timestamp": "2025-10-19 15:10:15",
+                       "status": "OK", "metrics": {"trust": 72.17, "cohesion": 67.74, "equity": 76.94}}, f)
+        with open(os.path.join(root, "run_20251020_101010.json"), "w", encoding="utf-8") as f:
+            json.dump({"run_id": "20251020_101010",
+                       "final_metrics": {"trust": 61.0, "cohesion": 55.0}}, f)
+
+    def test_load_history(self):
+        h = load_history(self.tmp.name)
+        self.assertEqual(len(h), 4)
+        self.assertEqual(h.sources, ["run", "changelog", "changelog", "changelog"])
+        self.assertEqual(h.status.tolist(), [-1, 1, 1, 0])
+        self.assertEqual(h.keys[0], "20251020101010")
+        self.assertTrue(np.isnan(h.metrics[0, 2]))  # equity faltante
+        self.assertEqual(len(load_history(self.tmp.name, ["blockade"])), 1)
+
+    def test_run_json_matched_to_changelog_across_seconds(self):
+        # run_id = inicio de execute; la línea de CHANGELOG se escribe segundos después
+        with open(os.path.join(self.tmp.name, "run_20251019_141458.json"), "w", encoding="utf-8") as f:
+            json.dump({"run_id": "20251019_141458",
+                       "final_metrics": {"trust": 51.2, "cohesion": 0.0, "equity": 58.93}}, f)
+        h = load_history(self.tmp.name)
+        self.assertEqual(len(h), 4)
+        self.assertEqual(h.sources[:2], ["run", "run"])
+        self.assertEqual(h.status.tolist(), [1, -1, 1, 0])  # toma el status del CHANGELOG
+        self.assertEqual(len(load_history(self.tmp.name, match_window=1)), 5)
+
+    def test_grid_matches_blocker(self):
+        rng = np.random.default_rng(3)
+        rows = rng.uniform(-10, 110, size=(300, 3)).round(0)
+        rows[::13, 2] = np.nan
+        h = History([str(i) for i in range(len(rows))], ["run"] * len(rows),
+                     np.full(len(rows), -1, dtype=np.int8), rows)
+        grid = policy_grid(REF, {"min.cohesion": [0, 30, 50],
+                                 "weights.trust": [0, 2],
+                                 "score_threshold": [None, 85],
+                                 "require_fail_count": [0, 2]})
+        cal = calibrate(h, grid, REF, cells_per_chunk=1000)  # varios bloques
+        self.assertEqual(len(cal.reports), len(grid))
+        for g, rep in zip(grid, cal.reports):
+            b = Blocker(BlockerConfig(policy=g["policy"]))
+            expected = np.array([b.evaluate({k: v for k, v in zip(METRICS, r) if not np.isnan(v)})[0]
+                                 for r in rows])
+            self.assertEqual(rep.blocked, int(expected.sum()), g["params"])
+            flips = np.flatnonzero(expected != cal.ref_block)
+            self.assertEqual(sorted(rep.to_block.tolist() + rep.to_ok.tolist()), flips.tolist())
+            self.assertTrue((~cal.ref_block[rep.to_block]).all())
+
+    def test_block_matrix_shape_and_values(self):
+        vals = np.array([[70, 40, 75], [65, 20, 60]], dtype=float)
+        pols = [BlockerPolicy(), BlockerPolicy(min={"trust": 50, "cohesion": 10, "equity": 50})]
+        self.assertEqual(block_matrix(vals, pols).tolist(), [[False, True], [False, False]])
+
+    def test_parse_values_and_cli(self):
+        self.assertEqual(parse_values("30:40:5"), [30.0, 35.0, 40.0])
+        self.assertEqual(parse_values("none,80"), [None, 80.0])
+        out_csv = os.path.join(self.tmp.name, "cal.csv")
+        out_json = os.path.join(self.tmp.name, "cal.json")
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
+            rc = main(["--root", self.tmp.name, "--ethics", os.path.join(self.tmp.name, "nope.yaml"),
+                       "--param", "min.cohesion=40,50", "--param", "min.trust=50",
+                       "--csv", out_csv, "--json", out_json])
+        self.assertEqual(rc, 0)
+        self.assertIn("2 políticas × 4 corridas", buf.getvalue())
+        with open(out_json, encoding="utf-8") as f:
+            data = json.load(f)
+        # cohesion 45 deja de bloquear con min 40; trust 51.2 ya no falla con min 50
+        first = data["policies"][0]
+        self.assertEqual(first["to_ok"], ["20251019141750"])
+        self.assertTrue(os.path.exists(out_csv))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+
+from lexo.expr import ExprError, Scope, compile_expr
+from linter import compile_rules
+
+CTX = {
+    "graph": {
+        "nodes": [{"id": "A", "type": "person", "trust": 40},
+                  {"id": "B", "type": "person", "trust": 70},
+                  {"id": "C", "type": "community", "trust": 60},
+                  {"id": "T", "type": "resource_tmp"}],
+        "edges": [{"u": "A", "v": "C", "tags": ["care_network"]},
+                  {"u": "B", "v": "C", "tags": ["care_network", "mentoring"]},
+                  {"u": "A", "v": "B", "tags": []}],
+    },
+    "metrics": {"previous": {"equity": 70, "trust": 60}, "plan": {"equity": 66, "trust": 61}},
+}
+
+
+def ev(src, ctx=CTX):
+    return compile_expr(src).evaluate(ctx)
+
+
+class TestExpr(unittest.TestCase):
+
+    def test_aggregates_and_quantifiers(self):
+        self.assertEqual(ev("count(edges where 'care_network' in tags)"), 2)
+        self.assertTrue(ev("all(nodes: degree >= 1 where type != 'resource_tmp')"))
+        self.assertFalse(ev("all(nodes: degree >= 1)"))
+        self.assertEqual(ev("avg(nodes: trust where type == 'person')"), 55.0)
+        self.assertEqual(ev("max(nodes: degree)"), 2)
+        self.assertTrue(ev("any(edges: 'mentoring' in tags and u == 'B')"))
+        self.assertTrue(ev("not any(nodes: 'x' in type) or false"))
+
+    def test_metrics_arithmetic_and_lists(self):
+        self.assertTrue(ev("plan.equity >= previous.equity - 5"))
+        self.assertAlmostEqual(ev("(previous.equity - plan.equity) * 100 / previous.equity"),
+                               400 / 70)
+        self.assertTrue(ev("'person' in ['person', 'community'] and abs(-2) == 2"))
+        self.assertTrue(ev("plan.missing == null"))
+
+    def test_nested_aggregate_per_node(self):
+        # `id` sale del nodo exterior: aristas no tienen ese campo
+        src = "count(nodes where count(edges where u == id or v == id) >= 2)"
+        self.assertEqual(ev(src), 3)
+
+    def test_missing_field_is_skipped(self):
+        # T no tiene trust (como los extremos sólo-CONNECT del IR del linter)
+        self.assertAlmostEqual(ev("avg(nodes: trust)"), 170 / 3)
+        self.assertEqual(ev("min(nodes: trust)"), 40)
+        self.assertEqual(ev("sum(nodes: trust)"), 170)
+        self.assertIsNone(ev("max(nodes: resources)"))
+        self.assertEqual(ev("avg(nodes: resources)"), 0.0)
+        with self.assertRaises(ExprError):
+            ev("sum(nodes: type)")  # strings: no evaluable, no TypeError
+        self.assertEqual(ev("plan.trust / 0"), 0.0)
+
+    def test_linter_pre_with_partial_nodes(self):
+        rules = compile_rules({"rules": [
+            {"id": "AVG", "severity": "block",
+             "condition": {"type": "expr", "params": {"expr": "avg(nodes: trust) > 50"}}}]})
+        ctx = {"graph": {"nodes": [{"id": "A", "trust": 70}, {"id": "B"}], "edges": []}}
+        self.assertEqual(rules[0].check(ctx), (True, "Cumple: avg(nodes: trust) > 50"))
+
+    def test_errors_and_no_eval(self):
+        for bad in ("__import__('os').system('x')", "count(foo)", "sum(nodes)",
+                    "1 +", "a.b(", "plan.equity >> 3"):
+            with self.assertRaises(ExprError, msg=bad):
+                ev(bad)
+        with self.assertRaises(ExprError):
+            ev("nodes_total > 3")  # nombre desconocido fuera de un agregado
+        with self.assertRaises(ExprError):
+            ev("plan.equity < 'x'")
+        for bad in ("'x' in plan.equity", "count(nodes where 1 in trust)", "2 not in 3"):
+            with self.assertRaises(ExprError, msg=bad):
+                ev(bad)
+
+    def test_aggregates_shared_across_rules(self):
+        scope = Scope(CTX)
+        calls = []
+        orig = scope.elements
+        scope.elements = lambda kind: calls.append(kind) or orig(kind)
+        a = compile_expr("count(edges where 'care_network' in tags) >= 2")
+        b = compile_expr("count(edges where 'care_network'  in tags) < 10")
+        self.assertTrue(a.evaluate(scope) and b.evaluate(scope))
+        self.assertEqual(calls, ["edges"])
+
+    def test_linter_expr_rule(self):
+        rules = compile_rules({"rules": [
+            {"id": "CARE", "severity": "block",
+             "condition": {"type": "expr", "params": {"expr": "count(edges where 'care_network' in tags) >= 3"}}},
+            {"id": "BAD", "condition": {"type": "expr", "params": {"expr": "1 +"}}},
+            {"id": "SKIP", "condition": {"type": "expr", "params": {"expr": "plan.trust < 'x'"}}},
+            {"id": "SKIP_IN", "condition": {"type": "expr", "params": {"expr": "'x' in plan.equity"}}},
+        ]})
+        results = {r.id: r.check(CTX) for r in rules}
+        self.assertFalse(results["CARE"][0])
+        self.assertFalse(results["BAD"][0])
+        self.assertIn("inválida", results["BAD"][1])
+        self.assertTrue(results["SKIP"][0])
+        self.assertIn("no evaluable", results["SKIP_IN"][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
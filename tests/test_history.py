@@ -0,0 +1,70 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from lexo.history import MetricsHistory, main
+
+
+class TestMetricsHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = os.path.join(self.tmp.name, "hist")
+
+    def _fill(self, n, chunk=4):
+        h = MetricsHistory(self.root, chunk_rows=chunk)
+        for i in range(n):
+            wi = [{"title": f"w{i}", "deltas": {"trust": float(i)}}] if i % 2 == 0 else []
+            h.append(f"run{i}", {"trust": 50 + i, "cohesion": 40.0, "equity": None if i == 3 else 60 - i},
+                     status="BLOCKED" if i % 3 == 0 else "OK", whatifs=wi, ts=1000 + i)
+        return h
+
+    def test_segments_and_reopen(self):
+        self._fill(10)
+        h = MetricsHistory(self.root)  # relee sólo el manifest
+        self.assertEqual(len(h), 10)
+        self.assertEqual([len(s["trust"]) for s in h.segments("runs", ["trust"])], [4, 4, 2])
+        seg = next(h.segments("runs", ["trust"]))
+        self.assertIsInstance(seg["trust"], np.memmap)
+        np.testing.assert_array_equal(h.column("runs", "trust"), 50 + np.arange(10))
+        self.assertEqual(h.column("runs", "run_id")[7], b"run7")
+        self.assertTrue(np.isnan(h.column("runs", "equity")[3]))
+        self.assertEqual(h.column("whatif", "run").tolist(), [0, 2, 4, 6, 8])
+        self.assertTrue(np.isnan(h.column("whatif", "d_equity")).all())
+
+    def test_aggregate(self):
+        h = self._fill(10)
+        agg = h.aggregate()
+        self.assertEqual((agg["runs"], agg["blocked"]), (10, 4))
+        eq = [60 - i for i in range(10) if i != 3]
+        self.assertAlmostEqual(agg["metrics"]["equity"]["mean"], sum(eq) / len(eq))
+        self.assertEqual(h.aggregate(since=1005)["runs"], 5)
+
+    def test_torn_write_is_invisible(self):
+        h = self._fill(5)
+        # bytes sin manifest (escritura cortada): no se ven y el próximo append los pisa
+        with open(os.path.join(self.root, "runs", "000001", "trust.bin"), "ab") as f:
+            f.write(np.array([999.0]).tobytes())
+        h = MetricsHistory(self.root)
+        self.assertEqual(h.column("runs", "trust")[-1], 54.0)
+        h.append("run5", {"trust": 1.0})
+        self.assertEqual(h.column("runs", "trust")[-2:].tolist(), [54.0, 1.0])
+        with open(os.path.join(self.root, "manifest.json"), encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["tables"]["runs"]["segments"][-1]["rows"], 2)
+
+    def test_cli(self):
+        self._fill(3)
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
+            self.assertEqual(main([self.root]), 0)
+        self.assertIn("3 corrida(s), 1 bloqueada(s)", buf.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
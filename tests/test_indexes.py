@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from functools import partial
+
+import main
+from helpers import random_runtime
+from lexo.indexes import RuntimeIndex, SortedIndex
+
+
+_runtime = partial(random_runtime, 5, nodes=40, edges=70, community_every=10, trust=(10, 90),
+                   resources=(0, 1, 3, 8, 40), edge_trust=(20, 80))
+
+
+def _brute(rt, metric):
+    if metric == "trust":
+        return {n: rt._get_node_trust(n) for n in rt.graph.nodes()}
+    if metric == "resources":
+        return {n: rt._get_node_resources(n) for n in rt.graph.nodes()}
+    if metric == "degree":
+        return {n: float(d) for n, d in rt.graph.degree()}
+    return {(u, v): rt._edge_trust(u, v) for u, v in rt.graph.edges()}
+
+
+class TestIndexes(unittest.TestCase):
+
+    def assertIndexMatches(self, rt):
+        idx = rt.index()
+        for metric in ("trust", "resources", "degree", "edge_trust"):
+            ref = _brute(rt, metric)
+            got = idx.smallest(metric, len(ref) + 5)
+            self.assertEqual(len(got), len(ref), metric)
+            for key, val in got:
+                if metric == "edge_trust" and key not in ref:
+                    key = (key[1], key[0])
+                self.assertAlmostEqual(val, ref[key], msg=f"{metric} {key}")
+            thr = 45.0 if metric != "degree" else 3
+            self.assertEqual(idx.count_below(metric, thr),
+                             sum(1 for x in ref.values() if x < thr))
+        fresh = RuntimeIndex.from_runtime(rt)
+        self.assertEqual(fresh.smallest("trust", 100), idx.smallest("trust", 100))
+
+    def test_sorted_index_queries(self):
+        s = SortedIndex()
+        for k, v in enumerate([5, 1, 9, 3, 7]):
+            s.set(k, v)
+        s.set(1, 8)
+        s.discard(2)
+        self.assertEqual(s.count_below(6), 2)
+        self.assertEqual(list(s.below(8)), [(3.0, 3), (5.0, 0), (7.0, 4)])
+        self.assertEqual(s.largest(2), [(8.0, 1), (7.0, 4)])
+        self.assertEqual(s.smallest(1), [(3.0, 3)])
+
+    def test_kept_in_sync_by_actions(self):
+        rt = _runtime()
+        rt.index()  # a partir de acá se mantiene incrementalmente
+        acts = [("STRENGTHEN_TIES", "n3", {"intensity": "HIGH"}),
+                ("CARE_NETWORK", "n7", {"intensity": "LOW"}),
+                ("REDISTRIBUTE_RESOURCES", "n4", "n5", {"fraction": 0.5, "min_left": 0}),
+                ("CONNECT", "n1", "n2", {"trust": 12}),
+                ("LAUNCH_INITIATIVE", "x", {"trust_boost": 7}),
+                ("PROPAGATE_TRUST", ("n0",), {"strength": 20})]
+        main._run_actions(rt, acts)
+        rt._bump_node_trust("n6", -30)
+        rt._set_edge_trust("n8", "n9", 3)
+        self.assertIndexMatches(rt)
+
+    def test_sorted_indexes_built_on_demand(self):
+        rt = _runtime()
+        idx = rt.index()
+        main._run_actions(rt, [("CONNECT", "n1", "n2", {"trust": 12}),
+                               ("LAUNCH_INITIATIVE", "x", {"trust_boost": 3})])
+        self.assertEqual(idx._sorted, {})  # nadie consultó: mutar no paga índices ordenados
+        idx.count_below("trust", 50)
+        self.assertEqual(set(idx._sorted), {"trust"})
+        main._run_actions(rt, [("STRENGTHEN_TIES", "n3", {"intensity": "HIGH"})])
+        self.assertIndexMatches(rt)
+        s = SortedIndex.from_items([(0, 5), (1, 1), (2, 5)])
+        self.assertEqual(s.smallest(3), [(1.0, 1), (5.0, 0), (5.0, 2)])
+
+    def test_kind_index_launch(self):
+        rt = _runtime()
+        self.assertEqual(rt.index().nodes_of_kind("community"), ["n0", "n10", "n20", "n30"])
+        before = {n: rt._get_node_trust(n) for n in rt.graph.nodes()}
+        main._run_actions(rt, [("LAUNCH_INITIATIVE", "x", {"trust_boost": 5})])
+        for n, t in before.items():
+            expected = min(100.0, t + 5) if n in ("n0", "n10", "n20", "n30") else t
+            self.assertAlmostEqual(rt._get_node_trust(n), expected)
+
+    def test_ticks_invalidate(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(tmp.name)  # SIMULATE_TICKS deja un CSV en el cwd
+        rt = _runtime()
+        rt.index()
+        ast = main.parse_program(main.normalize_source(
+            'simulate_ticks 20 { decay: 0.1, diffusion: 0.2 }', "en"))
+        kinds = rt.index().kind
+        main.execute(rt, ast, finalize=False)
+        self.assertIs(rt.index().kind, kinds)  # los ticks no cambian kinds
+        self.assertIndexMatches(rt)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import yaml
+
+import linter
+import main
+from linter import EthicsLinter, compile_plan, load_yaml
+
+RULES = {
+    "schema": {"defaults": {"required_subnetwork": {"min_edges": 2},
+                            "min_links_per_node": {"min_degree": 1}}},
+    "rules": [
+        {"id": "EQ", "severity": "block", "when": "pre", "name": "Equidad",
+         "condition": {"type": "metric_drop_percent",
+                       "params": {"metric": "equity", "max_drop_percent": 10}}},
+        {"id": "CARE", "severity": "block", "when": "both",
+         "condition": {"type": "required_subnetwork", "params": {"tag": "care_network"}}},
+        {"id": "LINKS", "severity": "warn", "when": "post",
+         "condition": {"type": "min_links_per_node", "params": {}}},
+        {"id": "RARO", "when": "pre", "condition": {"type": "desconocido"}},
+    ],
+}
+CTX = {"graph": {"nodes": [{"id": "A", "type": "person"}, {"id": "B", "type": "person"}],
+                 "edges": [{"u": "A", "v": "B", "tags": ["care_network"]}]},
+       "metrics": {"previous": {"equity": 70}, "plan": {"equity": 60}}}
+
+
+class TestLinterPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "rules.yaml")
+        self._write(RULES)
+
+    def _write(self, data, mtime=None):
+        with open(self.path, "w", encoding="utf-8") as f:
+            yaml.safe_dump(data, f, allow_unicode=True)
+        if mtime is not None:
+            os.utime(self.path, ns=(mtime, mtime))
+
+    def test_defaults_merged_and_phases(self):
+        report = EthicsLinter(self.path).run_pre(CTX)
+        ids = [v.rule_id for v in report.violations]
+        # CARE usa min_edges=2 de schema.defaults (hay 1 vínculo)
+        self.assertEqual(ids, ["EQ", "CARE"])
+        self.assertIn("≥2 vínculos", report.violations[1].message)
+        self.assertTrue(report.should_block)
+        self.assertEqual([r.id for r in compile_plan(self.path).phase("post")], ["CARE", "LINKS"])
+
+    def test_plan_cached_by_mtime_and_hash(self):
+        plan = compile_plan(self.path)
+        self.assertIs(EthicsLinter(self.path).plan, plan)
+        # mismo contenido con otro mtime: se revalida por hash, sin recompilar
+        st = os.stat(self.path).st_mtime_ns
+        self._write(RULES, mtime=st + 10**9)
+        self.assertIs(compile_plan(self.path), plan)
+        # contenido distinto: plan nuevo
+        changed = dict(RULES, rules=RULES["rules"][:1])
+        self._write(changed, mtime=st + 2 * 10**9)
+        self.assertEqual([r.id for r in compile_plan(self.path).rules], ["EQ"])
+
+    def test_load_yaml_parses_once(self):
+        calls = []
+        orig = linter.yaml.safe_load
+        linter.yaml.safe_load = lambda s: calls.append(1) or orig(s)
+        try:
+            a = load_yaml(self.path)
+            b = load_yaml(self.path)
+        finally:
+            linter.yaml.safe_load = orig
+        self.assertEqual(a, b)
+        self.assertLessEqual(len(calls), 1)
+        # cada llamada es una copia: mutarla no toca el cache ni el plan compilado
+        plan = compile_plan(self.path)
+        self.assertIsNot(a, b)
+        a["rules"].clear()
+        self.assertEqual(load_yaml(self.path), b)
+        self.assertIs(compile_plan(self.path), plan)
+        self.assertEqual(len(plan.rules), len(b["rules"]))
+
+
+class TestLintIR(unittest.TestCase):
+
+    SRC = {
+        "en": '''
+create_node person("Ana") { trust: 50 }
+create_node resource_tmp("Tmp") { trust: 50 }
+connect("Ana","Tmp") { trust: 40, tags: ["care_network", "mentoring"] }
+if trust < 90 { connect("Ana","Leo") { tags: ["care_network"] } } else { }
+what_if "x" { apply { connect("Leo","Eva") { trust: 50 } } compare: [trust] }
+''',
+        "es": '''
+crear_nodo persona("Ana") { confianza: 50 }
+crear_nodo resource_tmp("Tmp") { confianza: 50 }
+conectar("Ana","Tmp") { confianza: 40, tags: ["care_network", "mentoring"] }
+si confianza < 90 { conectar("Ana","Leo") { tags: ["care_network"] } } sino { }
+que_pasa_si "x" { aplicar { conectar("Leo","Eva") { confianza: 50 } } comparar: [confianza] }
+''',
+    }
+
+    def test_ir_from_ast_in_both_languages(self):
+        for lang, src in self.SRC.items():
+            ast = main.parse_program(main.normalize_source(src, lang))
+            ir = main._ast_to_ir_for_linter(ast)
+            rel = [(r["source"], r["target"], r["tags"]) for r in ir["relations"]]
+            self.assertEqual(rel, [("Ana", "Tmp", ["care_network", "mentoring"]),
+                                   ("Ana", "Leo", ["care_network"]),
+                                   ("Leo", "Eva", [])], lang)
+            self.assertEqual([n["name"] for n in ir["nodes"]], ["Ana", "Tmp", "Leo", "Eva"])
+            self.assertEqual(ir["nodes"][1]["type"], "resource_tmp")
+
+
+class TestPreLintDryRun(unittest.TestCase):
+
+    SRC = '''
+create_node community("Sur") { trust: 65, resources: 20 }
+create_node person("Ana") { trust: 60, resources: 2 }
+create_node person("Leo") { trust: 62, resources: 2 }
+connect("Ana","Sur") { trust: 70 }
+connect("Leo","Sur") { trust: 60 }
+redistribute_resources("Sur","Ana") { fraction: 0.3 }
+if trust < 90 { connect("Ana","Leo") { trust: 55 } } else { }
+what_if "x" { apply { connect("Ana","Eva") { trust: 10 } } compare: [trust] }
+launch_initiative "y" { }
+'''
+
+    def setUp(self):
+        self.ast = main.parse_program(main.normalize_source(self.SRC, "en"))
+
+    def test_plan_matches_execute(self):
+        rt = main.Runtime()
+        log = list(main.WHATIF_LOG)
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.execute(rt, self.ast, finalize=False)
+        main.WHATIF_LOG[:] = log
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            base, plan = main.dry_run_metrics(self.ast)
+        self.assertEqual(plan, rt.measure())
+        self.assertEqual(out.getvalue(), "")  # el WHAT_IF no se ensaya ni imprime
+        self.assertNotEqual(base, plan)
+
+    def test_only_requested_metrics(self):
+        base, plan = main.dry_run_metrics(self.ast, only={"equity"})
+        self.assertEqual(set(base), {"equity"})
+        self.assertEqual(set(plan), {"equity"})
+        self.assertEqual(main.dry_run_metrics(self.ast, only=frozenset()), ({}, {}))
+
+    def test_rule_metrics(self):
+        plan = linter.RulePlan("x", {}, linter.compile_rules({"rules": RULES["rules"] + [
+            {"id": "X", "when": "post", "condition": {"type": "expr", "params": {
+                "expr": "plan.trust >= previous.cohesion and count(nodes) > 0"}}}]}))
+        self.assertEqual(plan.metrics("pre"), {"equity"})
+        self.assertEqual(plan.metrics(), {"equity", "trust", "cohesion"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+
+from lexo.montecarlo import run_montecarlo
+
+
+def _noisy_metrics(base, rng):
+    return {"trust": base + rng.normal(0.0, 1.0), "cohesion": 50.0, "equity": 70.0}
+
+
+class TestMonteCarlo(unittest.TestCase):
+
+    def test_reproducible_regardless_of_workers(self):
+        a = run_montecarlo("t", 60.0, 300, _noisy_metrics, seed=3, workers=1)
+        b = run_montecarlo("t", 60.0, 300, _noisy_metrics, seed=3, workers=2)
+        self.assertEqual(a.samples.shape, (300, 3))
+        np.testing.assert_array_equal(a.samples, b.samples)
+
+    def test_summary_bands(self):
+        res = run_montecarlo("t", 60.0, 2000, _noisy_metrics, seed=1,
+                             percentiles=[5, 95], workers=1)
+        s = res.summary()
+        self.assertAlmostEqual(s["trust"]["mean"], 60.0, delta=0.1)
+        self.assertLess(s["trust"]["ci95_low"], s["trust"]["ci95_high"])
+        self.assertLess(s["trust"]["p5"], s["trust"]["p95"])
+        # métrica determinista → banda degenerada
+        self.assertEqual(s["equity"]["p5"], s["equity"]["p95"])
+
+
+class TestSimulateDSL(unittest.TestCase):
+
+    def test_stochastic_runtime_is_opt_in(self):
+        import main
+        src = '''
+        create_node community("South") { trust: 60, resources: 10 }
+        create_node person("Ana") { trust: 50, resources: 2 }
+        simulate 200 "noisy" {
+          seed: 5, trust_noise: 0.5, edge_prob: 0.5
+          apply {
+            connect("Ana","South") { trust: 55 }
+            strengthen_ties("Ana") { intensity: HIGH }
+          }
+        }
+        '''
+        ast = main.parse_program(main.normalize_source(src, "en"))
+        tag, reps, title, opts, _ = ast.actions[-1]
+        self.assertEqual((tag, reps, title), ("SIMULATE", 200, "noisy"))
+        self.assertEqual(opts["edge_prob"], 0.5)
+
+        rt = main.Runtime()
+        for _, kind, name, props in ast.decls:
+            rt.ensure_node(kind, name, props)
+        template = main.parse_program(ast.actions[-1][4])
+        # sin rng el runtime es determinista
+        m1 = main._simulate_point((rt, template, {}), None)
+        m2 = main._simulate_point((rt, template, {}), None)
+        self.assertEqual(m1, m2)
+        self.assertEqual(rt.graph.number_of_edges(), 0)
+
+        rng = np.random.default_rng(0)
+        trusts = {main._simulate_point((rt, template, opts), rng)["trust"]
+                  for _ in range(20)}
+        self.assertGreater(len(trusts), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
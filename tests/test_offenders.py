@@ -0,0 +1,74 @@
+import csv
+import os
+import random
+import tempfile
+import unittest
+
+import main
+from lexo.offenders import OffenderSink, scan_snapshots
+
+LIMITS = {"max_edge_trust_drop": 10, "low_node_trust": 30, "low_edge_trust": 25,
+          "min_node_degree": 2, "min_resources_per_node": 2}
+
+
+def _snap(seed, n=200, m=300):
+    rnd = random.Random(seed)
+    nodes = [f"n{i}" for i in range(n)]
+    edges = {}
+    for _ in range(m):
+        a, b = rnd.sample(range(n), 2)
+        edges[(nodes[min(a, b)], nodes[max(a, b)])] = float(rnd.randint(0, 100))
+    degrees = dict.fromkeys(nodes, 0)
+    for u, v in edges:
+        degrees[u] += 1
+        degrees[v] += 1
+    return {"edges": edges, "degrees": degrees, "gini": 0.0, "top_share": 0.0,
+            "node_trust": {v: float(rnd.randint(0, 100)) for v in nodes},
+            "res_by_node": {v: float(rnd.choice([0, 1, 2, 5, 9])) for v in nodes}}
+
+
+class TestOffenders(unittest.TestCase):
+
+    def setUp(self):
+        self.prev = _snap(1)
+        self.new = dict(self.prev)
+        rnd = random.Random(2)
+        self.new["edges"] = {e: max(0.0, t - rnd.choice([0, 0, 5, 20])) for e, t in self.prev["edges"].items()}
+
+    def test_counts_and_worst_match_brute_force(self):
+        hits = scan_snapshots(self.prev, self.new, LIMITS, k=4)
+        low = [(n, t) for n, t in self.new["node_trust"].items() if t < 30]
+        self.assertEqual(hits["low_node_trust"].count, len(low))
+        self.assertEqual([t for _, t in hits["low_node_trust"].worst],
+                         sorted(t for _, t in low)[:4])
+        drops = sorted((self.prev["edges"][e] - t for e, t in self.new["edges"].items()
+                        if self.prev["edges"][e] - t > 10), reverse=True)
+        self.assertEqual(hits["edge_drop"].count, len(drops))
+        self.assertEqual([d for _, d in hits["edge_drop"].worst], drops[:4])
+        starved = [n for n, r in self.new["res_by_node"].items() if r < 2]
+        self.assertEqual(hits["starved"].count, len(starved))
+        # empates: gana el primero en aparecer
+        self.assertEqual(hits["starved"].keys(), [n for n in starved
+                                                  if self.new["res_by_node"][n] == 0][:4])
+
+    def test_sink_streams_every_offender(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "off.csv")
+            with OffenderSink(path) as sink:
+                hits = scan_snapshots(self.prev, self.new, LIMITS, k=2, sink=sink)
+            with open(path, encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), sum(h.count for h in hits.values()))
+        self.assertEqual(sum(r["rule"] == "low_degree" for r in rows), hits["low_degree"].count)
+
+    def test_lint_alerts_report_counts(self):
+        alerts = main.lint_compare_v2(self.prev, self.new,
+                                      {"trust": 50, "cohesion": 50, "equity": 90},
+                                      {"trust": 50, "cohesion": 50, "equity": 90})
+        n_low = main.ETHICS_HITS["low_node_trust"].count
+        self.assertTrue(any(f"{n_low} nodo(s) con confianza muy baja" in a for a in alerts))
+        self.assertEqual(len(main.ETHICS_HITS["low_node_trust"].worst), main.ETHICS_TOP_K)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import random
+import unittest
+
+import main
+from lexo.incremental import Delta, IncrementalMetrics
+from lexo.optimize import OptimizeConfig, optimize
+
+
+def _random_runtime(n=30, p=0.15, seed=0):
+    rng = random.Random(seed)
+    rt = main.Runtime()
+    for i in range(n):
+        rt.ensure_node("PERSON", f"n{i}", {"trust": rng.uniform(30, 90),
+                                           "resources": rng.uniform(0, 20)})
+    for i in range(n):
+        for j in range(i + 1, n):
+            if rng.random() < p:
+                rt.connect(f"n{i}", f"n{j}", {"trust": 50})
+    return rt
+
+
+class TestIncrementalMetrics(unittest.TestCase):
+
+    def test_matches_measure(self):
+        rt = _random_runtime()
+        self.assertEqual(IncrementalMetrics.from_runtime(rt).metrics(), rt.measure())
+
+    def test_preview_and_commit_match_runtime(self):
+        rng = random.Random(1)
+        rt = _random_runtime(seed=2)
+        st = IncrementalMetrics.from_runtime(rt)
+        for _ in range(40):
+            a, b, c = rng.sample(sorted(rt.graph.nodes()), 3)
+            rt2 = rt.clone()
+            rt2.connect(a, b, {})
+            rt2.redistribute_resources(a, c, fraction=0.3, min_left=1.0)
+            rt2._set_node_trust(b, 77.0)
+            delta = Delta(trust={b: 77.0},
+                          resources={n: rt2._get_node_resources(n) for n in (a, c)},
+                          edges=[(a, b)])
+            self.assertEqual(st.preview(delta), rt2.measure())
+            st.commit(delta)
+            rt = rt2
+            self.assertEqual(st.metrics(), rt.measure())
+
+
+class TestOptimize(unittest.TestCase):
+
+    def test_plan_improves_objective_and_replays(self):
+        rt = _random_runtime(n=20, p=0.2, seed=4)
+        cfg = OptimizeConfig(budget={"CONNECT": 2, "STRENGTHEN_TIES": 1,
+                                     "REDISTRIBUTE_RESOURCES": 2},
+                             beam=3)
+        res = optimize(IncrementalMetrics.from_runtime(rt), cfg)
+        self.assertTrue(0 < len(res.actions) <= 5)
+        tags = [a[0] for a in res.actions]
+        self.assertLessEqual(tags.count("CONNECT"), 2)
+
+        plan = main.AST()
+        plan.actions = list(res.actions)
+        rt2 = rt.clone()
+        main.execute(rt2, plan, finalize=False)
+        self.assertEqual(rt2.measure(), res.metrics)
+        before = sum(rt.measure().values())
+        self.assertGreater(sum(res.metrics.values()), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+
+import main
+from lexo.arrays import GraphArrays
+from lexo.propagate import personalized_pagerank
+
+SRC = '''
+create_node community("South") { trust: 50, resources: 10 }
+create_node person("Ana") { trust: 50 }
+create_node person("Leo") { trust: 50 }
+create_node person("Eva") { trust: 50 }
+create_node person("Solo") { trust: 50 }
+connect("South","Ana") { trust: 80, intensity: HIGH }
+connect("Ana","Leo") { trust: 60 }
+connect("Leo","Eva") { trust: 40, intensity: LOW }
+propagate_trust("South") { strength: 10, damping: 0.8 }
+'''
+
+
+def _run(src):
+    ast = main.parse_program(main.normalize_source(src, "en"))
+    rt = main.Runtime()
+    for _, kind, name, props in ast.decls:
+        rt.ensure_node(kind, name, props)
+    main._run_actions(rt, ast.actions)
+    return ast, rt
+
+
+def _dense_ppr(ga, seeds, d):
+    # referencia: (I − d·W·D⁻¹)⁻¹ (1 − d) e con matriz densa
+    n = ga.n
+    W = np.zeros((n, n))
+    w = ga.edge_trust / 100.0 * ga.edge_level
+    W[ga.src, ga.dst] = w
+    W[ga.dst, ga.src] = w
+    deg = W.sum(axis=0)
+    e = np.zeros(n)
+    e[seeds] = 1.0 / len(seeds)
+    P = W / np.where(deg > 0, deg, 1.0)
+    P[:, deg == 0] = e[:, None]  # masa de nodos aislados vuelve a las semillas
+    return np.linalg.solve(np.eye(n) - d * P, (1 - d) * e)
+
+
+class TestPropagate(unittest.TestCase):
+
+    def test_matches_dense_solve(self):
+        ast, rt = _run(SRC.rsplit("propagate_trust", 1)[0])
+        ga = GraphArrays.from_runtime(rt)
+        seeds = [ga.index["South"], ga.index["Eva"]]
+        x, it, ok = personalized_pagerank(ga, seeds, damping=0.8, tol=1e-12, max_iter=500)
+        self.assertTrue(ok)
+        self.assertAlmostEqual(x.sum(), 1.0, places=9)
+        np.testing.assert_allclose(x, _dense_ppr(ga, seeds, 0.8), atol=1e-9)
+
+    def test_action_spills_with_distance(self):
+        ast, rt = _run(SRC)
+        self.assertEqual(ast.actions[-1][:2], ("PROPAGATE_TRUST", ("South",)))
+        t = {n: rt._get_node_trust(n) for n in rt.graph.nodes()}
+        self.assertAlmostEqual(t["South"], 60.0)
+        self.assertTrue(60.0 > t["Ana"] > t["Leo"] > t["Eva"] > 50.0)
+        self.assertEqual(t["Solo"], 50.0)  # sin camino: no recibe nada
+
+    def test_writes_skip_tiny_bumps_and_bulk(self):
+        _, rt = _run(SRC.rsplit("propagate_trust", 1)[0])
+        touched = []
+        orig = rt._touch_node
+        rt._touch_node = lambda n: touched.append(n) or orig(n)
+        # tol alto: sólo South y Ana superan el umbral → hooks por nodo
+        rt.propagate_trust(["South"], strength=10, damping=0.8, tol=2.0, max_iter=500)
+        self.assertEqual(sorted(touched), ["Ana", "South"])
+        self.assertEqual(rt._get_node_trust("Eva"), 50.0)
+        # la mayoría cambia: escritura masiva sin hooks, cachés descartados
+        _, rt = _run(SRC.rsplit("propagate_trust", 1)[0])
+        _, ref = _run(SRC)
+        q = rt.quotient()
+        rt._touch_node = lambda n: touched.append(n)
+        touched.clear()
+        rt.propagate_trust(["South"], strength=10, damping=0.8)
+        self.assertEqual(touched, [])
+        self.assertIsNot(rt.quotient(), q)
+        for n in ref.graph.nodes():
+            self.assertAlmostEqual(rt._get_node_trust(n), ref._get_node_trust(n), places=9)
+
+
+if __name__ == "__main__":
+    unittest.main()
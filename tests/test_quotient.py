@@ -0,0 +1,119 @@
+import unittest
+
+import networkx as nx
+
+import main
+from helpers import random_runtime
+from lexo.incremental import IncrementalMetrics
+from lexo.quotient import UNASSIGNED, Quotient
+
+
+def _runtime(seed=11):
+    return random_runtime(seed, graph=nx.connected_caveman_graph(4, 8), community_every=8,
+                          uniform=True, resources=(0, 1, 2, 4, 30), edge_trust=50,
+                          solo={"trust": 10, "resources": 5})
+
+
+class TestQuotient(unittest.TestCase):
+
+    def setUp(self):
+        self.rt = _runtime()
+        self.q = Quotient.from_runtime(self.rt)
+
+    def test_exact_at_build(self):
+        self.assertEqual(len(self.q.communities), 5)
+        self.assertEqual(self.q.member["solo"], UNASSIGNED)
+        ref = IncrementalMetrics.from_runtime(self.rt).values()
+        for a, b in zip(self.q.values(), ref):
+            self.assertAlmostEqual(a, b, places=9)
+
+    def test_trust_and_resource_actions(self):
+        acts = [("STRENGTHEN_TIES", "n3", {"intensity": "ALTA"}),
+                ("LAUNCH_INITIATIVE", "x", {"target": "n8", "trust_boost": 12}),
+                ("REDISTRIBUTE_RESOURCES", "n9", "n17", {"fraction": 0.3, "min_left": 1})]
+        q2 = self.q.copy()
+        self.assertTrue(all(q2.apply(a) for a in acts))
+        rt2 = self.rt.clone()
+        main._run_actions(rt2, acts)
+        exact = IncrementalMetrics.from_runtime(rt2).values()
+        coarse = q2.values()
+        self.assertAlmostEqual(coarse[0], exact[0], places=9)  # trust exacta
+        self.assertAlmostEqual(coarse[2], exact[2], delta=2.0)  # equity aproximada
+        # la copia no toca el original
+        self.assertAlmostEqual(self.q.values()[0],
+                               IncrementalMetrics.from_runtime(self.rt).values()[0])
+
+    def test_reconnect_existing_pair_is_noop(self):
+        before = self.q.values()
+        degree = dict(self.q.degree)
+        for act in (("CONNECT", "n1", "n2", {"trust": 80}), ("CONNECT", "n2", "n1", {})):
+            self.assertTrue(self.q.apply(act))  # n1–n2 ya existe (caverna 0)
+        self.assertEqual(self.q.values(), before)
+        self.assertEqual(self.q.degree, degree)
+        q2 = self.q.copy()
+        q2.apply(("CONNECT", "n1", "n9", {}))
+        after = q2.values()
+        q2.apply(("CONNECT", "n9", "n1", {}))
+        self.assertEqual(q2.values(), after)
+        self.assertEqual(self.q.values(), before)  # la copia no toca al original
+
+    def test_unsupported_and_cache(self):
+        self.assertFalse(self.q.copy().apply(("PROPAGATE_TRUST", ("n0",), {})))
+        self.assertIs(self.rt.quotient(), self.rt.quotient())
+        # el cociente cacheado se mantiene con las acciones, sin rearmarlo
+        q = self.rt.quotient()
+        deg = q.degree["n1"]
+        main._run_actions(self.rt, [("CONNECT", "n1", "n9", {"trust": 50}),
+                                    ("CONNECT", "n1", "n9", {"trust": 70}),
+                                    ("STRENGTHEN_TIES", "n3", {"intensity": "HIGH"}),
+                                    ("REDISTRIBUTE_RESOURCES", "n9", "n17", {"fraction": 0.3, "min_left": 1})])
+        self.assertIs(self.rt.quotient(), q)
+        self.assertEqual(q.degree["n1"], deg + 1)
+        self.assertTrue(q.approximate)
+        fresh = Quotient.from_runtime(self.rt)
+        self.assertEqual(q.trust, fresh.trust)
+        self.assertEqual(q.resources, fresh.resources)
+        self.assertAlmostEqual(q.values()[0], fresh.values()[0], places=9)
+        # nodo nuevo o escritura masiva: se descarta
+        self.rt.ensure_node("PERSON", "nuevo", {})
+        self.assertIsNot(self.rt.quotient(), q)
+        q = self.rt.quotient()
+        self.rt.invalidate_index(kinds=False)
+        self.assertIsNot(self.rt.quotient(), q)
+
+    def test_coarse_whatif(self):
+        src = 'what_if "x" { apply { strengthen_ties("n3") { intensity: HIGH } } compare: [trust] }'
+        ast = main.parse_program(main.normalize_source(src, "en"))
+        old = main.COARSE_MODE
+        main.COARSE_MODE = True
+        try:
+            main.WHATIF_LOG.clear()
+            main.execute(self.rt, ast, finalize=False)
+        finally:
+            main.COARSE_MODE = old
+        entry = main.WHATIF_LOG[-1]
+        self.assertTrue(entry["coarse"]["complete"])
+        self.assertEqual(entry["new"], entry["coarse"]["new"])
+
+    def test_coarse_whatif_with_new_node_is_refined(self):
+        self.assertFalse(self.q.copy().apply(("CONNECT", "Z", "n1", {})))
+        src = ('what_if "z" { apply { create_node person("Z") { trust: 5, resources: 100 }\n'
+               'connect("Z","n1") { trust: 50 } } compare: [trust, equity] }')
+        ast = main.parse_program(main.normalize_source(src, "en"))
+        old = main.COARSE_MODE
+        main.COARSE_MODE = True
+        try:
+            main.WHATIF_LOG.clear()
+            main.execute(self.rt, ast, finalize=False)
+        finally:
+            main.COARSE_MODE = old
+        entry = main.WHATIF_LOG[-1]
+        self.assertFalse(entry["coarse"]["complete"])
+        rt2 = self.rt.clone()
+        rt2.ensure_node("PERSON", "Z", {"trust": 5, "resources": 100})
+        rt2.connect("Z", "n1", {"trust": 50})
+        self.assertEqual(entry["new"], rt2.measure())
+
+
+if __name__ == "__main__":
+    unittest.main()
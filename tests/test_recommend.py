@@ -0,0 +1,55 @@
+import itertools
+import random
+import unittest
+
+import networkx as nx
+
+from lexo.recommend import adjacency, recommend_connections
+
+
+def _brute_force(g: nx.Graph):
+    """Ganancia de cada no-arista recalculando nx.transitivity."""
+    base = 100.0 * nx.transitivity(g)
+    out = {}
+    for u, v in itertools.combinations(g.nodes(), 2):
+        if g.has_edge(u, v):
+            continue
+        h = g.copy()
+        h.add_edge(u, v)
+        out[frozenset((u, v))] = 100.0 * nx.transitivity(h) - base
+    return out
+
+
+class TestRecommend(unittest.TestCase):
+
+    def setUp(self):
+        rnd = random.Random(7)
+        self.g = nx.gnm_random_graph(30, 60, seed=3)
+        self.g.add_node("solo")
+        self.g.add_edge(rnd.randrange(30), rnd.randrange(30))
+        self.adj = adjacency(self.g.nodes(), self.g.edges())
+
+    def test_top_k_matches_brute_force(self):
+        ref = _brute_force(self.g)
+        recs = recommend_connections(self.adj, k=5)
+        self.assertEqual(len(recs), 5)
+        best = sorted(ref.values(), reverse=True)[:5]
+        for r, exp in zip(recs, best):
+            self.assertAlmostEqual(r.gain, exp, places=9)
+            self.assertAlmostEqual(ref[frozenset((r.a, r.b))], r.gain, places=9)
+            self.assertFalse(self.g.has_edge(r.a, r.b))
+
+    def test_focus_includes_isolated_nodes(self):
+        recs = recommend_connections(self.adj, k=3, focus=["solo"])
+        self.assertEqual(len(recs), 3)
+        ref = _brute_force(self.g)
+        best = sorted((g for pair, g in ref.items() if "solo" in pair), reverse=True)[:3]
+        self.assertEqual([round(r.gain, 9) for r in recs], [round(g, 9) for g in best])
+        for r in recs:
+            self.assertIn("solo", (r.a, r.b))
+            self.assertEqual(r.common, 0)
+            self.assertAlmostEqual(ref[frozenset((r.a, r.b))], r.gain, places=9)
+
+
+if __name__ == "__main__":
+    unittest.main()
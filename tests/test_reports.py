@@ -0,0 +1,127 @@
+import contextlib
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+from functools import partial
+from unittest import mock
+
+import main
+from lexo.reports import NodeTable, read_ndjson, report_path, write_report
+import lexo.reports as reports
+
+PAYLOAD = {"run_id": "r1", "final_metrics": {"trust": 61.5, "equity": 0.4},
+           "what_if": [{"title": "señal", "deltas": {"trust": -2.0}}], "quotient": None}
+_WRITE_MAP = reports._write_map
+
+
+def _table(n=5):
+    names = tuple(f"N{i}" for i in range(n))
+    res = tuple(round(1.5 * (i + 1), 2) for i in range(n))
+    comm = tuple(i % 2 == 0 for i in range(n))
+    return NodeTable(names, res, comm, round(sum(res), 2))
+
+
+class TestWriteReport(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def _path(self, name="run_r1.json"):
+        return os.path.join(self.dir, name)
+
+    def _legacy(self, nodes):
+        path = write_report(self._path("legacy.json"), PAYLOAD, nodes)
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_report_path_suffixes(self):
+        self.assertEqual(report_path("run_x.json", "json"), "run_x.json")
+        self.assertEqual(report_path("run_x.json", "compact"), "run_x.json")
+        self.assertEqual(report_path("run_x.json", "gzip"), "run_x.json.gz")
+        self.assertEqual(report_path("report.json", "ndjson"), "report.ndjson")
+
+    def test_json_keeps_legacy_layout(self):
+        nodes = _table()
+        data = self._legacy(nodes)
+        self.assertEqual(data["resources"]["by_node"]["N1"], 3.0)
+        self.assertEqual(data["resources"]["community_percentages"].keys(), {"N0", "N2", "N4"})
+        self.assertEqual(data["resources"], nodes.as_dict())
+
+    def test_compact_and_gzip_match_json(self):
+        for n in (0, 5, 8):  # 8 = múltiplo exacto del lote
+            nodes = _table(n)
+            legacy = self._legacy(nodes)
+            with mock.patch.object(reports, "_write_map", partial(_WRITE_MAP, batch=4)):
+                compact = write_report(self._path(), PAYLOAD, nodes, "compact")
+                gz = write_report(self._path(), PAYLOAD, nodes, "gzip")
+            with open(compact, encoding="utf-8") as f:
+                self.assertEqual(json.load(f), legacy)
+            with gzip.open(gz, "rt", encoding="utf-8") as f:
+                self.assertEqual(json.load(f), legacy)
+            self.assertTrue(gz.endswith(".json.gz"))
+
+    def test_ndjson_one_line_per_node(self):
+        nodes = _table()
+        path = write_report(self._path(), PAYLOAD, nodes, "ndjson")
+        run, rows = read_ndjson(path)
+        self.assertEqual(run["type"], "run")
+        self.assertEqual(run["final_metrics"], PAYLOAD["final_metrics"])
+        self.assertEqual(run["resources"], {"total": nodes.total, "nodes": 5})
+        legacy = self._legacy(nodes)["resources"]
+        self.assertEqual({r["id"]: r["resources"] for r in rows}, legacy["by_node"])
+        self.assertEqual({r["id"]: r["pct"] for r in rows}, legacy["percentages"])
+        self.assertEqual({r["id"] for r in rows if r["community"]},
+                         set(legacy["community_percentages"]))
+
+    def test_summary_profile_omits_maps(self):
+        nodes = _table()
+        for fmt in ("json", "compact"):
+            with open(write_report(self._path(), PAYLOAD, nodes, fmt, "summary"), encoding="utf-8") as f:
+                data = json.load(f)
+            self.assertEqual(data["resources"], {"total": nodes.total, "nodes": 5})
+            self.assertEqual(data["what_if"], PAYLOAD["what_if"])
+        run, rows = read_ndjson(write_report(self._path(), PAYLOAD, nodes, "ndjson", "summary"))
+        self.assertEqual(rows, [])
+
+    def test_unknown_format_or_profile(self):
+        with self.assertRaises(ValueError):
+            write_report(self._path(), PAYLOAD, _table(), "xml")
+        with self.assertRaises(ValueError):
+            write_report(self._path(), PAYLOAD, _table(), "json", "tiny")
+
+
+class TestExecuteReportFormats(unittest.TestCase):
+
+    def test_execute_writes_selected_format(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cwd = os.getcwd()
+        os.chdir(tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        saved = main.REPORT_FORMAT, main.REPORT_PROFILE
+        self.addCleanup(lambda: (setattr(main, "REPORT_FORMAT", saved[0]),
+                                 setattr(main, "REPORT_PROFILE", saved[1])))
+        main.REPORT_FORMAT, main.REPORT_PROFILE = "gzip", "summary"
+
+        ast = main.parse_program(main.normalize_source(
+            'create_node person("A") { trust: 70 }\ncreate_node community("B") { trust: 70 }\n'
+            'connect("A","B") { trust: 60 }\n', "en"))
+        rt = main.Runtime()
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.execute(rt, ast, finalize=True, run_id="t1")
+        self.assertNotIn("resources", rt.report)
+        self.assertEqual(len(rt.report_nodes), 2)
+        self.assertFalse(os.path.exists("run_t1.json"))
+        with gzip.open("run_t1.json.gz", "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(data["resources"], rt.report_nodes.summary())
+        self.assertEqual(data["run_id"], "t1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+import networkx as nx
+
+import main
+from helpers import random_runtime
+from lexo import robustness
+from lexo.incremental import IncrementalMetrics
+
+
+def _runtime(seed=5):
+    return random_runtime(seed, graph=nx.gnm_random_graph(25, 60, seed=seed), trust=(10, 90),
+                          uniform=True, resources=(0, 1, 2, 5, 20), edge_trust=50,
+                          solo={"trust": 30, "resources": 3})
+
+
+class TestRobustness(unittest.TestCase):
+
+    def setUp(self):
+        self.rt = _runtime()
+        self.state = IncrementalMetrics.from_runtime(self.rt)
+        self.base = self.state.values()
+
+    def test_node_removal_matches_recompute(self):
+        for im in robustness.node_impacts(self.state):
+            rt2 = self.rt.clone()
+            rt2.graph.remove_node(im.target)
+            ref = IncrementalMetrics.from_runtime(rt2).values()
+            for j, m in enumerate(("trust", "cohesion", "equity")):
+                self.assertAlmostEqual(im.delta[m], ref[j] - self.base[j], places=8,
+                                       msg=f"{im.target} {m}")
+
+    def test_edge_removal_matches_recompute(self):
+        impacts = robustness.edge_impacts(self.state)
+        self.assertEqual(len(impacts), self.rt.graph.number_of_edges())
+        for im in impacts:
+            rt2 = self.rt.clone()
+            rt2.graph.remove_edge(*im.target)
+            ref = IncrementalMetrics.from_runtime(rt2).values()
+            self.assertAlmostEqual(im.delta["cohesion"], ref[1] - self.base[1], places=8)
+
+    def test_rank_and_statement(self):
+        ranked = robustness.rank(robustness.node_impacts(self.state), top=3)
+        self.assertEqual(len(ranked), 3)
+        self.assertGreaterEqual(ranked[0].score, ranked[-1].score)
+        ast = main.parse_program(main.normalize_source('robustez { top: 3, modo: "aristas" }', "es"))
+        self.assertEqual(ast.actions, [("ROBUSTNESS", {"top": 3, "modo": "aristas"})])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from lexo.calibrate import load_history
+from lexo.runstore import RunStore, main
+
+REPORT = {
+    "final_metrics": {"trust": 64.78, "cohesion": 45.0, "equity": 55.5},
+    "ethics_alerts": ["[ETHICS] La confianza promedio es 64.78 (< 90.0)."],
+    "what_if": [{"title": "Mentorías", "deltas": {"trust": 2.67}, "pct": {"trust": 3.84},
+                 "base": {"trust": 64.78, "cohesion": 45.0, "equity": 55.5},
+                 "new": {"trust": 67.45, "cohesion": 45.0, "equity": 55.5}}],
+    "resources": {"total": 24.0, "by_node": {"Sur": 20.0, "Ana": 4.0},
+                  "percentages": {"Sur": 83.33, "Ana": 16.67},
+                  "community_percentages": {"Sur": 83.33}},
+}
+
+
+class TestRunStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db = os.path.join(self.tmp.name, "sub", "runs.db")
+        self.store = RunStore(self.db)
+        self.addCleanup(self.store.engine.dispose)
+        now = datetime.now()
+        self.store.record_run("old", dict(REPORT, final_metrics={"trust": 70, "cohesion": 60, "equity": 50}),
+                              status="BLOCKED", created_at=now - timedelta(days=20))
+        self.store.record_run("ok", dict(REPORT, final_metrics={"trust": 80, "cohesion": 70, "equity": 75}),
+                              status="OK", created_at=now - timedelta(days=2))
+
+    def test_record_is_one_transaction_and_replaces(self):
+        commits = []
+        event.listen(self.store.engine, "commit", lambda conn: commits.append(1))
+        fails = [("cohesion", 45.0, 50.0)]
+        self.store.record_run("r1", REPORT, status="BLOCKED", fails=fails, lint_status="OK", source="x.lexo")
+        self.assertEqual(len(commits), 1)
+        got = self.store.get("r1")
+        self.assertEqual(got["metrics"], REPORT["final_metrics"])
+        self.assertEqual([a["kind"] for a in got["alerts"]], ["ethics", "blocker"])
+        self.assertEqual(got["alerts"][1]["message"], "cohesion=45.00 < 50.00")
+        self.assertEqual([(w["metric"], w["delta"]) for w in got["what_if"]], [("trust", 2.67)])
+        self.assertEqual(got["resources"], {"Sur": 20.0, "Ana": 4.0})
+        # re-grabar el mismo id lo reemplaza (sin filas huérfanas)
+        self.store.record_run("r1", dict(REPORT, what_if=[], ethics_alerts=[]), status="OK")
+        got = self.store.get("r1")
+        self.assertEqual((got["status"], got["alerts"], got["what_if"]), ("OK", [], []))
+
+    def test_find_runs(self):
+        self.store.record_run("new", REPORT, status="BLOCKED")
+        week = datetime.now() - timedelta(days=7)
+        ids = [r.id for r in self.store.find_runs(status="blocked", since=week, max_metrics={"equity": 60})]
+        self.assertEqual(ids, ["new"])
+        ids = [r.id for r in self.store.find_runs(max_metrics={"equity": 60})]
+        self.assertEqual(ids, ["new", "old"])  # más reciente primero
+        ids = [r.id for r in self.store.find_runs(min_metrics={"trust": 75})]
+        self.assertEqual(ids, ["ok"])
+        with self.assertRaises(ValueError):
+            self.store.find_runs(max_metrics={"gini": 1})
+
+    def test_import_history_and_cli(self):
+        with open(os.path.join(self.tmp.name, "CHANGELOG.md"), "w", encoding="utf-8") as f:
+            f.write("- 2025-10-19 14:15:01 exec-final: BLOCKED | trust=51.20 cohesion=0.00 equity=58.93\n"
+                    "- 2025-10-19 14:15:01 exec-final: BLOCKED | trust=51.20 cohesion=0.00 equity=58.93 | x\n")
+        self.assertEqual(self.store.import_history(load_history(self.tmp.name)), 1)
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
+            main(["--db", self.db, "--status", "BLOCKED", "--max", "equity=59"])
+        out = buf.getvalue()
+        self.assertIn("changelog:20251019141501", out)
+        self.assertIn("old", out)
+        self.assertIn("== 2 corrida(s) ==", out)
+
+
+if __name__ == "__main__":
+    unittest.main()
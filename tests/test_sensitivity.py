@@ -0,0 +1,72 @@
+import unittest
+
+import main
+from lexo import sensitivity
+
+SRC = '''
+create_node community("South") { trust: 60, resources: 20 }
+create_node person("Ana") { trust: 50, resources: 1 }
+create_node person("Leo") { trust: 40, resources: 2 }
+connect("Ana","South") { trust: 55 }
+redistribute_resources("South","Ana") { fraction: 0.2, min_left: 2 }
+strengthen_ties("Leo") { intensity: LOW }
+redistribute_resources("South","Leo") { fraction: 0.1 }
+'''
+
+
+def _fresh(ast):
+    rt = main.Runtime()
+    for _, kind, name, props in ast.decls:
+        rt.ensure_node(kind, name, props)
+    return rt
+
+
+class TestSensitivity(unittest.TestCase):
+
+    def setUp(self):
+        self.ast = main.parse_program(main.normalize_source(SRC, "en"))
+
+    def test_perturb_bounds(self):
+        act = ("STRENGTHEN_TIES", "Leo", {"intensity": "LOW"})
+        self.assertIsNone(sensitivity.perturb(act, "intensity", -1))
+        up, shift = sensitivity.perturb(act, "intensity", 1)
+        self.assertEqual((up[2]["intensity"], shift), ("MEDIA", 1.0))
+        # parámetro omitido → default del executor
+        act = ("REDISTRIBUTE_RESOURCES", "A", "B", {"fraction": 0.1})
+        self.assertEqual(sensitivity.param_value(act, "min_left"), 2.0)
+
+    def test_matches_full_reruns(self):
+        final, rows = sensitivity.analyze(_fresh(self.ast), self.ast.actions,
+                                          main._run_actions, main._raw_metrics)
+        by_key = {(r.index, r.param): r for r in rows}
+        row = by_key[(1, "fraction")]
+
+        # referencia: dos corridas completas con fraction ± 0.01
+        out = []
+        for f in (0.19, 0.21):
+            acts = list(self.ast.actions)
+            acts[1] = acts[1][:-1] + ({"fraction": f, "min_left": 2},)
+            rt = _fresh(self.ast)
+            main._run_actions(rt, acts)
+            out.append(main._raw_metrics(rt)[2])
+        self.assertAlmostEqual(row.grad["equity"], (out[1] - out[0]) / 0.02, places=4)
+        self.assertGreater(row.grad["equity"], 0)
+        self.assertEqual(row.grad["trust"], 0)
+        self.assertGreater(by_key[(2, "intensity")].grad["trust"], 0)
+        self.assertNotIn((0, "trust"), by_key)  # nadie lee la confianza de la arista
+
+    def test_connect_trust_only_before_edge_readers(self):
+        act = self.ast.actions[0]
+        self.assertEqual(sensitivity.action_params(act, self.ast.actions[1:]), [])
+        tail = [("CONNECT", "Ana", "Leo", {"trust": 20}),
+                ("CONNECT", "Leo", "South", {"trust": 90}),
+                ("PROPAGATE_TRUST", ("South",), {"strength": 10})]
+        self.assertEqual(sensitivity.action_params(act, tail), ["trust"])
+        _, rows = sensitivity.analyze(_fresh(self.ast), [act] + tail,
+                                      main._run_actions, main._raw_metrics)
+        row = next(r for r in rows if (r.index, r.param) == (0, "trust"))
+        self.assertNotEqual(row.grad["trust"], 0)  # el peso reparte el derrame
+
+
+if __name__ == "__main__":
+    unittest.main()
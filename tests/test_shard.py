@@ -0,0 +1,79 @@
+import random
+import unittest
+
+import networkx as nx
+import numpy as np
+
+import main
+from lexo.shard import ShardedRuntime, pair_sum_from_histogram, partition
+
+
+def _program(seed=3):
+    """Tres comunidades con vecinos cruzados + acciones que cruzan shards."""
+    rnd = random.Random(seed)
+    g = nx.connected_caveman_graph(3, 7)
+    g.add_edges_from([(1, 9), (2, 16), (10, 17), (3, 11)])
+    lines = []
+    for v in g.nodes():
+        kind = "community" if v % 7 == 0 else "person"
+        lines.append(f'create_node {kind}("n{v}") {{ trust: {rnd.randint(20, 80)}, '
+                     f'resources: {rnd.choice([0, 1, 2, 2, 5, 30])} }}')
+    for u, v in g.edges():
+        lines.append(f'connect("n{u}","n{v}") {{ trust: {rnd.randint(30, 70)} }}')
+    lines += [
+        'strengthen_ties("n1") { intensity: HIGH }',
+        'care_network("n9") { intensity: MEDIUM }',
+        'redistribute_resources("n0","n15") { fraction: 0.3, min_left: 1 }',
+        'redistribute_resources("n7","n8") { fraction: 0.2 }',
+        'connect("n4","n18") { trust: 40 }',
+        'launch_initiative "Feria" { trust_boost: 5 }',
+    ]
+    return main.parse_program(main.normalize_source("\n".join(lines), "en"))
+
+
+class TestShard(unittest.TestCase):
+
+    def setUp(self):
+        self.ast = _program()
+        rt = main.Runtime()
+        main.execute(rt, self.ast, finalize=False)
+        self.rt = rt
+
+    def test_partition_keeps_communities_together(self):
+        kinds = {f"n{v}": ("COMMUNITY" if v % 7 == 0 else "PERSON") for v in range(21)}
+        edges = [(f"n{u}", f"n{v}") for u, v in nx.connected_caveman_graph(3, 7).edges()]
+        owner = partition(kinds, edges, 3)
+        self.assertEqual(sorted(set(owner.values())), [0, 1, 2])
+        self.assertEqual(owner["n1"], owner["n0"])
+
+    def test_histogram_pair_sum(self):
+        xs = np.array([0, 1, 1, 2, 5, 5, 5, 30], dtype=float)
+        vals, counts = np.unique(xs, return_counts=True)
+        pair, total, n = pair_sum_from_histogram(vals, counts)
+        self.assertAlmostEqual(pair, float(np.abs(xs[:, None] - xs[None, :]).sum()))
+        self.assertEqual((total, n), (xs.sum(), len(xs)))
+
+    def test_matches_single_runtime(self):
+        expected = self.rt.measure()
+        for processes in (False, True):
+            m = main.run_sharded(self.ast, 3, processes=processes)
+            self.assertEqual(m, expected)
+
+    def test_boundary_edges_synced(self):
+        kinds = {name: t.upper() for _, t, name, _ in self.ast.decls}
+        owner = partition(kinds, [(a[1], a[2]) for a in self.ast.actions if a[0] == "CONNECT"], 2)
+        with ShardedRuntime(owner, 2, main.Runtime, processes=False) as srt:
+            srt.load((name, t, props) for _, t, name, props in self.ast.decls)
+            srt.connect_many([("n1", "n9", {"trust": 40})])
+            self.assertNotEqual(owner["n1"], owner["n9"])
+            srt.apply(("STRENGTHEN_TIES", "n1", {"intensity": "ALTA"}))
+            a = srt.shards[owner["n1"]].shard.rt.graph["n1"]["n9"]["trust"]
+            b = srt.shards[owner["n9"]].shard.rt.graph["n1"]["n9"]["trust"]
+            self.assertEqual(a, b)
+            self.assertEqual(srt.boundary[("n1", "n9")]["trust"], a)
+            with self.assertRaises(ValueError):
+                srt.apply(("PROPAGATE_TRUST", ("n1",), {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+import numpy as np
+
+import main
+from lexo.arrays import GraphArrays
+from lexo.stream import StreamRule, StreamStop, StreamingBlocker, _Window, policy_rules
+from lexo.ticks import TickConfig, run_ticks
+
+
+class TestStreamingBlocker(unittest.TestCase):
+
+    def test_window_matches_bruteforce(self):
+        ys = np.random.default_rng(1).normal(50, 10, 300)
+        win = _Window(7)
+        for i, y in enumerate(ys):
+            win.push(y)
+            tail = ys[max(0, i - 6):i + 1]
+            self.assertAlmostEqual(win.mean(), tail.mean())
+            if len(tail) >= 2:
+                self.assertAlmostEqual(win.slope(), np.polyfit(np.arange(len(tail)), tail, 1)[0])
+        self.assertEqual(len(win.ys), 7)
+
+    def test_k_consecutive_and_once_per_streak(self):
+        sb = StreamingBlocker([StreamRule("t", "trust", "mean_below", 50, window=2, k=2, severity="warn")])
+        fired = [bool(sb.push({"trust": v})) for v in (60, 40, 40, 40, 40, 70, 70, 30, 30, 30)]
+        # ventana llena desde la 2ª muestra; medias: 50,40,40,40,55,70,50,30,30
+        self.assertEqual(fired, [False, False, False, True, False, False, False, False, False, True])
+        self.assertIsNone(sb.stopped)  # warn no corta
+
+    def test_slope_and_stop_hook(self):
+        seen = []
+        sb = StreamingBlocker([StreamRule("drop", "equity", "slope_below", -1.0, window=3)],
+                              on_stop=seen.append)
+        for i, v in enumerate((80, 80, 79, 77, 74, 70)):
+            sb.push({"equity": v, "trust": 1}, source=f"s{i}")
+        self.assertIsNotNone(sb.stopped)
+        self.assertEqual(sb.stopped.source, "s3")  # pendiente (77-80)/2 = -1.5
+        self.assertEqual(seen, [sb.stopped])
+        self.assertEqual(sb.summary()["counts"], {"drop": 1})
+
+    def test_policy_rules(self):
+        rules = policy_rules({"trust": 60, "equity": 50}, window=4, k=2, slope=-0.5)
+        self.assertEqual([r.id for r in rules], ["trust_mean", "equity_mean", "trust_slope", "equity_slope"])
+        with self.assertRaises(ValueError):
+            StreamRule("x", "trust", "median_below", 1)
+
+    def test_run_ticks_stops_early(self):
+        rt = main.Runtime()
+        for n, r in (("A", 100.0), ("B", 0.0), ("C", 0.0)):
+            rt.ensure_node("PERSON", n, {"trust": 50, "resources": r})
+        rt.connect("A", "B", {"trust": 80})
+        rt.connect("B", "C", {"trust": 80})
+        calls = []
+        samples = run_ticks(GraphArrays.from_runtime(rt), TickConfig(100, flow=0.5, sample_every=5), 0.0,
+                            on_sample=lambda row: calls.append(row) or row[0] >= 20)
+        self.assertEqual(samples[-1][0], 20)
+        self.assertEqual(len(calls), len(samples))
+
+
+class TestStreamExecute(unittest.TestCase):
+
+    SRC = '''
+create_node person("A") { trust: 50, resources: 10 }
+create_node person("B") { trust: 50, resources: 10 }
+connect("A","B") { trust: 80 }
+simulate_ticks 200 { diffusion: 0.5, sample_every: 1 }
+'''
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.addCleanup(os.chdir, self.cwd)
+
+    def test_ticks_cut_by_stream(self):
+        rt = main.Runtime()
+        rt._stream = StreamingBlocker([StreamRule("trust", "trust", "mean_below", 60, window=3, k=2)])
+        ast = main.parse_program(main.normalize_source(self.SRC, "en"))
+        with contextlib.redirect_stdout(io.StringIO()) as out, self.assertRaises(StreamStop) as cm:
+            main.execute(rt, ast, finalize=False)
+        # muestras: CONNECT, tick 0, tick 1 (ventana llena, racha 1), tick 2 (racha 2)
+        self.assertEqual(cm.exception.event.source, "tick 2")
+        self.assertIn("cortado en el tick", out.getvalue())
+        self.assertEqual(os.listdir("."), [])  # sin CSV de ticks
+
+    def test_stop_at_tick_zero_keeps_edges(self):
+        rt = main.Runtime()
+        rt.ensure_node("PERSON", "A", {"trust": 40, "resources": 10})
+        rt.ensure_node("PERSON", "B", {"trust": 40, "resources": 1})
+        rt.ensure_node("PERSON", "C", {"trust": 40, "resources": 1})
+        rt.connect("A", "B", {"trust": 90})
+        rt.connect("B", "C", {"trust": 20})
+        rt._stream = StreamingBlocker([StreamRule("trust", "trust", "mean_below", 60, window=1)])
+        ast = main.parse_program(main.normalize_source(
+            "simulate_ticks 50 { decay: 0.1, diffusion: 0.5 }", "en"))
+        with contextlib.redirect_stdout(io.StringIO()), self.assertRaises(StreamStop) as cm:
+            main.execute(rt, ast, finalize=False)
+        self.assertEqual(cm.exception.event.source, "tick 0")
+        self.assertEqual([d["trust"] for _, _, d in rt.graph.edges(data=True)], [90.0, 20.0])
+
+    def test_actions_fed_from_incremental_state(self):
+        rt = main.Runtime()
+        seen = []
+        rt._stream = StreamingBlocker([StreamRule("eq", "equity", "mean_below", 0, window=2)])
+        push = rt._stream.push
+        rt._stream.push = lambda m, source="": seen.append((dict(m), rt.measure())) or push(m, source)
+        src = ('create_node person("A") { trust: 50, resources: 10 }\n'
+               'create_node person("B") { trust: 40, resources: 2 }\n'
+               'create_node community("C") { trust: 70, resources: 30 }\n'
+               'connect("A","B") { trust: 80 }\nconnect("B","C") { trust: 60 }\n'
+               'connect("A","C") { trust: 60 }\n'
+               'redistribute_resources("C","B") { fraction: 0.5, min_left: 1 }\n'
+               'launch_initiative "x" { trust_boost: 5 }\n')
+        ast = main.parse_program(main.normalize_source(src, "en"))
+        calls = []
+        measure = main.Runtime.measure
+        with unittest.mock.patch.object(main.Runtime, "measure",
+                                        lambda self, only=None: calls.append(only) or measure(self, only)):
+            with contextlib.redirect_stdout(io.StringIO()):
+                main.execute(rt, ast, finalize=False)
+            n_calls = len(calls) - len(seen)  # las de la comparación del test no cuentan
+        self.assertEqual(len(seen), 5)
+        for got, want in seen:
+            self.assertEqual(got, want)
+        self.assertEqual(n_calls, 1)  # sólo el snapshot inicial de execute
+        self.assertIsNotNone(rt._live)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
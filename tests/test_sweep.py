@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from lexo.pool import map_with_base
+from lexo.sweep import expand_grid, expand_range, pareto_mask, run_sweep
+
+
+def _affine(base, params):
+    # métrica sintética: trust sube con x, equity baja con x
+    x = params["x"]
+    return {"trust": base + x, "cohesion": 10.0, "equity": 100.0 - x * params["k"]}
+
+
+class TestSweep(unittest.TestCase):
+
+    def test_expand_range_inclusive(self):
+        vals = expand_range(0.05, 0.5, 0.05)
+        self.assertEqual(len(vals), 10)
+        self.assertAlmostEqual(vals[0], 0.05)
+        self.assertAlmostEqual(vals[-1], 0.5)
+
+    def test_expand_grid(self):
+        grid = expand_grid({"a": [1, 2], "b": ["x", "y", "z"]})
+        self.assertEqual(len(grid), 6)
+        self.assertEqual(grid[0], {"a": 1, "b": "x"})
+
+    def test_pareto_mask(self):
+        v = np.array([[1, 1], [2, 0], [0, 2], [0.5, 0.5], [2, 0]])
+        # [0.5,0.5] está dominado por [1,1]; los duplicados no se dominan entre sí
+        self.assertEqual(pareto_mask(v).tolist(), [True, True, True, False, True])
+
+    def test_map_with_base_keeps_order(self):
+        items = list(range(20))
+        out = map_with_base(_affine, 0.0, [{"x": i, "k": 1} for i in items], workers=2)
+        self.assertEqual([o["trust"] for o in out], items)
+
+    def test_run_sweep_exports(self):
+        res = run_sweep("t", 50.0, {"x": [0, 1, 2], "k": [0, 1]}, _affine,
+                        dims=["trust", "equity"], workers=1)
+        self.assertEqual(res.metrics.shape, (6, 3))
+        # con k=0 la equidad no cae: x=2,k=0 domina a todos los demás
+        self.assertEqual(res.rows(res.pareto()), [
+            {"x": 2, "k": 0, "trust": 52.0, "cohesion": 10.0, "equity": 100.0}
+        ])
+        with tempfile.TemporaryDirectory() as d:
+            res.save_csv(os.path.join(d, "s.csv"))
+            res.save_npz(os.path.join(d, "s.npz"))
+            data = np.load(os.path.join(d, "s.npz"))
+            self.assertEqual(data["param_x"].tolist(), [0, 0, 1, 1, 2, 2])
+            self.assertEqual(int(data["pareto"].sum()), 1)
+
+
+class TestSweepDSL(unittest.TestCase):
+
+    def test_parse_and_execute(self):
+        import main
+        src = '''
+        crear_nodo comunidad("Sur") { confianza: 65, resources: 20 }
+        crear_nodo persona("Ayla") { confianza: 50, resources: 1 }
+        conectar("Ayla","Sur") { confianza: 55 }
+        que_pasa_si_barrido "Redistribución" {
+          fraction: range(0.1, 0.3, 0.1),
+          min_left: [2, 8]
+          aplicar {
+            redistribuir_recursos("Sur","Ayla") { fraction: $fraction, min_left: $min_left }
+          }
+          comparar: ["equity"]
+        }
+        '''
+        ast = main.parse_program(main.normalize_source(src, "es"))
+        tag, title, space, _, dims = ast.actions[-1]
+        self.assertEqual(tag, "WHAT_IF_SWEEP")
+        self.assertEqual(space["fraction"], [0.1, 0.2, 0.3])
+        self.assertEqual(dims, ["equity"])
+
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as d:
+            os.chdir(d)
+            try:
+                main.SWEEP_WORKERS = 1
+                rt = main.Runtime()
+                main.execute(rt, ast, finalize=False)
+                self.assertTrue(os.path.exists("sweep_redistribucion.csv"))
+            finally:
+                os.chdir(cwd)
+        # el runtime real no se toca
+        self.assertEqual(rt._get_node_resources("Sur"), 20.0)
+        log = main.SWEEP_LOG[-1]
+        self.assertEqual(log["points"], 6)
+        self.assertEqual(log["pareto"][0]["fraction"], 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()
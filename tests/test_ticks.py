@@ -0,0 +1,94 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import main
+from lexo.arrays import GraphArrays
+from lexo.ticks import TickConfig, run_ticks
+
+SRC = '''
+crear_nodo comunidad("Sur") { confianza: 80, resources: 30 }
+crear_nodo persona("Ana") { confianza: 40, resources: 1 }
+crear_nodo persona("Leo") { confianza: 20, resources: 2 }
+crear_nodo persona("Eva") { confianza: 60, resources: 0 }
+conectar("Ana","Sur") { confianza: 90 }
+conectar("Leo","Sur") { confianza: 10 }
+conectar("Ana","Leo") { confianza: 70 }
+conectar("Eva","Leo") { confianza: 30 }
+simular_pasos 50 { decaimiento: 0.05, linea_base: 50, difusion: 0.2, flujo: 0.5, muestreo: 10 }
+'''
+
+
+def _arrays():
+    ast = main.parse_program(main.normalize_source(SRC, "es"))
+    rt = main.Runtime()
+    for _, kind, name, props in ast.decls:
+        rt.ensure_node(kind, name, props)
+    main._run_actions(rt, [a for a in ast.actions if a[0] == "CONNECT"])
+    return ast, rt
+
+
+class TestTicks(unittest.TestCase):
+
+    def test_parse(self):
+        ast, _ = _arrays()
+        act = ast.actions[-1]
+        self.assertEqual(act[:2], ("SIMULATE_TICKS", 50))
+        cfg = main._tick_config(act[1], act[2])
+        self.assertEqual((cfg.decay, cfg.diffusion, cfg.flow, cfg.sample_every),
+                         (0.05, 0.2, 0.5, 10))
+
+    def test_conserves_resources_and_decays(self):
+        _, rt = _arrays()
+        ga = GraphArrays.from_runtime(rt)
+        total = ga.resources.sum()
+        samples = run_ticks(ga, TickConfig(200, decay=0.05, baseline=50,
+                                           flow=0.5, sample_every=50), 0.0)
+        self.assertAlmostEqual(ga.resources.sum(), total, places=9)
+        self.assertTrue((ga.resources >= 0).all())
+        self.assertTrue(np.allclose(ga.edge_trust, 50.0, atol=1e-2))
+        self.assertEqual(samples[:, 0].tolist(), [0, 50, 100, 150, 200])
+        # el flujo hacia los pobres sólo puede subir la equidad
+        self.assertGreater(samples[-1, 3], samples[0, 3])
+
+    def test_write_back_matches_measure(self):
+        ast, rt = _arrays()
+        act = ast.actions[-1]
+        ga = GraphArrays.from_runtime(rt)
+        samples = run_ticks(ga, main._tick_config(act[1], act[2]),
+                            rt.measure()["cohesion"])
+        ga.write_back(rt)
+        m = rt.measure()
+        self.assertAlmostEqual(m["trust"], round(samples[-1, 1], 2))
+        self.assertAlmostEqual(m["equity"], round(samples[-1, 3], 2))
+        self.assertAlmostEqual(rt.graph["Ana"]["Sur"]["confianza"], ga.edge_trust[0])
+
+    def test_zero_ticks_keep_edge_trust(self):
+        _, rt = _arrays()
+        ga = GraphArrays.from_runtime(rt)
+        before = ga.edge_trust.copy()
+        samples = run_ticks(ga, TickConfig(0, decay=0.1, baseline=50), 0.0)
+        self.assertEqual(samples[:, 0].tolist(), [0])
+        self.assertTrue(np.array_equal(ga.edge_trust, before))
+
+    def test_same_n_keeps_both_csvs(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(tmp.name)
+        src = SRC + "simular_pasos 50 { flujo: 0.1 }\n"
+        main.TICKS_LOG.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.execute(main.Runtime(), main.parse_program(main.normalize_source(src, "es")),
+                         finalize=False, run_id="t1")
+        csvs = [e["csv"] for e in main.TICKS_LOG]
+        self.assertEqual(csvs, ["ticks_t1_50_1.csv", "ticks_t1_50_2.csv"])
+        self.assertTrue(all(os.path.exists(p) for p in csvs))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import random
+import tempfile
+import unittest
+from functools import partial
+
+import yaml
+
+import main
+from helpers import random_runtime
+from lexo.incremental import Delta, IncrementalMetrics
+from lexo.watch import EthicsAbort, EthicsWatch, ethics_rules, yaml_rules
+
+LIMITS = {"low_node_trust": 30, "low_edge_trust": 35, "min_node_degree": 1,
+          "min_resources_per_node": 2, "max_edge_trust_drop": 5, "min_avg_trust": 45,
+          "min_equity_score": 40, "max_trust_drop_pct": 5, "max_gini_increase_pct": 10,
+          "max_resource_share": 0.5}
+YAML = [{"id": "EQ-DROP", "severity": "block", "name": "Caída de equidad",
+         "condition": {"type": "metric_drop_percent",
+                       "params": {"metric": "equity", "max_drop_percent": 10}}},
+        {"id": "TAGS", "severity": "block",
+         "condition": {"type": "required_subnetwork", "params": {"tag": "x"}}}]
+
+
+_runtime = partial(random_runtime, 4, community_every=10, span=29)
+
+
+def _attach(rt, rules=None):
+    snap = main.snapshot_state(rt)
+    rt._watch = EthicsWatch(rt, rules if rules is not None else ethics_rules(LIMITS),
+                            start=rt.measure(), start_edges=snap["edges"])
+    return rt._watch
+
+
+class TestWatch(unittest.TestCase):
+
+    def test_incremental_matches_fresh_evaluation(self):
+        rt = _runtime()
+        watch = _attach(rt)
+        acts = [("STRENGTHEN_TIES", "n3", {"intensity": "HIGH"}),
+                ("CONNECT", "n29", "n4", {"trust": 10}),
+                ("REDISTRIBUTE_RESOURCES", "n5", "n6", {"fraction": 0.9, "min_left": 0}),
+                ("CARE_NETWORK", "n7", {"intensity": "LOW"}),
+                ("LAUNCH_INITIATIVE", "x", {"trust_boost": 4})]
+        for act in acts:
+            main._run_actions(rt, [act])
+            watch.after_action(act)
+        rt._set_edge_trust("n29", "n4", 50)
+        watch.after_action(("MANUAL",))
+        self.assertEqual(watch.metrics, rt.measure())
+        fresh = EthicsWatch(rt, ethics_rules(LIMITS), start=watch.start,
+                            start_edges=watch.start_edges)
+        for rule_id, active in fresh.active.items():
+            self.assertEqual(set(watch.active[rule_id]), set(active), rule_id)
+        self.assertNotIn(("n29", "n4"), watch.active["low_edge_trust"])
+
+    def test_resources_and_new_nodes_without_rebuild(self):
+        rt = _runtime()
+        watch = _attach(rt)
+        state = watch.state
+        rnd = random.Random(9)
+        for i in range(60):  # > 32 cambios pendientes: fuerza al menos un merge
+            a, b = rnd.sample(range(30), 2)
+            act = ("REDISTRIBUTE_RESOURCES", f"n{a}", f"n{b}", {"fraction": 0.3, "min_left": 0})
+            main._run_actions(rt, [act])
+            if i % 20 == 0:  # nodo nuevo (CREATE_NODE + CONNECT)
+                rt.ensure_node("PERSON", f"new{i}", {"trust": 40, "resources": 4})
+                rt.connect(f"new{i}", f"n{a}", {"trust": 40})
+                watch.after_action(("CREATE_NODE",))
+            self.assertEqual(watch.metrics, rt.measure(), i)
+        self.assertIs(watch.state, state)
+        self.assertIn("new40", state.trust)
+
+    def test_incremental_commit_matches_fresh(self):
+        rnd = random.Random(2)
+        res = {i: float(rnd.choice([0, 1, 1, 2, 5, 9])) for i in range(50)}
+        st = IncrementalMetrics({i: 50.0 for i in res}, res, [])
+        for step in range(200):
+            n = rnd.randrange(50)
+            res[n] = float(rnd.choice([0, 1, 2, 2, 7]))
+            st.commit(Delta(resources={n: res[n]}))
+            if step % 37 == 0:
+                res[f"x{step}"] = 3.0
+                st.add_node(f"x{step}", 50.0, 3.0)
+        fresh = IncrementalMetrics({i: 50.0 for i in res}, res, [])
+        for got, want in zip(st.values(), fresh.values()):
+            self.assertAlmostEqual(got, want, places=9)
+
+    def test_only_affected_rules_run(self):
+        rt = _runtime()
+        watch = _attach(rt)
+        before = watch.evaluations
+        act = ("LAUNCH_INITIATIVE", "x", {"target": "n1", "trust_boost": 3})
+        main._run_actions(rt, [act])
+        watch.after_action(act)
+        # 3 reglas de nodo sobre n1 + 2 reglas de trust; ni aristas ni equity/cohesión
+        self.assertEqual(watch.evaluations - before, 5)
+
+    def test_yaml_rules_and_abort(self):
+        rules = yaml_rules(YAML)
+        self.assertEqual([r.id for r in rules], ["EQ-DROP"])
+        src = "\n".join(
+            [f'create_node person("p{i}") {{ trust: 50, resources: 10 }}' for i in range(6)] +
+            ['redistribute_resources("p0","p1") { fraction: 0.9, min_left: 0 }',
+             'redistribute_resources("p2","p1") { fraction: 0.9, min_left: 0 }',
+             'launch_initiative "Nunca" { target: "p3", trust_boost: 9 }'])
+        ast = main.parse_program(main.normalize_source(src, "en"))
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "rules.yaml")
+        with open(path, "w", encoding="utf-8") as f:
+            yaml.safe_dump({"rules": YAML}, f)
+        old = main.WATCH_MODE, main.WATCH_ABORT, main.WATCH_RULES_PATH
+        main.WATCH_MODE = main.WATCH_ABORT = True
+        main.WATCH_RULES_PATH = path
+        rt = main.Runtime()
+        try:
+            with self.assertRaises(EthicsAbort) as ctx:
+                main.execute(rt, ast, finalize=True)
+        finally:
+            main.WATCH_MODE, main.WATCH_ABORT, main.WATCH_RULES_PATH = old
+        self.assertEqual(ctx.exception.event.rule, "EQ-DROP")
+        self.assertEqual(ctx.exception.event.step, 1)
+        self.assertEqual(rt._get_node_trust("p3"), 50.0)  # las acciones siguientes no corrieron
+
+
+if __name__ == "__main__":
+    unittest.main()
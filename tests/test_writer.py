@@ -0,0 +1,90 @@
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import main
+from lexo.writer import ReportWriter
+
+
+class TestReportWriter(unittest.TestCase):
+
+    def test_fifo_errors_and_flush(self):
+        out = []
+        w = ReportWriter(maxsize=2)
+        self.addCleanup(w.close)
+
+        def boom():
+            raise OSError("disco lleno")
+
+        with contextlib.redirect_stdout(io.StringIO()) as buf:
+            for i in range(5):
+                w.submit(out.append, i)
+                if i == 2:
+                    w.submit(boom)
+            w.flush()
+        self.assertEqual(out, [0, 1, 2, 3, 4])
+        self.assertEqual([name for name, _ in w.errors], ["boom"])
+        self.assertIn("disco lleno", buf.getvalue())
+        self.assertEqual(w.done, 5)
+
+    def test_bounded_queue_blocks_submit(self):
+        gate = threading.Event()
+        w = ReportWriter(maxsize=1)
+        self.addCleanup(w.close)
+        w.submit(gate.wait)      # el hilo queda ocupado
+        time.sleep(0.05)
+        w.submit(lambda: None)   # llena la cola
+        t = threading.Thread(target=w.submit, args=(lambda: None,))
+        t.start()
+        t.join(0.1)
+        self.assertTrue(t.is_alive())  # submit espera lugar
+        gate.set()
+        t.join(1)
+        self.assertFalse(t.is_alive())
+
+    def test_close_drains_then_runs_inline(self):
+        out = []
+        w = ReportWriter()
+        w.submit(lambda: (time.sleep(0.05), out.append("lento")))
+        w.close()
+        self.assertEqual(out, ["lento"])
+        w.submit(out.append, "directo")
+        self.assertEqual(out, ["lento", "directo"])
+
+
+class TestAsyncExecute(unittest.TestCase):
+
+    def test_execute_hands_reports_to_writer(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cwd = os.getcwd()
+        os.chdir(tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        w = ReportWriter()
+        self.addCleanup(w.close)
+        saved = main.REPORT_WRITER
+        main.REPORT_WRITER = w
+        self.addCleanup(setattr, main, "REPORT_WRITER", saved)
+
+        gate = threading.Event()
+        w.submit(gate.wait)  # retiene al hilo: execute no debe esperar la escritura
+        ast = main.parse_program(main.normalize_source(
+            'create_node person("A") { trust: 70 }\ncreate_node person("B") { trust: 70 }\n'
+            'connect("A","B") { trust: 60 }\n', "en"))
+        rt = main.Runtime()
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.execute(rt, ast, finalize=True, run_id="t1")
+            self.assertIsNotNone(rt.report)
+            self.assertFalse(os.path.exists("run_t1.json"))
+            gate.set()
+            w.flush()
+        self.assertTrue(os.path.exists("run_t1.json"))
+        self.assertTrue(os.path.exists("report.csv"))
+
+
+if __name__ == "__main__":
+    unittest.main()